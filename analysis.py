@@ -0,0 +1,199 @@
+from typing import Dict, Any, Optional, List
+
+import sim
+import engine
+import metrics
+from board import OddsBoard
+from utils import slate_date
+from ratings import RatingsStore
+from features import TeamFeatures
+from schedule import ScheduleIndex
+from config import as_config
+from model import (
+    ConfigLike, apply_injuries, apply_situational, apply_matchup_efficiency,
+    apply_explosiveness, apply_weather_total_adj, decision_from_edges
+)
+
+NOTES = "Matchup, explosiveness, injuries, situational applied per config"
+
+def matchup_inputs(
+    home: str,
+    away: str,
+    date: str,
+    board: OddsBoard,
+    ratings: Optional[RatingsStore],
+    primary_book_kw: Optional[str],
+    allowed_books: Optional[list],
+    injuries_home: Optional[dict] = None,
+    injuries_away: Optional[dict] = None,
+    situational: Optional[dict] = None,
+    features: Optional[TeamFeatures] = None,
+    schedule: Optional[ScheduleIndex] = None,
+    weather: Optional[dict] = None,
+) -> Dict[str, Any]:
+    # Everything the model needs for one game, in the shape both the scalar functions
+    # and engine.pack_games take. Without season features the matchup and explosiveness
+    # adjustments stay neutral. Schedule flags (bye, back-to-back road, long trip) are
+    # added to the caller's situational flags; a flag set by the caller always stays set.
+    # `weather` is kickoff-hour wind/precip (weather.py); calm when not given.
+    with metrics.stage("match"):
+        event_idx = board.find(home, away)
+    with metrics.stage("book"):
+        lines = board.selected_lines(event_idx, primary_book_kw, allowed_books)
+
+    # Ratings delta via SP+ (fallback to 0 if not available)
+    ratings_delta = 0.0
+    ratings_matched = {"home": False, "away": False}
+    if ratings:
+        with metrics.stage("ratings"):
+            h_id, a_id = ratings.team_id(home), ratings.team_id(away)
+            ratings_matched = {"home": h_id is not None, "away": a_id is not None}
+            ratings_delta = ratings.rating_of(home) - ratings.rating_of(away)
+
+    situational = dict(situational or {})
+    if schedule:
+        with metrics.stage("schedule"):
+            for flag, value in schedule.situational(home, away, date).items():
+                situational[flag] = situational.get(flag) or value
+
+    matchup = {"rush_adv": 0.0, "pass_adv": 0.0, "finish_adv": 0.0, "havoc_adv": 0.0}
+    explosiveness = {"home_top_offense": False, "away_leaky_def": False, "extreme": False, "favored_team_leaky": False}
+    if features:
+        # The favorite per the market when there is a spread, else per SP+.
+        spread = lines["spread_home"]
+        favored_home = spread < 0 if spread is not None else ratings_delta >= 0
+        with metrics.stage("features"):
+            matchup, explosiveness = features.matchup(home, away, favored_home)
+
+    return {
+        "game": {"home": home, "away": away, "date": date},
+        "lines": lines,
+        "ratings_delta": ratings_delta,
+        "ratings_matched": ratings_matched,
+        "base_total": 52.0,
+        "spread_line": lines["spread_home"],
+        "total_line": lines["total"],
+        "situational": situational,
+        "matchup": matchup,
+        "explosiveness": explosiveness,
+        "injuries_home": injuries_home or {},
+        "injuries_away": injuries_away or {},
+        "weather": weather or {"wind_mph": 0.0, "precip_mm": 0.0},
+    }
+
+def build_result(g: Dict[str, Any], model_line: float, model_total: float, edges: Dict[str, float], decisions: dict,
+                 priced: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
+        "game": g["game"],
+        "lines": g["lines"],
+        "model": {
+            "model_line_home_minus": round(model_line, 2),
+            "model_total": round(model_total, 1),
+            "components": {
+                "ratings_delta": round(g["ratings_delta"], 2),
+                "ratings_matched": g["ratings_matched"],
+                "situational": {k: v for k, v in g["situational"].items() if v},
+                "weather": g["weather"],
+                "notes": NOTES
+            },
+            "edges": edges,
+            "sim": priced
+        },
+        "decisions": decisions
+    }
+
+def run_model(g: Dict[str, Any], cfg: ConfigLike) -> Dict[str, Any]:
+    cfg = as_config(cfg)
+    model_line = g["ratings_delta"] + cfg.base_hfa_pts
+    model_total = g["base_total"]
+
+    model_line = apply_situational(model_line, g["situational"], cfg)
+    model_line = apply_matchup_efficiency(model_line, g["matchup"], cfg)
+    model_line = apply_explosiveness(model_line, g["explosiveness"], cfg, is_favorite_home=(model_line >= 0))
+    model_line = apply_injuries(model_line, g["injuries_home"], g["injuries_away"], cfg)
+    model_total = apply_weather_total_adj(model_total, g["weather"], cfg)
+
+    spread_line, total_line = g["spread_line"], g["total_line"]
+    edges = {
+        # Home cover margin the model expects at the book's number: + backs home, - backs away.
+        "spread_edge_pts": round(model_line + (spread_line if spread_line is not None else -model_line), 2),
+        "total_edge_pts": round(model_total - (total_line if total_line is not None else model_total), 2)
+    }
+
+    with metrics.stage("sim"):
+        (priced,) = sim.price_games([g["lines"]], [model_line], [model_total], cfg)
+    decisions = decision_from_edges(edges["spread_edge_pts"], edges["total_edge_pts"], cfg, priced)
+    return build_result(g, model_line, model_total, edges, decisions, priced)
+
+def run_model_batch(games: List[Dict[str, Any]], cfg: ConfigLike) -> List[Dict[str, Any]]:
+    # Same results as run_model per game, computed for the whole list at once.
+    if not games:
+        return []
+    cfg = as_config(cfg)
+    with metrics.stage("model"):
+        out = engine.run(engine.pack_games(games), cfg)
+    with metrics.stage("sim"):
+        priced = sim.price_games([g["lines"] for g in games], out["model_line"], out["model_total"], cfg)
+    return [
+        build_result(
+            g, float(out["model_line"][i]), float(out["model_total"][i]),
+            {"spread_edge_pts": float(out["spread_edge"][i]), "total_edge_pts": float(out["total_edge"][i])},
+            engine.decisions(out, i, cfg, priced[i]), priced[i],
+        )
+        for i, g in enumerate(games)
+    ]
+
+# Per-game pipeline behind /analyze. Pure CPU: the board, ratings, features, schedule and weather are fetched
+# (or served from cache) by the caller.
+def analyze_matchup(
+    home: str,
+    away: str,
+    date: str,
+    board: OddsBoard,
+    ratings: Optional[RatingsStore],
+    cfg: ConfigLike,
+    primary_book_kw: Optional[str],
+    allowed_books: Optional[list],
+    injuries_home: Optional[dict] = None,
+    injuries_away: Optional[dict] = None,
+    situational: Optional[dict] = None,
+    features: Optional[TeamFeatures] = None,
+    schedule: Optional[ScheduleIndex] = None,
+    weather: Optional[dict] = None,
+) -> Dict[str, Any]:
+    g = matchup_inputs(home, away, date, board, ratings, primary_book_kw, allowed_books,
+                       injuries_home, injuries_away, situational, features, schedule, weather)
+    with metrics.stage("model"):
+        return run_model(g, cfg)
+
+def _num(x: float, digits: int = 1) -> Optional[float]:
+    return None if x != x else round(float(x), digits)
+
+def market_summary(board: OddsBoard, event_idx: Optional[int], allowed_books: Optional[list]) -> Dict[str, Any]:
+    # Consensus (median) lines and the best price per side across the allowed books.
+    if event_idx is None:
+        return {}
+    cons = board.consensus(allowed_books)
+    best = {}
+    for side, col in board.best_prices(allowed_books).items():
+        bid = int(col["book"][event_idx])
+        if bid < 0:
+            continue
+        key, title = board.books[bid]
+        best[side] = {"book": title or key, "price": int(col["price"][event_idx])}
+        if "point" in col:
+            best[side]["point"] = _num(col["point"][event_idx])
+    return {
+        "consensus_spread_home": _num(cons["spread_home"][event_idx], 2),
+        "consensus_total": _num(cons["total"][event_idx], 2),
+        "books": int(max(cons["spread_home_books"][event_idx], cons["total_books"][event_idx])),
+        "best": best,
+    }
+
+def board_games_on(board: OddsBoard, date: str) -> List[Dict[str, str]]:
+    # Every event on the board kicking off on `date` (local slate date, see utils.slate_date).
+    games = []
+    for e in board.events:
+        if e.get("home_team") and e.get("away_team") and slate_date(e.get("commence_time", "")) == date:
+            games.append({"home": e["home_team"], "away": e["away_team"], "date": date})
+    return games
@@ -0,0 +1,326 @@
+import os
+import json
+import time
+import asyncio
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple, Union
+
+import numpy as np
+
+import engine
+from config import ModelConfig, as_config
+from fetchers import CFBDClient, fetch_all
+from history import OddsHistory, HISTORY_DB
+from model import normalize_team_name
+from teams import TEAMS
+from ratings import RatingsStore
+from utils import load_config, slate_date, season_of, to_float, field, read_json, write_json
+
+# Replays finished games through the model with the closing line it would have bet into,
+# then grades every staked spread/total. Season data comes from CFBD once and is kept on
+# disk; later runs are offline.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKTEST_CACHE_DIR = os.getenv("BACKTEST_CACHE_DIR", os.path.join(APP_DIR, ".backtest_cache"))
+# Finished seasons are cached for good; only the season in progress is refetched after this.
+BACKTEST_CACHE_TTL = float(os.getenv("BACKTEST_CACHE_TTL", "21600"))
+BACKTEST_FETCH_TIMEOUT = float(os.getenv("BACKTEST_FETCH_TIMEOUT", "60"))
+DEFAULT_PRICE = -110
+SOURCES = ("games", "lines", "sp")
+
+# ========= Season data on disk =========
+
+def cache_path(cache_dir: str, kind: str, year: int) -> str:
+    return os.path.join(cache_dir, f"{kind}_{year}.json")
+
+def _fresh(path: str, year: int) -> bool:
+    if not os.path.exists(path):
+        return False
+    if year < season_of(datetime.now(timezone.utc)):
+        return True
+    return time.time() - os.path.getmtime(path) < BACKTEST_CACHE_TTL
+
+async def fetch_seasons(years: List[int], cache_dir: str = BACKTEST_CACHE_DIR, cfbd: Optional[CFBDClient] = None,
+                        refresh: bool = False) -> Dict[str, str]:
+    # Games, closing lines and SP+ for each season missing from disk, all fetched at once.
+    os.makedirs(cache_dir, exist_ok=True)
+    cfbd = cfbd or CFBDClient()
+    fetchers = {"games": cfbd.get_games, "lines": cfbd.get_lines, "sp": cfbd.get_sp_ratings}
+    jobs = {
+        f"{kind}:{y}": fetchers[kind](y)
+        for y in years for kind in SOURCES
+        if refresh or not _fresh(cache_path(cache_dir, kind, y), y)
+    }
+    if not jobs:
+        return {}
+    data, status = await fetch_all(jobs, timeouts={kind: BACKTEST_FETCH_TIMEOUT for kind in SOURCES})
+    for name, value in data.items():
+        if status[name] == "ok":
+            kind, year = name.split(":")
+            write_json(cache_path(cache_dir, kind, int(year)), value)
+    missing = [name for name, s in status.items() if s != "ok" and not os.path.exists(cache_path(cache_dir, *_split(name)))]
+    if missing:
+        raise RuntimeError(f"Backtest data unavailable for: {', '.join(sorted(missing))}")
+    return status
+
+def _split(name: str) -> Tuple[str, int]:
+    kind, year = name.split(":")
+    return kind, int(year)
+
+# ========= Closing lines =========
+
+def _pick(items: List[Any], label, primary_book_kw: Optional[str], allowed_books: Optional[list]) -> Any:
+    # Same preference order as select_book_line: primary book, then allowed books, then anything.
+    if not items:
+        return None
+    if primary_book_kw:
+        for it in items:
+            if primary_book_kw.lower() in label(it).lower():
+                return it
+    for ab in allowed_books or []:
+        for it in items:
+            if ab.lower() in label(it).lower():
+                return it
+    return items[0]
+
+def cfbd_closing(item: Dict[str, Any], primary_book_kw: Optional[str], allowed_books: Optional[list]) -> Dict[str, Any]:
+    # CFBD's `spread` is from the home side, like the Odds API's home spread point.
+    providers = [p for p in item.get("lines") or [] if p.get("spread") is not None or field(p, "overUnder", "over_under") is not None]
+    line = _pick(providers, lambda p: p.get("provider") or "", primary_book_kw, allowed_books)
+    if line is None:
+        return {}
+    spread = line.get("spread")
+    total = field(line, "overUnder", "over_under")
+    return {
+        "book": line.get("provider"),
+        "spread_home": to_float(spread, None) if spread is not None else None,
+        "total": to_float(total, None) if total is not None else None,
+        "spread_price_home": DEFAULT_PRICE, "spread_price_away": DEFAULT_PRICE,
+        "over_price": DEFAULT_PRICE, "under_price": DEFAULT_PRICE,
+    }
+
+def _school(name: str, schools: Dict[str, str]) -> Optional[str]:
+    # Odds API names carry mascots; drop trailing words until a CFBD school matches.
+    team = TEAMS.resolve(name)
+    if team is not None and normalize_team_name(team) in schools:
+        return schools[normalize_team_name(team)]
+    words = normalize_team_name(name).split()
+    for cut in range(len(words), 0, -1):
+        hit = schools.get(" ".join(words[:cut]))
+        if hit is not None:
+            return hit
+    return None
+
+def history_closing(history: OddsHistory, year: int, schools: Dict[str, str], primary_book_kw: Optional[str],
+                    allowed_books: Optional[list]) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    # Recorded closing lines for the season, keyed by (home school, away school, slate date).
+    start = datetime(year, 8, 1, tzinfo=timezone.utc).timestamp()
+    end = datetime(year + 1, 3, 1, tzinfo=timezone.utc).timestamp()
+    out = {}
+    for event_key, home, away, commence in history.events_between(start, end):
+        h, a = _school(home, schools), _school(away, schools)
+        if h is None or a is None:
+            continue
+        quotes = history.closing_quotes(event_key)
+        books = sorted({book for _, book, _, _ in quotes})
+        book = _pick(books, lambda b: b, primary_book_kw, allowed_books)
+        if book is None:
+            continue
+        home_q = quotes.get((event_key, book, "spreads", normalize_team_name(home)), (None, None))
+        away_q = quotes.get((event_key, book, "spreads", normalize_team_name(away)), (None, None))
+        over_q = quotes.get((event_key, book, "totals", "over"), (None, None))
+        under_q = quotes.get((event_key, book, "totals", "under"), (None, None))
+        date = slate_date(datetime.fromtimestamp(commence, tz=timezone.utc).isoformat())
+        out[(h, a, date)] = {
+            "book": book,
+            "spread_home": home_q[0], "total": over_q[0],
+            "spread_price_home": home_q[1] or DEFAULT_PRICE, "spread_price_away": away_q[1] or DEFAULT_PRICE,
+            "over_price": over_q[1] or DEFAULT_PRICE, "under_price": under_q[1] or DEFAULT_PRICE,
+        }
+    return out
+
+# ========= Replay =========
+
+def season_inputs(year: int, cache_dir: str, primary_book_kw: Optional[str], allowed_books: Optional[list],
+                  history_path: Optional[str] = None, prior_ratings: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, np.ndarray]]:
+    # Completed games with a closing line, as engine game dicts plus result/price columns.
+    games = read_json(cache_path(cache_dir, "games", year))
+    lines = {item.get("id"): item for item in read_json(cache_path(cache_dir, "lines", year))}
+    sp_year = year - 1 if prior_ratings else year
+    ratings = RatingsStore(sp_year, read_json(cache_path(cache_dir, "sp", sp_year)))
+
+    schools = {}
+    for g in games:
+        for name in (field(g, "homeTeam", "home_team"), field(g, "awayTeam", "away_team")):
+            if name:
+                schools.setdefault(normalize_team_name(name), name)
+    recorded = {}
+    if history_path and os.path.exists(history_path):
+        history = OddsHistory(history_path, readonly=True)
+        try:
+            recorded = history_closing(history, year, schools, primary_book_kw, allowed_books)
+        finally:
+            history.close()
+
+    rows, cols = [], {k: [] for k in ("home_points", "away_points", "spread_price_home", "spread_price_away", "over_price", "under_price")}
+    for g in games:
+        home, away = field(g, "homeTeam", "home_team"), field(g, "awayTeam", "away_team")
+        hp, ap = field(g, "homePoints", "home_points"), field(g, "awayPoints", "away_points")
+        if not home or not away or hp is None or ap is None:
+            continue
+        date = slate_date(field(g, "startDate", "start_date") or "") or ""
+        # Our own recorded close wins; CFBD's provider lines cover everything before we recorded.
+        close = recorded.get((home, away, date)) or cfbd_closing(lines.get(g.get("id")) or {}, primary_book_kw, allowed_books)
+        if close.get("spread_home") is None and close.get("total") is None:
+            continue
+        rows.append({
+            "game": {"home": home, "away": away, "date": date, "week": g.get("week")},
+            "book": close["book"],
+            "ratings_delta": ratings.rating_of(home) - ratings.rating_of(away),
+            "base_total": 52.0,
+            "spread_line": close.get("spread_home"),
+            "total_line": close.get("total"),
+        })
+        cols["home_points"].append(float(hp))
+        cols["away_points"].append(float(ap))
+        for k in ("spread_price_home", "spread_price_away", "over_price", "under_price"):
+            cols[k].append(float(close[k]))
+    return rows, {k: np.asarray(v, dtype=np.float64) for k, v in cols.items()}
+
+def _payout(price: np.ndarray) -> np.ndarray:
+    # Profit per unit staked on a win at American odds.
+    return np.where(price < 0, 100.0 / np.abs(price), price / 100.0)
+
+def profit(units: np.ndarray, result: np.ndarray, price: np.ndarray) -> np.ndarray:
+    # result: +1 win, 0 push, -1 loss.
+    return np.where(result > 0, _payout(price), np.where(result < 0, -1.0, 0.0)) * units
+
+def _tally(units: np.ndarray, result: np.ndarray, price: np.ndarray) -> Dict[int, Dict[str, float]]:
+    # One entry per staking tier (units > 0).
+    out = {}
+    won = profit(units, result, price)
+    for tier in np.unique(units[units > 0]):
+        m = units == tier
+        out[int(tier)] = {
+            "bets": int(m.sum()),
+            "wins": int((result[m] > 0).sum()),
+            "losses": int((result[m] < 0).sum()),
+            "pushes": int((result[m] == 0).sum()),
+            "risked": float(units[m].sum()),
+            "won": float(won[m].sum()),
+        }
+    return out
+
+def outcomes(out: Dict[str, np.ndarray], packed: np.ndarray, cols: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    # Result (+1/0/-1) and price of the side each edge backs. Broadcasts over swept configs.
+    margin = cols["home_points"] - cols["away_points"]
+    points = cols["home_points"] + cols["away_points"]
+    # The edges carry the side: spread_edge = model_line + spread_line (+ home, - away),
+    # graded like sim.py prices it, home covering when margin + spread_line > 0.
+    spread_side = np.sign(out["spread_edge"])            # +1 home, -1 away
+    total_side = np.sign(out["total_edge"])              # +1 over, -1 under
+    return {
+        "spread_result": np.sign(margin + np.nan_to_num(packed["spread_line"])) * spread_side,
+        "spread_price": np.where(spread_side > 0, cols["spread_price_home"], cols["spread_price_away"]),
+        "total_result": np.sign(points - np.nan_to_num(packed["total_line"])) * total_side,
+        "total_price": np.where(total_side > 0, cols["over_price"], cols["under_price"]),
+    }
+
+def grade(out: Dict[str, np.ndarray], packed: np.ndarray, cols: Dict[str, np.ndarray]) -> Dict[str, Dict[int, Dict[str, float]]]:
+    o = outcomes(out, packed, cols)
+    return {
+        "spread": _tally(out["spread_units"], o["spread_result"], o["spread_price"]),
+        "total": _tally(out["total_units"], o["total_result"], o["total_price"]),
+    }
+
+def replay_season(job: Tuple[int, str, ModelConfig, Optional[str], Optional[list], Optional[str], bool]) -> Dict[str, Any]:
+    # Process-pool entry point: one season, read from the disk cache.
+    year, cache_dir, cfg, primary_book_kw, allowed_books, history_path, prior_ratings = job
+    rows, cols = season_inputs(year, cache_dir, primary_book_kw, allowed_books, history_path, prior_ratings)
+    if not rows:
+        return {"season": year, "games": 0, "results": {"spread": {}, "total": {}}}
+    packed = engine.pack_games(rows)
+    out = engine.run(packed, cfg)
+    return {"season": year, "games": len(rows), "results": grade(out, packed, cols)}
+
+def summarize(results: Dict[str, Dict[int, Dict[str, float]]]) -> Dict[str, Any]:
+    # Adds hit rate and ROI per tier and an "all" row per market.
+    out = {}
+    for market, tiers in results.items():
+        rows = {str(t): dict(v) for t, v in sorted(tiers.items())}
+        if tiers:
+            rows["all"] = {k: sum(v[k] for v in tiers.values()) for k in ("bets", "wins", "losses", "pushes", "risked", "won")}
+        for r in rows.values():
+            decided = r["wins"] + r["losses"]
+            r["hit_rate"] = round(r["wins"] / decided, 4) if decided else None
+            r["roi"] = round(r["won"] / r["risked"], 4) if r["risked"] else None
+            r["won"] = round(r["won"], 2)
+        out[market] = rows
+    return out
+
+def merge(seasons: List[Dict[str, Any]]) -> Dict[str, Dict[int, Dict[str, float]]]:
+    total: Dict[str, Dict[int, Dict[str, float]]] = {"spread": {}, "total": {}}
+    for s in seasons:
+        for market, tiers in s["results"].items():
+            for tier, r in tiers.items():
+                acc = total[market].setdefault(int(tier), {k: 0 for k in r})
+                for k, v in r.items():
+                    acc[k] += v
+    return total
+
+def run_backtest(years: List[int], cfg: Union[ModelConfig, Dict[str, Any]], primary_book_kw: Optional[str], allowed_books: Optional[list],
+                 cache_dir: str = BACKTEST_CACHE_DIR, history_path: Optional[str] = HISTORY_DB,
+                 prior_ratings: bool = False, workers: Optional[int] = None) -> Dict[str, Any]:
+    # Seasons replay in parallel, one per worker process; the data must already be on disk (fetch_seasons).
+    # The config is compiled once here and shipped to the workers compiled.
+    cfg = as_config(cfg)
+    jobs = [(y, cache_dir, cfg, primary_book_kw, allowed_books, history_path, prior_ratings) for y in years]
+    workers = min(len(jobs), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        seasons = [replay_season(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            seasons = list(pool.map(replay_season, jobs))
+    return {
+        "seasons": [dict(s, results=summarize(s["results"])) for s in seasons],
+        "overall": summarize(merge(seasons)),
+        "games": sum(s["games"] for s in seasons),
+    }
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"{report['games']} games")
+    for label, results in [("overall", report["overall"])] + [(str(s["season"]), s["results"]) for s in report["seasons"]]:
+        for market, tiers in results.items():
+            for tier, r in tiers.items():
+                hit = f"{r['hit_rate']:.1%}" if r["hit_rate"] is not None else "-"
+                roi = f"{r['roi']:+.1%}" if r["roi"] is not None else "-"
+                print(f"{label:>8} {market:>6} {tier + 'u' if tier != 'all' else 'all':>4}  "
+                      f"{r['wins']}-{r['losses']}-{r['pushes']}  hit {hit:>6}  units {r['won']:+.2f}  roi {roi:>7}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay past seasons through the model and grade its bets.")
+    parser.add_argument("years", type=int, nargs="+")
+    parser.add_argument("--config", default=os.path.join(APP_DIR, "config.yaml"))
+    parser.add_argument("--cache-dir", default=BACKTEST_CACHE_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--prior-ratings", action="store_true", help="Use the previous season's SP+ (no hindsight)")
+    parser.add_argument("--refresh", action="store_true", help="Refetch season data even if cached")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    needed = sorted(set(args.years) | ({y - 1 for y in args.years} if args.prior_ratings else set()))
+    asyncio.run(fetch_seasons(needed, args.cache_dir, refresh=args.refresh))
+    primary_book_kw = os.getenv("PRIMARY_BOOK_KEYWORD", "DraftKings")
+    allowed_books = [s.strip() for s in os.getenv("ALLOWED_BOOKS", "DraftKings,FanDuel,Caesars").split(",") if s.strip()]
+    report = run_backtest(args.years, load_config(args.config), primary_book_kw, allowed_books,
+                          cache_dir=args.cache_dir, history_path=HISTORY_DB or None,
+                          prior_ratings=args.prior_ratings, workers=args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+
+if __name__ == "__main__":
+    main()
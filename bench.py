@@ -0,0 +1,307 @@
+import os
+import sys
+import json
+import time
+import timeit
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from typing import Dict, Any, Optional, List, Callable
+
+# The benchmark runs hermetically: no odds history, poller or shared cache, whatever .env says.
+os.environ["ODDS_HISTORY_DB"] = ""
+os.environ["ODDS_POLLER"] = "0"
+os.environ["SHARED_CACHE_URL"] = ""
+os.environ["WEATHER_PROVIDER"] = "static"
+os.environ["FEATURES_CACHE_DIR"] = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".bench_features")
+
+import httpx
+import numpy as np
+
+import sim
+import engine
+import fetchers
+from board import OddsBoard, parse_book_lines
+from config import compile_config
+from model import (
+    normalize_team_name, select_book_line, staking_units, apply_injuries, apply_situational,
+    apply_matchup_efficiency, apply_explosiveness, apply_weather_total_adj, decision_from_edges,
+)
+from ratings import RatingsStore
+from features import TeamFeatures
+from teams import TEAMS, TeamIndex
+from utils import load_config, slate_date
+
+# Drives the app in-process through httpx.ASGITransport, with both upstreams served by an
+# httpx.MockTransport replaying recorded (or generated) CFBD/Odds API payloads.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+BOOKS = [("draftkings", "DraftKings"), ("fanduel", "FanDuel"), ("caesars", "Caesars"), ("betmgm", "BetMGM"),
+         ("pointsbetus", "PointsBet (US)"), ("bovada", "Bovada"), ("mybookieag", "MyBookie.ag"), ("betonlineag", "BetOnline.ag")]
+MASCOTS = ["Hawks", "Tigers", "Bulldogs", "Wildcats", "Eagles", "Bears", "Cougars", "Knights"]
+
+# ========= Payloads =========
+
+def _book(key: str, title: str, home: str, away: str, spread: float, total: float, r: random.Random) -> Dict[str, Any]:
+    return {"key": key, "title": title, "last_update": "2025-11-05T12:00:00Z", "markets": [
+        {"key": "h2h", "outcomes": [{"name": home, "price": r.choice([-250, -160, -120, 105])}, {"name": away, "price": r.choice([-120, 110, 140, 210])}]},
+        {"key": "spreads", "outcomes": [{"name": home, "price": -110, "point": spread}, {"name": away, "price": -110, "point": -spread}]},
+        {"key": "totals", "outcomes": [{"name": "Over", "price": -105, "point": total}, {"name": "Under", "price": -115, "point": total}]},
+    ]}
+
+def synthetic_payloads(n_events: int, n_books: int = 6, seed: int = 7) -> Dict[str, Any]:
+    # An Odds API board with n_events games and SP+ for every team on it. Odds API names carry
+    # mascots and SP+ uses school names, as in production.
+    r = random.Random(seed)
+    events, sp = [], []
+    for i in range(n_events):
+        home_school, away_school = f"School {2 * i}", f"School {2 * i + 1}"
+        home, away = f"{home_school} {r.choice(MASCOTS)}", f"{away_school} {r.choice(MASCOTS)}"
+        kickoff = f"2025-11-{8 + i % 3:02d}T{16 + i % 6:02d}:30:00Z"
+        spread, total = r.choice([x / 2 for x in range(-40, 41)]), r.choice([x / 2 for x in range(80, 140)])
+        books = r.sample(BOOKS, min(n_books, len(BOOKS)))
+        events.append({
+            "id": f"ev{i}", "sport_key": "americanfootball_ncaaf", "commence_time": kickoff,
+            "home_team": home, "away_team": away,
+            "bookmakers": [_book(k, t, home, away, spread + r.choice([0, 0, 0.5, -0.5]), total, r) for k, t in books],
+        })
+        for school in (home_school, away_school):
+            sp.append({"team": school, "conference": "X", "rating": round(r.gauss(0, 12), 1),
+                       "offense": {"rating": round(r.gauss(30, 6), 1)}, "defense": {"rating": round(r.gauss(22, 6), 1)}})
+    return {"odds": events, "sp": sp}
+
+def recorded_payloads(path: str) -> Dict[str, Any]:
+    # A directory with odds.json (Odds API /odds) and sp.json (CFBD /ratings/sp).
+    with open(os.path.join(path, "odds.json")) as f:
+        odds = json.load(f)
+    with open(os.path.join(path, "sp.json")) as f:
+        sp = json.load(f)
+    return {"odds": odds, "sp": sp}
+
+class MockUpstreams:
+    def __init__(self, latency_s: float = 0.0):
+        self.payloads: Dict[str, Any] = {"odds": [], "sp": []}
+        self.latency_s = latency_s
+        self.calls = 0
+        self.transport = httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        path = request.url.path
+        if "/events/" in path and path.endswith("/odds"):
+            event_id = path.split("/")[-2]
+            return httpx.Response(200, json=next((e for e in self.payloads["odds"] if e.get("id") == event_id), {}))
+        if path.endswith("/events"):
+            return httpx.Response(200, json=[{k: v for k, v in e.items() if k != "bookmakers"} for e in self.payloads["odds"]])
+        if path.endswith("/odds"):
+            return httpx.Response(200, json=self.payloads["odds"])
+        if path.endswith("/ratings/sp"):
+            return httpx.Response(200, json=self.payloads["sp"])
+        return httpx.Response(200, json=[])
+
+# ========= /analyze load =========
+
+def _percentiles(lat: List[float]) -> Dict[str, float]:
+    a = np.asarray(lat) * 1000.0
+    p50, p95, p99 = np.percentile(a, [50, 95, 99]) if len(a) else (0.0, 0.0, 0.0)
+    return {"p50_ms": round(float(p50), 3), "p95_ms": round(float(p95), 3), "p99_ms": round(float(p99), 3),
+            "mean_ms": round(float(a.mean()), 3) if len(a) else 0.0}
+
+async def bench_analyze(app, mock: MockUpstreams, events: List[Dict[str, Any]], concurrency: int,
+                        n_requests: int, cached: bool) -> Dict[str, Any]:
+    # n_requests GET /analyze calls spread over the board's games, `concurrency` in flight.
+    # cached=False drops the in-process cache before every request, so each one refetches.
+    queries = [{"home": e["home_team"], "away": e["away_team"], "date": slate_date(e["commence_time"])} for e in events]
+    latencies: List[float] = []
+    errors = 0
+    next_i = 0
+    fetchers.CACHE.invalidate()
+    calls_before = mock.calls
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def worker():
+            nonlocal next_i, errors
+            while next_i < n_requests:
+                i = next_i
+                next_i += 1
+                if not cached:
+                    fetchers.CACHE.invalidate()
+                t0 = time.perf_counter()
+                r = await client.get("/analyze", params=queries[i % len(queries)])
+                latencies.append(time.perf_counter() - t0)
+                if r.status_code != 200:
+                    errors += 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t0
+
+    return {
+        "board_events": len(events), "concurrency": concurrency, "mode": "cached" if cached else "uncached",
+        "requests": n_requests, "errors": errors, "upstream_calls": mock.calls - calls_before,
+        "rps": round(n_requests / wall, 1), **_percentiles(latencies),
+    }
+
+async def run_load(board_sizes: List[int], concurrency: List[int], n_requests: int, n_uncached: int, latency_s: float,
+                   modes: List[str], fixtures: Optional[str]) -> List[Dict[str, Any]]:
+    import main
+    mock = MockUpstreams(latency_s)
+    results = []
+    async with main.lifespan(main.app):
+        # Swap the real upstream clients for ones backed by the mock transport.
+        main.app.state.teams_task.cancel()
+        await main.app.state.cfbd_http.aclose()
+        await main.app.state.odds_http.aclose()
+        main.app.state.cfbd_http = fetchers.cfbd_upstream(transport=mock.transport)
+        main.app.state.odds_http = fetchers.odds_upstream(transport=mock.transport)
+        boards = [recorded_payloads(fixtures)] if fixtures else [synthetic_payloads(n) for n in board_sizes]
+        for payloads in boards:
+            mock.payloads = payloads
+            for mode in modes:
+                for c in concurrency:
+                    cached = mode == "cached"
+                    row = await bench_analyze(main.app, mock, payloads["odds"], c, n_requests if cached else n_uncached, cached)
+                    results.append(row)
+                    print(f"/analyze  events={row['board_events']:<5} c={c:<4} {row['mode']:<9} "
+                          f"rps={row['rps']:<9} p50={row['p50_ms']}ms p95={row['p95_ms']}ms p99={row['p99_ms']}ms"
+                          + (f" errors={row['errors']}" if row["errors"] else ""), file=sys.stderr)
+    return results
+
+# ========= Microbenchmarks =========
+
+def micro(fn: Callable[[], Any], repeat: int = 5) -> Dict[str, Any]:
+    # Best of `repeat` timings, each long enough (autorange) to swamp timer overhead.
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=loops))
+    return {"ns_per_op": round(best / loops * 1e9, 1), "loops": loops}
+
+def run_micro(cfg_raw: Dict[str, Any], board_sizes: List[int]) -> Dict[str, Dict[str, Any]]:
+    cfg = compile_config(cfg_raw)
+    payloads = synthetic_payloads(max(board_sizes + [64]), n_books=len(BOOKS))
+    events = payloads["odds"]
+    event = events[0]
+    # Primary book last, so select_book_line scans the whole list.
+    event_tail = dict(event, bookmakers=[b for b in event["bookmakers"] if b["key"] != "draftkings"]
+                      + [b for b in event["bookmakers"] if b["key"] == "draftkings"])
+    home_norm = normalize_team_name(event["home_team"])
+    store = RatingsStore(2025, payloads["sp"])
+    # A team index the size of CFBD's full list (~700 schools), for the uncached fuzzy path.
+    teams = TeamIndex([{"school": f"School {i}", "mascot": MASCOTS[i % len(MASCOTS)]} for i in range(700)])
+    r = random.Random(7)
+    unit = lambda: {"rushing": r.gauss(0.1, 0.1), "passing": r.gauss(0.2, 0.15)}
+    feats = TeamFeatures(2025, {"ppa": [{"team": t, "offense": unit(), "defense": unit()} for t in store.teams]})
+    home_ids = np.array(r.choices(range(len(feats)), k=1000))
+    away_ids = np.array(r.choices(range(len(feats)), k=1000))
+    favored = home_ids % 2 == 0
+    inj = {"qb1_out": True, "rb1_out": 1, "wr1_out": 1, "ol_out_count": 2, "important_starters_out": 1}
+    situ = {"home_bye": True, "away_trap": "low", "away_b2b_road": True}
+    matchup = {"rush_adv": 1.2, "pass_adv": -0.4, "finish_adv": 0.3, "havoc_adv": 2.5}
+    explode = {"home_top_offense": True, "away_leaky_def": True, "extreme": False}
+    weather = {"wind_mph": 18.0, "precip_mm": 2.0}
+    games = [{"ratings_delta": float(i % 21) - 10, "spread_line": -3.5, "total_line": 51.5,
+              "injuries_home": inj, "situational": situ, "matchup": matchup, "explosiveness": explode,
+              "weather": weather} for i in range(1000)]
+    packed = engine.pack_games(games)
+    sim_lines = [{"spread_home": -3.5, "spread_odds_home": -110, "spread_odds_away": -110, "total": 51.5,
+                  "total_over_odds": -110, "total_under_odds": -110, "moneyline_home_odds": -160, "moneyline_away_odds": 135}] * 60
+    sim_line, sim_total = np.linspace(-14.0, 14.0, 60), np.full(60, 52.0)
+
+    out = {
+        "normalize_team_name": micro(lambda: normalize_team_name("Ohio State Buckeyes")),
+        "ratings_team_id_mascot": micro(lambda: store.team_id(event["home_team"])),
+        "team_resolve_hit": micro(lambda: TEAMS.resolve(event["home_team"])),
+        "team_resolve_fuzzy": micro(lambda: teams._resolve("Schoool 123 Tiger")),
+        "features_matchup": micro(lambda: feats.matchup(event["home_team"], event["away_team"], True)),
+        "features_pairs_1000": micro(lambda: feats.pairs(home_ids, away_ids, favored)),
+        "select_book_line": micro(lambda: select_book_line(event_tail, "DraftKings", ["FanDuel", "Caesars"])),
+        "parse_book_lines": micro(lambda: parse_book_lines(event["bookmakers"][0], home_norm)),
+        "staking_units": micro(lambda: staking_units(3.2, False, cfg)),
+        "apply_injuries": micro(lambda: apply_injuries(7.0, inj, {}, cfg)),
+        "apply_situational": micro(lambda: apply_situational(7.0, situ, cfg)),
+        "apply_matchup_efficiency": micro(lambda: apply_matchup_efficiency(7.0, matchup, cfg)),
+        "apply_explosiveness": micro(lambda: apply_explosiveness(7.0, explode, cfg, True)),
+        "apply_weather_total_adj": micro(lambda: apply_weather_total_adj(52.0, weather, cfg)),
+        "decision_from_edges": micro(lambda: decision_from_edges(3.2, -2.4, cfg)),
+        "compile_config": micro(lambda: compile_config(cfg_raw)),
+        "engine_pack_1000": micro(lambda: engine.pack_games(games)),
+        "engine_run_1000": micro(lambda: engine.run(packed, cfg)),
+        "sim_price_game": micro(lambda: sim.price_games(sim_lines[:1], sim_line[:1], sim_total[:1], cfg)),
+        "sim_price_slate_60": micro(lambda: sim.price_games(sim_lines, sim_line, sim_total, cfg)),
+    }
+    for n in board_sizes:
+        # The market-parsing loop: indexing a whole fetched board.
+        out[f"odds_board_{n}"] = micro(lambda: OddsBoard(events[:n]))
+    return out
+
+# ========= Reporting =========
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def _pct(new: float, old: float) -> str:
+    return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+def compare(new: Dict[str, Any], old: Dict[str, Any]) -> None:
+    print(f"vs {old['meta'].get('git_rev')} ({old['meta'].get('started_at')})")
+    key = lambda r: (r["board_events"], r["concurrency"], r["mode"])
+    old_rows = {key(r): r for r in old.get("analyze", [])}
+    for r in new.get("analyze", []):
+        o = old_rows.get(key(r))
+        if o:
+            print(f"/analyze events={r['board_events']:<5} c={r['concurrency']:<4} {r['mode']:<9} "
+                  f"p50 {_pct(r['p50_ms'], o['p50_ms']):>8}  p99 {_pct(r['p99_ms'], o['p99_ms']):>8}  rps {_pct(r['rps'], o['rps']):>8}")
+    for name, m in new.get("micro", {}).items():
+        o = old.get("micro", {}).get(name)
+        if o:
+            print(f"{name:<28} {m['ns_per_op']:>12} ns  {_pct(m['ns_per_op'], o['ns_per_op']):>8}")
+
+def _ints(s: str) -> List[int]:
+    return [int(x) for x in s.split(",") if x.strip()]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /analyze and the model hot paths against mocked upstreams.")
+    parser.add_argument("--board-sizes", type=_ints, default=[50, 200, 800], help="events on the mocked odds board")
+    parser.add_argument("--concurrency", type=_ints, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500, help="requests per concurrency level")
+    parser.add_argument("--uncached-requests", type=int, default=50, help="requests per level in uncached mode")
+    parser.add_argument("--modes", default="cached,uncached")
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0)
+    parser.add_argument("--fixtures", help="directory with recorded odds.json and sp.json")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--out", default=os.path.join(APP_DIR, "bench_results.json"))
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {"meta": {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "git_rev": _git_rev(),
+        "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+    }}
+    if not args.skip_load:
+        modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+        report["analyze"] = asyncio.run(run_load(args.board_sizes, args.concurrency, args.requests, args.uncached_requests,
+                                                 args.upstream_latency_ms / 1000.0, modes, args.fixtures))
+    if not args.skip_micro:
+        report["micro"] = run_micro(load_config(os.path.join(APP_DIR, "config.yaml")), args.board_sizes)
+        for name, m in report["micro"].items():
+            print(f"{name:<28} {m['ns_per_op']:>12} ns/op", file=sys.stderr)
+
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}", file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+if __name__ == "__main__":
+    main()
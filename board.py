@@ -0,0 +1,429 @@
+import itertools
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
+
+from model import normalize_team_name
+from teams import TEAMS
+from utils import to_float, parse_kickoff
+
+def parse_book_lines(book: Dict[str, Any], home_norm: str, away_norm: Optional[str] = None) -> Dict[str, Any]:
+    lines = {
+        "book": book.get("title") or book.get("key") or "unknown",
+        "spread_home": None,
+        "spread_odds_home": None,
+        "spread_odds_away": None,
+        "total": None,
+        "total_over_odds": None,
+        "total_under_odds": None,
+        "moneyline_home_odds": None,
+        "moneyline_away_odds": None,
+    }
+    for m in book.get("markets", []):
+        key = m.get("key") or m.get("market_key") or ""
+        if "spreads" in key:
+            for out in m.get("outcomes", []):
+                name = normalize_team_name(out.get("name",""))
+                if name == home_norm:
+                    lines["spread_home"] = to_float(out.get("point"))
+                    lines["spread_odds_home"] = int(out.get("price", -110))
+                elif name == away_norm:
+                    lines["spread_odds_away"] = int(out.get("price", -110))
+        elif "totals" in key:
+            for out in m.get("outcomes", []):
+                if out.get("name","").lower().startswith("over"):
+                    lines["total"] = to_float(out.get("point"))
+                    lines["total_over_odds"] = int(out.get("price", -110))
+                elif out.get("name","").lower().startswith("under"):
+                    lines["total_under_odds"] = int(out.get("price", -110))
+        elif key in ("h2h","moneyline"):
+            for out in m.get("outcomes", []):
+                name = normalize_team_name(out.get("name",""))
+                if name == home_norm:
+                    lines["moneyline_home_odds"] = int(out.get("price", -110))
+                elif name == away_norm:
+                    lines["moneyline_away_odds"] = int(out.get("price", -110))
+    return lines
+
+EMPTY_LINES = parse_book_lines({}, "")
+
+# Market kinds and outcome sides for the quote columns.
+OTHER, SPREADS, TOTALS, H2H = 0, 1, 2, 3
+NO_SIDE, HOME, AWAY, OVER, UNDER = 0, 1, 2, 3, 4
+# Line grids: name -> (market kind, side, column). Same fields parse_book_lines reads, plus the
+# away/under sides for best-price lookups.
+GRIDS = {
+    "spread_home": (SPREADS, HOME, "point"),
+    "spread_price_home": (SPREADS, HOME, "price"),
+    "spread_away": (SPREADS, AWAY, "point"),
+    "spread_price_away": (SPREADS, AWAY, "price"),
+    "total": (TOTALS, OVER, "point"),
+    "over_price": (TOTALS, OVER, "price"),
+    "under_price": (TOTALS, UNDER, "price"),
+    "ml_home": (H2H, HOME, "price"),
+    "ml_away": (H2H, AWAY, "price"),
+}
+# Best-price lookups: name -> (price grid, point grid or None).
+PRICES = {
+    "spread_home": ("spread_price_home", "spread_home"),
+    "spread_away": ("spread_price_away", "spread_away"),
+    "over": ("over_price", "total"),
+    "under": ("under_price", "total"),
+    "ml_home": ("ml_home", None),
+    "ml_away": ("ml_away", None),
+}
+
+def _market_kind(key: str) -> int:
+    # Same tests as parse_book_lines.
+    if "spreads" in key:
+        return SPREADS
+    if "totals" in key:
+        return TOTALS
+    return H2H if key in ("h2h", "moneyline") else OTHER
+
+def _price(x: Any) -> int:
+    # 0 stands for "no price"; American odds are never 0.
+    try:
+        return int(x)
+    except (TypeError, ValueError):
+        return 0
+
+def _or_none(x: float) -> Optional[float]:
+    return None if x != x else float(x)
+
+# One fetched odds board, parsed once into columns. Every quote is a row of
+# (event, book, market, outcome, point, price) with interned ids, and the lines the model
+# reads sit in (event x book) grids, so whole-board questions (selected book, best price,
+# consensus) are array operations. Built once per snapshot; requests never rescan the JSON.
+_SERIALS = itertools.count(1)
+
+class OddsBoard:
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.events = events
+        # Distinct per built board in this process; identifies the odds a response was computed from.
+        self.serial = next(_SERIALS)
+        self.by_pair: Dict[Tuple[str, str], int] = {}
+        self.by_team: Dict[str, List[int]] = {}
+        # Per event: book keys, parallel to event["bookmakers"].
+        self.book_keys: List[List[str]] = []
+        # Kickoff per event as epoch seconds (None when missing or unparseable).
+        self.kickoffs: List[Optional[float]] = []
+        self._selected: Dict[Tuple[Optional[str], Tuple[str, ...]], np.ndarray] = {}
+        self._lines: Dict[Tuple[Optional[str], Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        self._memo: Dict[Tuple[str, Tuple[str, ...]], Any] = {}
+        self._quotes: Optional[Dict[Tuple[str, str, str, str], Tuple[Any, Any]]] = None
+        # Stable per-event key across snapshots (Odds API event id, else the matchup).
+        self.keys: List[str] = []
+        self.by_key: Dict[str, int] = {}
+
+        # Interned ids. Books are (key, title) pairs so a relabelled book can't borrow another's title.
+        self.books: List[Tuple[str, str]] = []
+        self.market_names: List[str] = []
+        self.outcome_names: List[str] = []
+        book_ids: Dict[Tuple[str, str], int] = {}
+        market_ids: Dict[str, int] = {}
+        outcome_ids: Dict[str, int] = {}
+        # Per event: book id at each position of event["bookmakers"].
+        self.event_books: List[List[int]] = []
+
+        q_event: List[int] = []
+        q_book: List[int] = []
+        q_pos: List[int] = []
+        q_market: List[int] = []
+        q_kind: List[int] = []
+        q_outcome: List[int] = []
+        q_side: List[int] = []
+        q_point: List[float] = []
+        q_price: List[int] = []
+        eb_event: List[int] = []
+        eb_book: List[int] = []
+        eb_pos: List[int] = []
+        eb_markets: List[int] = []
+        nan = float("nan")
+
+        for i, e in enumerate(events):
+            key = e.get("id") or f'{e.get("away_team","")}@{e.get("home_team","")}'
+            self.keys.append(key)
+            self.by_key.setdefault(key, i)
+            # Sides match on the canonical team (teams.TEAMS); outcome names stay as the book spells them.
+            home = TEAMS.key(e.get("home_team",""))
+            away = TEAMS.key(e.get("away_team",""))
+            kickoff = parse_kickoff(e.get("commence_time", ""))
+            self.kickoffs.append(kickoff.timestamp() if kickoff else None)
+            books = e.get("bookmakers", [])
+            keys = [b.get("key") or b.get("title") or str(j) for j, b in enumerate(books)]
+            self.book_keys.append(keys)
+            ids = []
+            for j, b in enumerate(books):
+                label = (b.get("key") or "", b.get("title") or "")
+                bid = book_ids.get(label)
+                if bid is None:
+                    bid = book_ids[label] = len(self.books)
+                    self.books.append(label)
+                ids.append(bid)
+                markets = b.get("markets", [])
+                eb_event.append(i)
+                eb_book.append(bid)
+                eb_pos.append(j)
+                eb_markets.append(len(markets))
+                for m in markets:
+                    mkey = m.get("key") or m.get("market_key") or ""
+                    mid = market_ids.get(mkey)
+                    if mid is None:
+                        mid = market_ids[mkey] = len(self.market_names)
+                        self.market_names.append(mkey)
+                    kind = _market_kind(mkey)
+                    for out in m.get("outcomes", []):
+                        raw = out.get("name","")
+                        name = normalize_team_name(raw)
+                        oid = outcome_ids.get(name)
+                        if oid is None:
+                            oid = outcome_ids[name] = len(self.outcome_names)
+                            self.outcome_names.append(name)
+                        if kind == TOTALS:
+                            side = OVER if raw.lower().startswith("over") else UNDER if raw.lower().startswith("under") else NO_SIDE
+                        elif kind != OTHER:
+                            team = TEAMS.key(raw)
+                            side = HOME if team == home else AWAY if team == away else NO_SIDE
+                        else:
+                            side = NO_SIDE
+                        point = out.get("point")
+                        q_event.append(i)
+                        q_book.append(bid)
+                        q_pos.append(j)
+                        q_market.append(mid)
+                        q_kind.append(kind)
+                        q_outcome.append(oid)
+                        q_side.append(side)
+                        q_point.append(nan if point is None else to_float(point, nan))
+                        q_price.append(_price(out.get("price")))
+            self.event_books.append(ids)
+
+        # Quote columns.
+        self.q_event = np.array(q_event, dtype=np.int32)
+        self.q_book = np.array(q_book, dtype=np.int16)
+        self.q_pos = np.array(q_pos, dtype=np.int16)
+        self.q_market = np.array(q_market, dtype=np.int16)
+        self.q_kind = np.array(q_kind, dtype=np.int8)
+        self.q_outcome = np.array(q_outcome, dtype=np.int32)
+        self.q_side = np.array(q_side, dtype=np.int8)
+        self.q_point = np.array(q_point, dtype=np.float64)
+        self.q_price = np.array(q_price, dtype=np.int32)
+
+        # (event x book) grids; NaN where the book has no such quote for the event.
+        shape = (len(events), len(self.books))
+        ev, bk = np.array(eb_event, dtype=np.intp), np.array(eb_book, dtype=np.intp)
+        self.present = np.zeros(shape, dtype=bool)
+        self.present[ev, bk] = True
+        # Position in event["bookmakers"] and market count, for select_book_line's preference order.
+        self.position = np.full(shape, np.iinfo(np.int32).max, dtype=np.int32)
+        self.position[ev, bk] = eb_pos
+        self.market_count = np.zeros(shape, dtype=np.int32)
+        self.market_count[ev, bk] = eb_markets
+        self.grids: Dict[str, np.ndarray] = {}
+        for name, (kind, side, column) in GRIDS.items():
+            grid = np.full(shape, np.nan)
+            rows = np.flatnonzero((self.q_kind == kind) & (self.q_side == side))
+            if column == "point":
+                # parse_book_lines reads a missing point as 0.0.
+                values = np.nan_to_num(self.q_point[rows], nan=0.0)
+            else:
+                # ... and a missing price as -110.
+                values = np.where(self.q_price[rows] == 0, -110, self.q_price[rows]).astype(np.float64)
+            # Later quotes overwrite earlier ones, as in parse_book_lines.
+            grid[self.q_event[rows], self.q_book[rows]] = values
+            self.grids[name] = grid
+        self._index_teams()
+
+    def _index_teams(self) -> None:
+        # Events by canonical team (teams.TEAMS), rebuilt if the team index reloads later.
+        self.by_pair = {}
+        self.by_team = {}
+        self._teams_version = TEAMS.version
+        for i, e in enumerate(self.events):
+            home = TEAMS.key(e.get("home_team","")) if e.get("home_team") else ""
+            teams = {TEAMS.key(t) for t in e.get("teams",[])}
+            if e.get("away_team"):
+                teams.add(TEAMS.key(e["away_team"]))
+            if home:
+                teams.add(home)
+            for t in teams:
+                self.by_team.setdefault(t, []).append(i)
+                if t != home:
+                    self.by_pair.setdefault((home, t), i)
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def find(self, home: str, away: str) -> Optional[int]:
+        if self._teams_version != TEAMS.version:
+            self._index_teams()
+        return self.by_pair.get((TEAMS.key(home), TEAMS.key(away)))
+
+    def events_for_team(self, team: str) -> List[int]:
+        if self._teams_version != TEAMS.version:
+            self._index_teams()
+        return self.by_team.get(TEAMS.key(team), [])
+
+    def book_mask(self, keywords: Optional[list]) -> np.ndarray:
+        # Books whose "key title" contains any keyword (case-insensitive), as in select_book_line.
+        words = [k.lower() for k in keywords or [] if k]
+        return np.array([any(w in f"{key} {title}".lower() for w in words) for key, title in self.books], dtype=bool)
+
+    def selected_books(self, primary_keyword: Optional[str], allowed_books: Optional[list]) -> np.ndarray:
+        # Book id per event (-1: no books), picked for every event at once with select_book_line's
+        # rules: first primary-keyword book, else first allowed book, else the one with most markets.
+        memo_key = (primary_keyword, tuple(allowed_books or ()))
+        chosen = self._selected.get(memo_key)
+        if chosen is not None:
+            return chosen
+        chosen = np.full(len(self.events), -1, dtype=np.intp)
+        if self.books:
+            rows = np.arange(len(self.events))
+            never = np.iinfo(np.int32).max
+            for mask in (self.book_mask([primary_keyword]), self.book_mask(allowed_books)):
+                pos = np.where(self.present & mask, self.position, never)
+                first = pos.argmin(axis=1)
+                pick = (chosen < 0) & (pos[rows, first] != never)
+                chosen[pick] = first[pick]
+            # Most markets, earliest position on ties.
+            rank = np.where(self.present, self.market_count.astype(np.int64) * (never + 1) - self.position, -1)
+            best = rank.argmax(axis=1)
+            pick = (chosen < 0) & self.present.any(axis=1)
+            chosen[pick] = best[pick]
+        self._selected[memo_key] = chosen
+        return chosen
+
+    def select_book(self, idx: int, primary_keyword: Optional[str], allowed_books: Optional[list]) -> Optional[int]:
+        # Position in event["bookmakers"] of the selected book.
+        bid = self.selected_books(primary_keyword, allowed_books)[idx]
+        return int(self.position[idx, bid]) if bid >= 0 else None
+
+    def outcome_name(self, idx: int, pos: int, kind: int, side: int) -> Optional[str]:
+        # Interned outcome name (as in quotes()) the book at `pos` uses for a side, e.g. (SPREADS, HOME).
+        rows = np.flatnonzero((self.q_event == idx) & (self.q_pos == pos) & (self.q_kind == kind) & (self.q_side == side))
+        return self.outcome_names[self.q_outcome[rows[-1]]] if len(rows) else None
+
+    def selected_lines(self, idx: Optional[int], primary_keyword: Optional[str], allowed_books: Optional[list]) -> Dict[str, Any]:
+        if idx is None:
+            return dict(EMPTY_LINES)
+        memo_key = (primary_keyword, tuple(allowed_books or ()))
+        lines = self._lines.get(memo_key)
+        if lines is None:
+            # Every event's selected lines in one pass over the columns.
+            cols = {k: v.tolist() for k, v in self.selected_columns(primary_keyword, allowed_books).items()}
+            bids = self.selected_books(primary_keyword, allowed_books).tolist()
+            lines = self._lines[memo_key] = [
+                {
+                    "book": self.books[b][1] or self.books[b][0] or "unknown",
+                    "spread_home": _or_none(sh),
+                    "spread_odds_home": None if sp != sp else int(sp),
+                    "spread_odds_away": None if sa != sa else int(sa),
+                    "total": _or_none(t),
+                    "total_over_odds": None if op != op else int(op),
+                    "total_under_odds": None if up != up else int(up),
+                    "moneyline_home_odds": None if ml != ml else int(ml),
+                    "moneyline_away_odds": None if ma != ma else int(ma),
+                } if b >= 0 else EMPTY_LINES
+                for b, sh, sp, sa, t, op, up, ml, ma in zip(bids, cols["spread_home"], cols["spread_price_home"], cols["spread_price_away"],
+                                                            cols["total"], cols["over_price"], cols["under_price"], cols["ml_home"], cols["ml_away"])
+            ]
+        return dict(lines[idx])
+
+    def selected_columns(self, primary_keyword: Optional[str], allowed_books: Optional[list]) -> Dict[str, np.ndarray]:
+        # Every grid at each event's selected book: (n_events,) arrays, NaN where missing.
+        bid = self.selected_books(primary_keyword, allowed_books)
+        rows = np.arange(len(self.events))
+        ok = bid >= 0
+        out = {}
+        for name, grid in self.grids.items():
+            col = np.full(len(self.events), np.nan)
+            col[ok] = grid[rows[ok], bid[ok]]
+            out[name] = col
+        return out
+
+    def _allowed(self, allowed_books: Optional[list]) -> np.ndarray:
+        return self.book_mask(allowed_books) if allowed_books else np.ones(len(self.books), dtype=bool)
+
+    def best_prices(self, allowed_books: Optional[list] = None) -> Dict[str, Dict[str, np.ndarray]]:
+        # Best (highest) American price per event and side among allowed books (all when None),
+        # with its point and book id; NaN / -1 where no allowed book quotes it. Spread and total
+        # prices are compared as quoted, whatever point they come with.
+        memo_key = ("best", tuple(allowed_books or ()))
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        rows = np.arange(len(self.events))
+        mask = self._allowed(allowed_books)
+        out = {}
+        for name, (price_grid, point_grid) in PRICES.items():
+            prices = np.where(mask, np.nan_to_num(self.grids[price_grid], nan=-np.inf), -np.inf)
+            if self.books:
+                book = prices.argmax(axis=1)
+                has = np.isfinite(prices[rows, book])
+            else:
+                book, has = np.zeros(len(rows), dtype=np.intp), np.zeros(len(rows), dtype=bool)
+            best = {"price": np.full(len(rows), np.nan), "book": np.where(has, book, -1)}
+            best["price"][has] = prices[rows[has], book[has]]
+            if point_grid is not None:
+                best["point"] = np.full(len(rows), np.nan)
+                best["point"][has] = self.grids[point_grid][rows[has], book[has]]
+            out[name] = best
+        self._memo[memo_key] = out
+        return out
+
+    def consensus(self, allowed_books: Optional[list] = None) -> Dict[str, np.ndarray]:
+        # Median home spread and total across books per event, and how many books went into it.
+        memo_key = ("consensus", tuple(allowed_books or ()))
+        if memo_key in self._memo:
+            return self._memo[memo_key]
+        mask = self._allowed(allowed_books)
+        out = {}
+        for name in ("spread_home", "total"):
+            grid = np.where(mask, self.grids[name], np.nan)
+            count = (~np.isnan(grid)).sum(axis=1)
+            col = np.full(len(self.events), np.nan)
+            has = count > 0
+            if has.any():
+                col[has] = np.nanmedian(grid[has], axis=1)
+            out[name] = col
+            out[f"{name}_books"] = count
+        self._memo[memo_key] = out
+        return out
+
+    def quotes(self) -> Dict[Tuple[str, str, str, str], Tuple[Any, Any]]:
+        # Flat (event, book, market, outcome) -> (point, price), built on first use.
+        if self._quotes is None:
+            points = [None if p != p else p for p in self.q_point.tolist()]
+            prices = [p or None for p in self.q_price.tolist()]
+            self._quotes = {
+                (self.keys[i], self.book_keys[i][j], self.market_names[m], self.outcome_names[o]): (pt, pr)
+                for i, j, m, o, pt, pr in zip(self.q_event.tolist(), self.q_pos.tolist(), self.q_market.tolist(),
+                                              self.q_outcome.tolist(), points, prices)
+            }
+        return self._quotes
+
+class BoardDiff:
+    def __init__(self, changed: Dict[Tuple[str, str, str, str], Tuple[Any, Any]], removed: List[Tuple[str, str, str, str]],
+                 added_events: List[str], removed_events: List[str]):
+        self.changed = changed
+        self.removed = removed
+        self.added_events = added_events
+        self.removed_events = removed_events
+
+    @property
+    def events(self) -> set:
+        # Events present in the new board with any quote added, moved or pulled.
+        touched = {k[0] for k in self.changed} | {k[0] for k in self.removed}
+        return (touched | set(self.added_events)) - set(self.removed_events)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed or self.removed or self.added_events or self.removed_events)
+
+def diff_boards(prev: Optional[OddsBoard], cur: OddsBoard) -> BoardDiff:
+    old = prev.quotes() if prev is not None else {}
+    new = cur.quotes()
+    changed = {k: v for k, v in new.items() if old.get(k) != v}
+    removed = [k for k in old if k not in new]
+    old_events = set(prev.by_key) if prev is not None else set()
+    new_events = set(cur.by_key)
+    return BoardDiff(changed, removed, sorted(new_events - old_events), sorted(old_events - new_events))
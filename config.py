@@ -0,0 +1,240 @@
+import os
+import json
+import time
+import copy
+import hashlib
+import logging
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple, Union
+
+import yaml
+
+log = logging.getLogger(__name__)
+
+CONFIG_CHECK_S = float(os.getenv("CONFIG_CHECK_S", "1"))
+
+# config.yaml compiled into flat, typed, read-only fields. The model reads these directly
+# instead of walking nested dicts on every call.
+@dataclass(frozen=True, slots=True)
+class ModelConfig:
+    version: str
+    raw: Dict[str, Any]
+
+    base_hfa_pts: float
+
+    qb1_out_pts: float
+    qb1_limited_pts: float
+    qb2_good_addback_pts: float
+    rb1_out_pts: float
+    wr1_out_pts: float
+    ol_top_out_pts: float
+    important_starter_out_pts: float
+    cluster_same_unit_threshold: float
+    cluster_same_unit_bonus_pts: float
+
+    bye_week_bonus_pts: float
+    trap_game_penalty_pts_low: float
+    trap_game_penalty_pts_high: float
+    b2b_road_penalty_pts: float
+    longhaul_altitude_penalty_pts: float
+
+    max_nudge_pts: float
+
+    use_big_plays: bool
+    boost_pts_moderate: float
+    boost_pts_extreme: float
+    penalty_pts_def_leaky: float
+
+    weather_trigger_only: bool
+    wind_threshold_mph: float
+    wind_total_adjust_low: float
+    wind_total_adjust_high: float
+    precip_total_adjust_low: float
+    precip_total_adjust_high: float
+
+    big_edge_spread_pts: float
+    big_edge_total_pts: float
+    small_units: int
+    big_units: int
+    small_spread_edge_min: float
+    small_total_edge_min: float
+    moneyline_ev_min: float
+
+    sim_distribution: str
+    sim_t_df: float
+    sim_margin_sd: float
+    sim_total_sd: float
+    sim_key_3: float
+    sim_key_7: float
+
+def _num(cfg: dict, *path: str) -> float:
+    node: Any = cfg
+    for p in path:
+        if not isinstance(node, dict) or p not in node:
+            raise ValueError(f"config is missing {'.'.join(path)}")
+        node = node[p]
+    if isinstance(node, bool) or not isinstance(node, (int, float)):
+        raise ValueError(f"config {'.'.join(path)} must be a number, got {node!r}")
+    return float(node)
+
+def config_version(cfg: dict) -> str:
+    # Content hash, so every worker that loads the same settings reports the same id.
+    return hashlib.sha1(json.dumps(cfg, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+# ModelConfig field -> where it lives in config.yaml.
+FIELD_PATHS: Dict[str, Tuple[str, ...]] = {
+    "base_hfa_pts": ("home_field", "base_hfa_pts"),
+    "qb1_out_pts": ("injuries", "qb1_out_pts"),
+    "qb1_limited_pts": ("injuries", "qb1_limited_pts"),
+    "qb2_good_addback_pts": ("injuries", "qb2_good_addback_pts"),
+    "rb1_out_pts": ("injuries", "rb1_out_pts"),
+    "wr1_out_pts": ("injuries", "wr1_out_pts"),
+    "ol_top_out_pts": ("injuries", "ol_top_out_pts"),
+    "important_starter_out_pts": ("injuries", "important_starter_out_pts"),
+    "cluster_same_unit_threshold": ("injuries", "cluster_same_unit_threshold"),
+    "cluster_same_unit_bonus_pts": ("injuries", "cluster_same_unit_bonus_pts"),
+    "bye_week_bonus_pts": ("situational", "bye_week_bonus_pts"),
+    "trap_game_penalty_pts_low": ("situational", "trap_game_penalty_pts_low"),
+    "trap_game_penalty_pts_high": ("situational", "trap_game_penalty_pts_high"),
+    "b2b_road_penalty_pts": ("situational", "b2b_road_penalty_pts"),
+    "longhaul_altitude_penalty_pts": ("situational", "longhaul_altitude_penalty_pts"),
+    "max_nudge_pts": ("matchups", "max_nudge_pts"),
+    "boost_pts_moderate": ("explosiveness", "boost_pts_moderate"),
+    "boost_pts_extreme": ("explosiveness", "boost_pts_extreme"),
+    "penalty_pts_def_leaky": ("explosiveness", "penalty_pts_def_leaky"),
+    "wind_threshold_mph": ("weather", "wind_threshold_mph"),
+    "wind_total_adjust_low": ("weather", "wind_total_adjust_low"),
+    "wind_total_adjust_high": ("weather", "wind_total_adjust_high"),
+    "precip_total_adjust_low": ("weather", "precip_total_adjust_low"),
+    "precip_total_adjust_high": ("weather", "precip_total_adjust_high"),
+    "big_edge_spread_pts": ("risk", "big_edge_spread_pts"),
+    "big_edge_total_pts": ("risk", "big_edge_total_pts"),
+    "small_units": ("risk", "unit_rules", "small", "units"),
+    "big_units": ("risk", "unit_rules", "big", "units"),
+    "small_spread_edge_min": ("risk", "unit_rules", "small", "spread_edge_min"),
+    "small_total_edge_min": ("risk", "unit_rules", "small", "total_edge_min"),
+    "moneyline_ev_min": ("risk", "moneyline_ev_min"),
+    "sim_t_df": ("simulation", "t_df"),
+    "sim_margin_sd": ("simulation", "margin_sd"),
+    "sim_total_sd": ("simulation", "total_sd"),
+    "sim_key_3": ("simulation", "key_3_weight"),
+    "sim_key_7": ("simulation", "key_7_weight"),
+}
+SIM_DISTRIBUTIONS = ("normal", "t")
+INT_FIELDS = ("small_units", "big_units")
+
+def compile_config(cfg: dict) -> ModelConfig:
+    use_big_plays = bool((cfg.get("explosiveness") or {}).get("use_big_plays", False))
+    trigger_only = bool((cfg.get("weather") or {}).get("trigger_only", False))
+    switches = {"explosiveness": use_big_plays, "weather": trigger_only}
+    distribution = str((cfg.get("simulation") or {}).get("distribution", "normal"))
+    if distribution not in SIM_DISTRIBUTIONS:
+        raise ValueError(f"config simulation.distribution must be one of {', '.join(SIM_DISTRIBUTIONS)}, got {distribution!r}")
+    values: Dict[str, Any] = {}
+    for field, path in FIELD_PATHS.items():
+        # Unused sections may be incomplete; only validate what the model will read.
+        if not switches.get(path[0], True):
+            values[field] = 0.0
+            continue
+        v = _num(cfg, *path)
+        values[field] = int(v) if field in INT_FIELDS else v
+    if distribution == "t" and values["sim_t_df"] <= 2:
+        raise ValueError("config simulation.t_df must be above 2")
+    if values["sim_margin_sd"] <= 0 or values["sim_total_sd"] <= 0:
+        raise ValueError("config simulation.margin_sd and total_sd must be positive")
+    return ModelConfig(version=config_version(cfg), raw=cfg, use_big_plays=use_big_plays,
+                       weather_trigger_only=trigger_only, sim_distribution=distribution, **values)
+
+def field_for(name: str) -> str:
+    # Accepts a ModelConfig field ("base_hfa_pts") or its config.yaml path ("home_field.base_hfa_pts").
+    if name in FIELD_PATHS:
+        return name
+    path = tuple(name.split("."))
+    for field, p in FIELD_PATHS.items():
+        if p == path:
+            return field
+    raise ValueError(f"unknown config setting: {name}")
+
+def as_config(cfg: Union[ModelConfig, dict]) -> ModelConfig:
+    # Hot paths pass a ModelConfig, compiled once where the config is loaded (ConfigManager,
+    # the backtest and sweep entry points). A plain dict is compiled on every call.
+    return cfg if isinstance(cfg, ModelConfig) else compile_config(cfg)
+
+def deep_merge(base: dict, overrides: dict) -> dict:
+    out = copy.deepcopy(base)
+    for k, v in overrides.items():
+        if isinstance(v, dict) and isinstance(out.get(k), dict):
+            out[k] = deep_merge(out[k], v)
+        else:
+            out[k] = v
+    return out
+
+def _load_yaml(path: str) -> Tuple[Optional[int], dict]:
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None, {}
+    with open(path, "r") as f:
+        return mtime, yaml.safe_load(f) or {}
+
+# Holds the live ModelConfig: config.yaml with the /config form overrides layered on top.
+# Readers call get(), which notices edits to either file (checked at most every
+# CONFIG_CHECK_S) and swaps in the recompiled config with one reference assignment.
+class ConfigManager:
+    def __init__(self, path: str, overrides_path: Optional[str] = None):
+        self.path = path
+        self.overrides_path = overrides_path
+        self._mtimes, base, overrides = self._read()
+        self.overrides = overrides
+        self.current = compile_config(deep_merge(base, overrides))
+        self._checked_at = time.monotonic()
+
+    def _read(self) -> Tuple[Tuple[Optional[int], Optional[int]], dict, dict]:
+        base_mtime, base = _load_yaml(self.path)
+        if base_mtime is None:
+            raise FileNotFoundError(self.path)
+        over_mtime, overrides = _load_yaml(self.overrides_path) if self.overrides_path else (None, {})
+        return (base_mtime, over_mtime), base, overrides
+
+    def get(self) -> ModelConfig:
+        now = time.monotonic()
+        if now - self._checked_at >= CONFIG_CHECK_S:
+            self._checked_at = now
+            self._reload_if_changed()
+        return self.current
+
+    def _reload_if_changed(self) -> None:
+        try:
+            base_mtime = os.stat(self.path).st_mtime_ns
+            over_mtime = None
+            if self.overrides_path and os.path.exists(self.overrides_path):
+                over_mtime = os.stat(self.overrides_path).st_mtime_ns
+            if (base_mtime, over_mtime) == self._mtimes:
+                return
+            # Remember the attempt either way, so a bad file is reported once, not on every check.
+            self._mtimes = (base_mtime, over_mtime)
+            mtimes, base, overrides = self._read()
+            compiled = compile_config(deep_merge(base, overrides))
+            self._mtimes, self.overrides = mtimes, overrides
+            self.current = compiled
+            log.info("config reloaded: %s", compiled.version)
+        except Exception:
+            # A half-written or invalid file keeps the last good config live.
+            log.exception("config reload failed; keeping %s", self.current.version)
+
+    def update(self, overrides: dict) -> ModelConfig:
+        # Validate first; nothing changes if the merged config doesn't compile.
+        merged_overrides = deep_merge(self.overrides, overrides)
+        _, base, _ = self._read()
+        compiled = compile_config(deep_merge(base, merged_overrides))
+        if self.overrides_path:
+            # Atomic replace, so other workers see the old file or the new one, never a partial write.
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.overrides_path)), suffix=".yaml")
+            with os.fdopen(fd, "w") as f:
+                yaml.safe_dump(merged_overrides, f, sort_keys=False)
+            os.replace(tmp, self.overrides_path)
+            self._mtimes = (os.stat(self.path).st_mtime_ns, os.stat(self.overrides_path).st_mtime_ns)
+        self.overrides = merged_overrides
+        self.current = compiled
+        return compiled
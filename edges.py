@@ -0,0 +1,175 @@
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+
+from board import OddsBoard, diff_boards
+from config import ModelConfig
+from ratings import RatingsStore
+from features import TeamFeatures
+from schedule import ScheduleIndex
+from weather import WeatherService
+from analysis import matchup_inputs, run_model_batch
+from utils import season_of, slate_date
+
+log = logging.getLogger(__name__)
+
+# Materialized edges for every game on the board. Each new odds snapshot is diffed
+# against the last one; only events whose selected-book lines moved are re-run.
+class EdgeTable:
+    def __init__(self, config: Callable[[], ModelConfig], primary_book_kw: Optional[str], allowed_books: Optional[list],
+                 load_ratings: Callable[[int], Awaitable[Optional[RatingsStore]]],
+                 load_features: Optional[Callable[[int], Awaitable[Optional[TeamFeatures]]]] = None,
+                 load_schedule: Optional[Callable[[int], Awaitable[Optional[ScheduleIndex]]]] = None,
+                 weather: Optional[WeatherService] = None):
+        # Returns the live config (ConfigManager.get); a new version re-runs every game.
+        self.config = config
+        self.config_version: Optional[str] = None
+        self.primary_book_kw = primary_book_kw
+        self.allowed_books = allowed_books
+        self.load_ratings = load_ratings
+        self.load_features = load_features
+        self.load_schedule = load_schedule
+        # Warmed for the whole board on every snapshot; games are computed from its cache.
+        self.weather = weather
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.version = 0
+        self.last_changed: List[str] = []
+        # Called with the change events of each update, e.g. EdgeBroadcaster.publish.
+        self.listeners: List[Callable[[List[Dict[str, Any]]], None]] = []
+        self._board: Optional[OddsBoard] = None
+        self._ratings_used: Dict[int, Optional[RatingsStore]] = {}
+        self._features_used: Dict[int, Optional[TeamFeatures]] = {}
+        self._schedules_used: Dict[int, Optional[ScheduleIndex]] = {}
+        self._weather_used: Dict[str, Dict[str, float]] = {}
+
+    def _season(self, board: OddsBoard, idx: int) -> int:
+        kickoff = board.kickoffs[idx]
+        dt = datetime.fromtimestamp(kickoff, tz=timezone.utc) if kickoff else datetime.now(timezone.utc)
+        return season_of(dt)
+
+    def _game(self, board: OddsBoard, idx: int):
+        e = board.events[idx]
+        return e.get("home_team",""), e.get("away_team",""), slate_date(e.get("commence_time","")) or ""
+
+    def _weather_slot(self, board: OddsBoard, idx: int, schedules: Dict[int, Optional[ScheduleIndex]]):
+        return self.weather.slot(schedules.get(self._season(board, idx)), board, *self._game(board, idx))
+
+    def _compute(self, board: OddsBoard, keys: List[str], ratings: Dict[int, Optional[RatingsStore]],
+                 features: Dict[int, Optional[TeamFeatures]], schedules: Dict[int, Optional[ScheduleIndex]],
+                 weather: Dict[str, Dict[str, float]], cfg: ModelConfig) -> Dict[str, Dict[str, Any]]:
+        games = []
+        for key in keys:
+            idx = board.by_key[key]
+            season = self._season(board, idx)
+            games.append(matchup_inputs(*self._game(board, idx), board, ratings.get(season), self.primary_book_kw, self.allowed_books,
+                                        features=features.get(season), schedule=schedules.get(season), weather=weather.get(key)))
+        return dict(zip(keys, run_model_batch(games, cfg)))
+
+    def update(self, board: OddsBoard, ratings: Dict[int, Optional[RatingsStore]], version: int,
+               features: Optional[Dict[int, Optional[TeamFeatures]]] = None,
+               schedules: Optional[Dict[int, Optional[ScheduleIndex]]] = None) -> List[str]:
+        prev = self._board
+        cfg = self.config()
+        reconfigured = cfg.version != self.config_version
+        features = features if features is not None else dict(self._features_used)
+        schedules = schedules if schedules is not None else dict(self._schedules_used)
+        # New ratings, features or schedule for a season invalidate every game in it; otherwise only moved events are dirty.
+        stale_seasons = {y for y, store in ratings.items() if self._ratings_used.get(y) is not store}
+        stale_seasons |= {y for y, f in features.items() if self._features_used.get(y) is not f}
+        stale_seasons |= {y for y, sched in schedules.items() if self._schedules_used.get(y) is not sched}
+        # Cache lookups only; a game whose forecast changed is re-run like one whose line moved.
+        weather = {key: self.weather.lookup(self._weather_slot(board, i, schedules)) for i, key in enumerate(board.keys)} if self.weather else {}
+        new_weather = {key for key, wx in weather.items() if self._weather_used.get(key) != wx}
+        if prev is None:
+            dirty = set(board.keys)
+            removed = []
+        else:
+            diff = diff_boards(prev, board)
+            dirty = set(diff.events)
+            removed = diff.removed_events
+            if reconfigured:
+                dirty = set(board.keys)
+            elif stale_seasons:
+                dirty |= {k for i, k in enumerate(board.keys) if self._season(board, i) in stale_seasons}
+            dirty |= new_weather
+
+        recompute = []
+        for key in dirty:
+            idx = board.by_key[key]
+            lines = board.selected_lines(idx, self.primary_book_kw, self.allowed_books)
+            row = self.rows.get(key)
+            # A move at a book we don't price from leaves this game's edges untouched.
+            if (row is not None and row["lines"] == lines and not reconfigured and key not in new_weather
+                    and self._season(board, idx) not in stale_seasons):
+                continue
+            recompute.append(key)
+
+        changed, events = [], []
+        for key in removed:
+            old = self.rows.pop(key, None)
+            if old is not None:
+                events.append({"key": key, "type": "removed", "version": version, "config_version": cfg.version,
+                               "previous": old, "current": None})
+        for key, result in self._compute(board, recompute, ratings, features, schedules, weather, cfg).items():
+            old = self.rows.get(key)
+            if old is None or old["model"]["edges"] != result["model"]["edges"] or old["decisions"] != result["decisions"] or old["lines"] != result["lines"]:
+                changed.append(key)
+                events.append({"key": key, "type": "added" if old is None else "changed", "version": version,
+                               "config_version": cfg.version, "previous": old, "current": result})
+            self.rows[key] = result
+
+        self._board = board
+        self._ratings_used.update(ratings)
+        self._features_used.update(features)
+        self._schedules_used.update(schedules)
+        self._weather_used = weather
+        self.config_version = cfg.version
+        self.version = version
+        self.last_changed = changed + list(removed)
+        for listener in self.listeners:
+            listener(events)
+        return self.last_changed
+
+    async def on_snapshot(self, prev, snapshot) -> None:
+        # Poller listener: load SP+, team features and schedule for the seasons on the board (cached), then update.
+        board = snapshot.board
+        seasons = {self._season(board, i) for i in range(len(board))}
+        ratings, features, schedules = {}, {}, {}
+        for season in seasons:
+            try:
+                ratings[season] = await self.load_ratings(season)
+            except Exception:
+                log.exception("ratings load failed for %s; edges use a 0.0 ratings delta", season)
+                ratings[season] = None
+            if self.load_features:
+                try:
+                    features[season] = await self.load_features(season)
+                except Exception:
+                    log.exception("team features load failed for %s; matchup adjustments stay neutral", season)
+                    features[season] = None
+            if self.load_schedule:
+                try:
+                    schedules[season] = await self.load_schedule(season)
+                except Exception:
+                    log.exception("schedule load failed for %s; schedule flags are skipped", season)
+                    schedules[season] = None
+        if self.weather:
+            try:
+                await self.weather.warm([self._weather_slot(board, i, schedules) for i in range(len(board))])
+            except Exception:
+                log.exception("weather refresh failed; games keep their cached or calm conditions")
+        self.update(board, ratings, snapshot.version, features, schedules)
+
+    def sync_config(self) -> List[str]:
+        # Re-run the current board if the config changed since the last update.
+        if self._board is None or self.config().version == self.config_version:
+            return []
+        return self.update(self._board, dict(self._ratings_used), self.version)
+
+    def table(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "config_version": self.config_version,
+            "changed": self.last_changed,
+            "games": [dict(row, key=key) for key, row in self.rows.items()],
+        }
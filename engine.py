@@ -0,0 +1,186 @@
+import numpy as np
+from typing import Dict, Any, List, Optional, Union
+
+from config import ModelConfig, as_config
+from sim import moneyline_pick
+
+# Vectorized counterpart of the scalar apply_* pipeline in model.py. Every step mirrors the
+# scalar arithmetic in the same order so both paths produce identical numbers.
+#
+# Config fields may also be (V, 1) arrays, one row per config variant (see sweep.py);
+# every step broadcasts, so results come out (V, games).
+
+INJURY_FIELDS = (
+    "qb1_out", "qb1_limited", "qb2_good", "rb1_out", "wr1_out", "ol_top_out",
+    "important_starters_out", "ol_out_count", "db_out_count", "wr_out_count", "dl_out_count",
+)
+UNIT_COUNT_FIELDS = ("ol_out_count", "db_out_count", "wr_out_count", "dl_out_count")
+SITUATIONAL_FLAGS = (
+    "home_bye", "away_bye", "home_b2b_road", "away_b2b_road",
+    "home_longhaul_altitude", "away_longhaul_altitude",
+)
+MATCHUP_FIELDS = ("rush_adv", "pass_adv", "finish_adv", "havoc_adv")
+EXPLOSIVE_FLAGS = ("home_top_offense", "away_leaky_def", "extreme", "favored_team_leaky")
+TRAP_CODES = {"low": 1, "high": 2}
+
+GAME_DTYPE = np.dtype(
+    [("ratings_delta", "f8"), ("base_total", "f8"), ("spread_line", "f8"), ("total_line", "f8"),
+     ("wind_mph", "f8"), ("precip_mm", "f8"), ("home_trap", "i1"), ("away_trap", "i1")]
+    + [(f, "?") for f in SITUATIONAL_FLAGS]
+    + [(f, "f8") for f in MATCHUP_FIELDS]
+    + [(f, "?") for f in EXPLOSIVE_FLAGS]
+    + [(f"h_{f}", "f8") for f in INJURY_FIELDS]
+    + [(f"a_{f}", "f8") for f in INJURY_FIELDS]
+    # False when the side's injury report is empty or missing: the scalar model skips it entirely.
+    + [("h_injuries", "?"), ("a_injuries", "?")]
+)
+
+def _column(values: List[Any], dtype: str) -> np.ndarray:
+    return np.fromiter(values, dtype=dtype, count=len(values))
+
+def pack_games(games: List[Dict[str, Any]]) -> np.ndarray:
+    # Each game dict uses the same shapes analyze_matchup feeds the scalar functions:
+    # ratings_delta, base_total, spread_line/total_line (None when the book has no line),
+    # situational, matchup, explosiveness, injuries_home, injuries_away, weather.
+    # Filled one field at a time; a per-row assignment costs more than running the model.
+    arr = np.zeros(len(games), dtype=GAME_DTYPE)
+    if not games:
+        return arr
+    nan = float("nan")
+    arr["ratings_delta"] = _column([g.get("ratings_delta", 0.0) or 0.0 for g in games], "f8")
+    arr["base_total"] = _column([g.get("base_total", 52.0) for g in games], "f8")
+    arr["spread_line"] = _column([nan if g.get("spread_line") is None else g["spread_line"] for g in games], "f8")
+    arr["total_line"] = _column([nan if g.get("total_line") is None else g["total_line"] for g in games], "f8")
+    weather = [g.get("weather") or {} for g in games]
+    arr["wind_mph"] = _column([w.get("wind_mph", 0.0) or 0.0 for w in weather], "f8")
+    arr["precip_mm"] = _column([w.get("precip_mm", 0.0) or 0.0 for w in weather], "f8")
+    situ = [g.get("situational") or {} for g in games]
+    arr["home_trap"] = _column([TRAP_CODES.get(s.get("home_trap"), 0) for s in situ], "i1")
+    arr["away_trap"] = _column([TRAP_CODES.get(s.get("away_trap"), 0) for s in situ], "i1")
+    for f in SITUATIONAL_FLAGS:
+        arr[f] = _column([bool(s.get(f)) for s in situ], "?")
+    matchup = [g.get("matchup") or {} for g in games]
+    for f in MATCHUP_FIELDS:
+        arr[f] = _column([m.get(f, 0.0) or 0.0 for m in matchup], "f8")
+    explode = [g.get("explosiveness") or {} for g in games]
+    for f in EXPLOSIVE_FLAGS:
+        arr[f] = _column([bool(e.get(f)) for e in explode], "?")
+    for side, key in (("h", "injuries_home"), ("a", "injuries_away")):
+        teams = [g.get(key) or {} for g in games]
+        arr[f"{side}_injuries"] = _column([bool(t) for t in teams], "?")
+        for f in INJURY_FIELDS:
+            arr[f"{side}_{f}"] = _column([t.get(f, 0) or 0 for t in teams], "f8")
+    return arr
+
+def situational_delta(g: np.ndarray, c: ModelConfig) -> np.ndarray:
+    delta = np.zeros(len(g))
+    delta = delta + np.where(g["home_bye"], c.bye_week_bonus_pts, 0.0)
+    delta = delta - np.where(g["away_bye"], c.bye_week_bonus_pts, 0.0)
+    delta = delta - np.where(g["home_trap"] == 1, c.trap_game_penalty_pts_low, 0.0)
+    delta = delta - np.where(g["home_trap"] == 2, c.trap_game_penalty_pts_high, 0.0)
+    delta = delta + np.where(g["away_trap"] == 1, c.trap_game_penalty_pts_low, 0.0)
+    delta = delta + np.where(g["away_trap"] == 2, c.trap_game_penalty_pts_high, 0.0)
+    delta = delta - np.where(g["home_b2b_road"], c.b2b_road_penalty_pts, 0.0)
+    delta = delta + np.where(g["away_b2b_road"], c.b2b_road_penalty_pts, 0.0)
+    delta = delta + np.where(g["away_longhaul_altitude"], c.longhaul_altitude_penalty_pts, 0.0)
+    delta = delta - np.where(g["home_longhaul_altitude"], c.longhaul_altitude_penalty_pts, 0.0)
+    return delta
+
+def apply_situational(line: np.ndarray, g: np.ndarray, c: ModelConfig) -> np.ndarray:
+    return line + situational_delta(g, c)
+
+def apply_matchup_efficiency(line: np.ndarray, g: np.ndarray, c: ModelConfig) -> np.ndarray:
+    max_pts = c.max_nudge_pts
+    delta = np.zeros(len(g))
+    for k in MATCHUP_FIELDS:
+        delta = delta + np.clip(g[k], -max_pts/2, max_pts/2) * 0.25
+    return line + np.clip(delta, -max_pts, max_pts)
+
+def apply_explosiveness(line: np.ndarray, g: np.ndarray, c: ModelConfig) -> np.ndarray:
+    if not c.use_big_plays:
+        return line
+    boost = np.where(g["extreme"], c.boost_pts_extreme, c.boost_pts_moderate)
+    delta = np.where(g["home_top_offense"] & g["away_leaky_def"], boost, 0.0)
+    delta = delta - np.where(g["favored_team_leaky"], c.penalty_pts_def_leaky, 0.0)
+    return line + delta
+
+def injury_penalty(g: np.ndarray, side: str, c: ModelConfig) -> np.ndarray:
+    p = f"{side}_"
+    pts = np.zeros(len(g))
+    pts = pts + np.where(g[p + "qb1_out"] != 0, c.qb1_out_pts, 0.0)
+    pts = pts + np.where(g[p + "qb1_limited"] != 0, c.qb1_limited_pts, 0.0)
+    pts = pts - np.where(g[p + "qb2_good"] != 0, c.qb2_good_addback_pts, 0.0)
+    pts = pts + g[p + "rb1_out"] * c.rb1_out_pts
+    pts = pts + g[p + "wr1_out"] * c.wr1_out_pts
+    pts = pts + g[p + "ol_top_out"] * c.ol_top_out_pts
+    pts = pts + g[p + "important_starters_out"] * c.important_starter_out_pts
+    for unit_key in UNIT_COUNT_FIELDS:
+        pts = pts + np.where(g[p + unit_key] >= c.cluster_same_unit_threshold, c.cluster_same_unit_bonus_pts, 0.0)
+    # An empty report costs nothing, even when a threshold of 0 would count its missing units.
+    return np.where(g[p + "injuries"], pts, 0.0)
+
+def apply_injuries(line: np.ndarray, g: np.ndarray, c: ModelConfig) -> np.ndarray:
+    delta = np.zeros(len(g))
+    delta = delta + injury_penalty(g, "h", c)
+    delta = delta - injury_penalty(g, "a", c)
+    return line - delta
+
+def apply_weather_total_adj(total: np.ndarray, g: np.ndarray, c: ModelConfig) -> np.ndarray:
+    if not c.weather_trigger_only:
+        return total
+    wind, precip = g["wind_mph"], g["precip_mm"]
+    adj = np.zeros(len(g))
+    adj = adj + np.where(wind >= c.wind_threshold_mph, c.wind_total_adjust_low, 0.0)
+    adj = adj + np.where(wind >= c.wind_threshold_mph + 5, (c.wind_total_adjust_high - c.wind_total_adjust_low) * 0.6, 0.0)
+    adj = adj + np.where(precip >= 1.0, c.precip_total_adjust_low, 0.0)
+    adj = adj + np.where(precip >= 3.0, (c.precip_total_adjust_high - c.precip_total_adjust_low) * 0.6, 0.0)
+    return total + adj
+
+def round_half(x: np.ndarray, ndigits: int) -> np.ndarray:
+    # np.round scales then rounds, which can disagree with Python's correctly rounded round()
+    # when x * 10**ndigits lands next to .5. Those few values are redone with round().
+    out = np.round(x, ndigits)
+    scaled = x * 10.0 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie):
+        out.flat[i] = round(float(x.flat[i]), ndigits)
+    return out
+
+def staking_units(edge_pts: np.ndarray, is_total: bool, c: ModelConfig) -> np.ndarray:
+    if is_total:
+        big, small = c.big_edge_total_pts, c.small_total_edge_min
+    else:
+        big, small = c.big_edge_spread_pts, c.small_spread_edge_min
+    return np.where(edge_pts >= big, c.big_units, np.where(edge_pts >= small, c.small_units, 0))
+
+def run(g: np.ndarray, cfg: Union[ModelConfig, dict]) -> Dict[str, np.ndarray]:
+    c = as_config(cfg)
+    model_line = g["ratings_delta"] + c.base_hfa_pts
+    model_line = apply_situational(model_line, g, c)
+    model_line = apply_matchup_efficiency(model_line, g, c)
+    model_line = apply_explosiveness(model_line, g, c)
+    model_line = apply_injuries(model_line, g, c)
+    model_total = apply_weather_total_adj(g["base_total"].copy(), g, c)
+
+    # spread_line is the home spread, so home covers by model_line + spread_line: + home, - away.
+    spread_edge = round_half(np.where(np.isnan(g["spread_line"]), 0.0, model_line + g["spread_line"]), 2)
+    total_edge = round_half(np.where(np.isnan(g["total_line"]), 0.0, model_total - g["total_line"]), 2)
+    return {
+        "model_line": model_line,
+        "model_total": model_total,
+        "spread_edge": spread_edge,
+        "total_edge": total_edge,
+        "spread_units": staking_units(np.abs(spread_edge), False, c),
+        "total_units": staking_units(np.abs(total_edge), True, c),
+    }
+
+def decisions(out: Dict[str, np.ndarray], i: int, c: ModelConfig,
+              priced: Optional[Dict[str, Any]] = None) -> Dict[str, Optional[Dict[str, Any]]]:
+    # Same shape as model.decision_from_edges for game i; `priced` is its sim.price result.
+    d = {"spread": None, "total": None, "moneyline": None}
+    if out["spread_units"][i] > 0:
+        d["spread"] = {"units": int(out["spread_units"][i]), "edge_pts": round(float(out["spread_edge"][i]), 2)}
+    if out["total_units"][i] > 0:
+        d["total"] = {"units": int(out["total_units"][i]), "edge_pts": round(float(out["total_edge"][i]), 2)}
+    d["moneyline"] = moneyline_pick(priced, c)
+    return d
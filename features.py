@@ -0,0 +1,229 @@
+import os
+import time
+import asyncio
+import numpy as np
+from typing import Dict, Any, Optional, List, Tuple
+
+from engine import MATCHUP_FIELDS, EXPLOSIVE_FLAGS
+from teams import TeamRows
+from utils import parse_kickoff, to_float, read_json, write_json
+
+# Season team-feature matrix behind the matchup and explosiveness adjustments.
+# One row per team, one column per FEATURES entry, z-scored within the season. Each team's
+# unit strengths and explosiveness percentiles are computed once per build, so pairing two
+# teams (or a whole slate, see pairs()) is array indexing.
+#
+# CFBD sources, season to date:
+#   /metrics/ppa/teams       rush and pass EPA per play, offense and defense
+#   /stats/season/advanced   points per opportunity (finishing drives), havoc, explosiveness
+#                            (isoPPP overall and on pass/run plays: config explosiveness.metrics)
+#   /stats/season            turnovers and takeaways, pulled one completed-week range at a time
+#                            and summed
+# The raw payloads are kept on disk per season. A newly completed week costs one week-range
+# stats call plus the two rate payloads; a finished season is never fetched again.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+FEATURES_CACHE_DIR = os.getenv("FEATURES_CACHE_DIR", os.path.join(APP_DIR, ".features_cache"))
+# A week counts as complete this long after its last kickoff (CFBD stats lag the final whistle).
+FEATURES_WEEK_GRACE_H = float(os.getenv("FEATURES_WEEK_GRACE_H", "12"))
+# Explosiveness flags: a team's composite percentile within the season.
+FEATURES_TOP_PCT = float(os.getenv("FEATURES_TOP_PCT", "0.75"))
+FEATURES_EXTREME_PCT = float(os.getenv("FEATURES_EXTREME_PCT", "0.90"))
+
+# "def_*" columns are what the defense allows, except def_havoc (havoc it creates);
+# off_havoc is havoc the offense gives up.
+FEATURES = (
+    "off_rush_ppa", "def_rush_ppa", "off_pass_ppa", "def_pass_ppa",
+    "off_ppo", "def_ppo", "off_havoc", "def_havoc",
+    "off_isoppp", "def_isoppp", "off_expl_pass", "def_expl_pass", "off_expl_run", "def_expl_run",
+    "turnovers_pg", "takeaways_pg",
+)
+COL = {f: j for j, f in enumerate(FEATURES)}
+
+# Column -> (payload, path) tried in order; the advanced payload backs up PPA.
+SOURCES: Dict[str, List[Tuple[str, Tuple[str, ...]]]] = {}
+for _side, _unit in (("off", "offense"), ("def", "defense")):
+    SOURCES[f"{_side}_rush_ppa"] = [("ppa", (_unit, "rushing")), ("advanced", (_unit, "rushingPlays", "ppa"))]
+    SOURCES[f"{_side}_pass_ppa"] = [("ppa", (_unit, "passing")), ("advanced", (_unit, "passingPlays", "ppa"))]
+    SOURCES[f"{_side}_ppo"] = [("advanced", (_unit, "pointsPerOpportunity"))]
+    SOURCES[f"{_side}_havoc"] = [("advanced", (_unit, "havoc", "total"))]
+    SOURCES[f"{_side}_isoppp"] = [("advanced", (_unit, "explosiveness"))]
+    SOURCES[f"{_side}_expl_pass"] = [("advanced", (_unit, "passingPlays", "explosiveness"))]
+    SOURCES[f"{_side}_expl_run"] = [("advanced", (_unit, "rushingPlays", "explosiveness"))]
+
+EXPLOSIVE_OFFENSE = ("off_isoppp", "off_expl_pass", "off_expl_run")
+EXPLOSIVE_DEFENSE = ("def_isoppp", "def_expl_pass", "def_expl_run")
+
+def _value(row: Optional[Dict[str, Any]], path: Tuple[str, ...]) -> float:
+    v: Any = row
+    for p in path:
+        if not isinstance(v, dict):
+            return np.nan
+        v = v.get(p)
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _zscore(x: np.ndarray) -> np.ndarray:
+    # Per column over the teams that have a value; missing values stay NaN.
+    out = np.full_like(x, np.nan)
+    for j in range(x.shape[1]):
+        col = x[:, j]
+        ok = ~np.isnan(col)
+        if ok.sum() < 2:
+            continue
+        sd = col[ok].std()
+        out[ok, j] = (col[ok] - col[ok].mean()) / sd if sd > 0 else 0.0
+    return out
+
+def _composite_pct(z: np.ndarray, cols: Tuple[str, ...]) -> np.ndarray:
+    # Mean z over the available columns, as a within-season percentile (0 when no data).
+    block = z[:, [COL[c] for c in cols]]
+    have = (~np.isnan(block)).sum(axis=1)
+    score = np.where(have > 0, np.nansum(block, axis=1) / np.maximum(have, 1), np.nan)
+    pct = np.zeros(len(score))
+    ok = ~np.isnan(score)
+    if ok.any():
+        ranks = score[ok].argsort().argsort()
+        pct[ok] = (ranks + 1) / ok.sum()
+    return pct
+
+class TeamFeatures(TeamRows):
+    def __init__(self, season: int, doc: Dict[str, Any]):
+        self.season = season
+        self.through_week = int(doc.get("through_week") or 0)
+        self.final = bool(doc.get("final"))
+        payloads = {
+            "ppa": {r["team"]: r for r in doc.get("ppa") or [] if r.get("team")},
+            "advanced": {r["team"]: r for r in doc.get("advanced") or [] if r.get("team")},
+        }
+        counts: Dict[str, Dict[str, float]] = doc.get("counts") or {}
+        self.teams: List[str] = sorted(set(payloads["ppa"]) | set(payloads["advanced"]) | set(counts))
+        n = len(self.teams)
+
+        self.values = np.full((n, len(FEATURES)), np.nan)
+        for i, team in enumerate(self.teams):
+            for f, sources in SOURCES.items():
+                for src, path in sources:
+                    v = _value(payloads[src].get(team), path)
+                    if not np.isnan(v):
+                        self.values[i, COL[f]] = v
+                        break
+            c = counts.get(team)
+            games = c.get("games", 0.0) if c else 0.0
+            if games > 0:
+                self.values[i, COL["turnovers_pg"]] = c.get("turnovers", 0.0) / games
+                self.values[i, COL["takeaways_pg"]] = (c.get("passesIntercepted", 0.0) + c.get("fumblesRecovered", 0.0)) / games
+
+        self.z = _zscore(self.values)
+        z = np.nan_to_num(self.z)
+        col = {f: z[:, j] for j, f in enumerate(FEATURES)}
+        # Per-team strength of each matchup unit (MATCHUP_FIELDS order). The home edge of a unit
+        # is home offense vs away defense minus the mirror, which reduces to s[home] - s[away].
+        # A trailing zero row serves unknown teams (id -1).
+        self.units = np.vstack([np.column_stack([
+            col["off_rush_ppa"] - col["def_rush_ppa"],
+            col["off_pass_ppa"] - col["def_pass_ppa"],
+            col["off_ppo"] - col["def_ppo"],
+            col["def_havoc"] - col["off_havoc"] + 0.5 * (col["takeaways_pg"] - col["turnovers_pg"]),
+        ]).reshape(n, len(MATCHUP_FIELDS)), np.zeros((1, len(MATCHUP_FIELDS)))])
+        self.explosive_pct = np.append(_composite_pct(self.z, EXPLOSIVE_OFFENSE), 0.0)
+        self.leaky_pct = np.append(_composite_pct(self.z, EXPLOSIVE_DEFENSE), 0.0)
+        # Plain-list copies for single games, where numpy's per-call overhead dominates.
+        self._units, self._explosive, self._leaky = self.units.tolist(), self.explosive_pct.tolist(), self.leaky_pct.tolist()
+        self._index_rows(self.teams)
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def ids(self, names: List[str]) -> np.ndarray:
+        found = [self.team_id(name) for name in names]
+        return np.array([-1 if t is None else t for t in found], dtype=np.int64)
+
+    def pairs(self, home_ids: np.ndarray, away_ids: np.ndarray, favored_home: np.ndarray) -> Dict[str, np.ndarray]:
+        # Whole-slate form: one array per MATCHUP_FIELDS / EXPLOSIVE_FLAGS entry. A game with
+        # either team unknown gets the neutral values the model used before features existed.
+        known = (home_ids >= 0) & (away_ids >= 0)
+        adv = np.where(known[:, None], (self.units[home_ids] - self.units[away_ids]) / 2.0, 0.0)
+        off_h, leak_a = self.explosive_pct[home_ids], self.leaky_pct[away_ids]
+        leak_fav = self.leaky_pct[np.where(favored_home, home_ids, away_ids)]
+        out = {f: adv[:, k] for k, f in enumerate(MATCHUP_FIELDS)}
+        out.update(zip(EXPLOSIVE_FLAGS, (
+            known & (off_h >= FEATURES_TOP_PCT),
+            known & (leak_a >= FEATURES_TOP_PCT),
+            known & (off_h >= FEATURES_EXTREME_PCT) & (leak_a >= FEATURES_EXTREME_PCT),
+            known & (leak_fav >= FEATURES_TOP_PCT),
+        )))
+        return out
+
+    def matchup(self, home: str, away: str, favored_home: bool) -> Tuple[Dict[str, float], Dict[str, bool]]:
+        # The matchup and explosiveness dicts matchup_inputs hands the model; same numbers as pairs().
+        h, a = self.team_id(home), self.team_id(away)
+        if h is None or a is None:
+            return dict.fromkeys(MATCHUP_FIELDS, 0.0), dict.fromkeys(EXPLOSIVE_FLAGS, False)
+        adv = {f: (hv - av) / 2.0 for f, hv, av in zip(MATCHUP_FIELDS, self._units[h], self._units[a])}
+        off_h, leak_a = self._explosive[h], self._leaky[a]
+        leak_fav = self._leaky[h if favored_home else a]
+        return adv, dict(zip(EXPLOSIVE_FLAGS, (
+            off_h >= FEATURES_TOP_PCT,
+            leak_a >= FEATURES_TOP_PCT,
+            off_h >= FEATURES_EXTREME_PCT and leak_a >= FEATURES_EXTREME_PCT,
+            leak_fav >= FEATURES_TOP_PCT,
+        )))
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        tid = self.team_id(name)
+        if tid is None:
+            return None
+        return {"team": self.teams[tid], **{f: None if np.isnan(v) else float(v) for f, v in zip(FEATURES, self.values[tid])}}
+
+# ========= Season payloads on disk =========
+
+def cache_path(cache_dir: str, season: int) -> str:
+    return os.path.join(cache_dir, f"features_{season}.json")
+
+def completed_week(calendar: List[Dict[str, Any]], now: float) -> Tuple[int, bool]:
+    # Last regular-season week whose games are all in, and whether every week (bowls included) is.
+    last, pending = 0, False
+    for w in calendar:
+        end = parse_kickoff(w.get("lastGameStart") or w.get("endDate") or "")
+        if end is None:
+            continue
+        if end.timestamp() + FEATURES_WEEK_GRACE_H * 3600 > now:
+            pending = True
+        elif (w.get("seasonType") or "regular") == "regular":
+            last = max(last, int(w.get("week") or 0))
+    return last, bool(calendar) and not pending
+
+def add_counts(counts: Dict[str, Dict[str, float]], rows: List[Dict[str, Any]]) -> None:
+    # /stats/season rows are {team, statName, statValue}; every stat we read is a running total.
+    for r in rows:
+        team, stat = r.get("team"), r.get("statName")
+        if team and stat:
+            per_team = counts.setdefault(team, {})
+            per_team[stat] = per_team.get(stat, 0.0) + to_float(r.get("statValue"))
+
+async def load_season(cfbd: Any, season: int, cache_dir: str = FEATURES_CACHE_DIR, now: Optional[float] = None) -> Dict[str, Any]:
+    # The season's raw feature payloads, brought up to the last completed week. `cfbd` is a CFBDClient.
+    path = cache_path(cache_dir, season)
+    doc = read_json(path) if os.path.exists(path) else {
+        "season": season, "through_week": 0, "final": False, "counts": {}, "ppa": [], "advanced": []}
+    if doc["final"]:
+        return doc
+    week, final = completed_week(await cfbd.get_calendar(season), time.time() if now is None else now)
+    if week <= doc["through_week"] and not final:
+        return doc
+    if final:
+        # Bowls count too: one whole-season pull replaces the weekly sums.
+        stats = cfbd.get_team_season_stats(season)
+        counts: Dict[str, Dict[str, float]] = {}
+    else:
+        stats = cfbd.get_team_season_stats(season, start_week=doc["through_week"] + 1, end_week=week)
+        counts = doc["counts"]
+    rows, ppa, advanced = await asyncio.gather(stats, cfbd.get_team_ppa(season), cfbd.get_advanced_season_stats(season))
+    add_counts(counts, rows)
+    doc = {"season": season, "through_week": week, "final": final, "counts": counts, "ppa": ppa, "advanced": advanced}
+    os.makedirs(cache_dir, exist_ok=True)
+    write_json(path, doc)
+    return doc
@@ -1,6 +1,21 @@
 import os
+import math
+import time
+import asyncio
+import logging
+import importlib.util
 import httpx
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Tuple
+
+import metrics
+from board import OddsBoard
+from ratings import RatingsStore
+from features import TeamFeatures, load_season
+from schedule import ScheduleIndex, schedule_index
+from shared_cache import SHARED_BACKEND
+from quota import ODDS_QUOTA, OddsQuota, QuotaExceeded, request_cost
+from utils import json_loads
 
 CFBD_BASE = "https://api.collegefootballdata.com"
 ODDS_BASE = "https://api.the-odds-api.com/v4/sports/americanfootball_ncaaf"
@@ -8,52 +23,477 @@ ODDS_BASE = "https://api.the-odds-api.com/v4/sports/americanfootball_ncaaf"
 def env(key: str, default: Optional[str]=None) -> Optional[str]:
     return os.getenv(key, default)
 
+# Every market and region multiplies the credits an odds call costs. /analyze reads spreads,
+# totals and moneylines; drop h2h here if the moneyline isn't needed.
+ODDS_MARKETS = env("ODDS_MARKETS", "h2h,spreads,totals")
+ODDS_REGIONS = env("ODDS_REGIONS", "us")
+
+# ========= Shared TTL cache =========
+
+# Odds move by the minute; SP+ barely changes within a week.
+ODDS_TTL = float(env("ODDS_CACHE_TTL", "60"))
+SP_TTL = float(env("SP_CACHE_TTL", "21600"))
+ODDS_EVENTS_TTL = float(env("ODDS_EVENTS_CACHE_TTL", "600"))
+TEAMS_TTL = float(env("TEAMS_CACHE_TTL", "604800"))
+CALENDAR_TTL = float(env("CALENDAR_CACHE_TTL", "86400"))
+VENUES_TTL = float(env("VENUES_CACHE_TTL", "604800"))
+# Kickoff times get set and moved through the season; an unchanged refetch keeps the built index.
+SCHEDULE_TTL = float(env("SCHEDULE_CACHE_TTL", "21600"))
+# How often the feature matrix checks for a newly completed week (features.py keeps the data on disk).
+FEATURES_TTL = float(env("FEATURES_CACHE_TTL", "3600"))
+CACHE_MAX_ENTRIES = int(env("CACHE_MAX_ENTRIES", "256"))
+
+SHARED_LEASE_S = float(env("SHARED_CACHE_LEASE_S", "30"))
+# Never shorter than the lease: a follower that gave up first would fetch while the lease is held.
+SHARED_WAIT_S = max(float(env("SHARED_CACHE_WAIT_S", "30")), SHARED_LEASE_S)
+# How often a waiting follower retries the lease, so a crashed refresher is replaced once it expires.
+SHARED_RETRY_S = 1.0
+log = logging.getLogger(__name__)
+
+def shared_key(key: Any) -> str:
+    return "|".join(str(k) for k in key) if isinstance(key, tuple) else str(key)
+
+# Process-wide async cache: per-key TTL, single-flight misses, LRU eviction when full.
+# With a shared backend (see shared_cache.py) a local miss first checks what other workers
+# fetched, and only the worker holding the key's lease calls upstream.
+class TTLCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, backend: Any = None):
+        self.max_entries = max_entries
+        self.backend = backend
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Any, asyncio.Task] = {}
+
+    def peek(self, key: Any, ttl: float) -> Optional[Tuple[Any, float]]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        stored_at, value = item
+        age = time.time() - stored_at
+        if age > ttl:
+            return None
+        self._data.move_to_end(key)
+        return value, age
+
+    def put(self, key: Any, value: Any, stored_at: Optional[float] = None) -> None:
+        self._data[key] = (time.time() if stored_at is None else stored_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Any = None) -> None:
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    async def get_or_fetch(self, key: Any, ttl: float, fetch: Callable[[], Awaitable[Any]],
+                           build: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, Dict[str, Any]]:
+        # fetch() returns the raw upstream JSON; build(raw) turns it into what callers get.
+        hit = self.peek(key, ttl)
+        if hit is not None:
+            value, age = hit
+            return value, {"hit": True, "age_s": round(age, 1)}
+        task = self._inflight.get(key)
+        coalesced = task is not None
+        if task is None:
+            # The upstream call runs detached so a caller timing out doesn't cancel it for everyone else.
+            task = asyncio.ensure_future(self._fill(key, ttl, fetch, build or (lambda raw: raw)))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        value, info = await asyncio.shield(task)
+        if coalesced:
+            return value, {**info, "hit": True, "coalesced": True}
+        return value, info
+
+    async def _fill(self, key: Any, ttl: float, fetch: Callable[[], Awaitable[Any]], build: Callable[[Any], Any]) -> Tuple[Any, Dict[str, Any]]:
+        try:
+            if self.backend is None:
+                value = build(await fetch())
+                self.put(key, value)
+                return value, {"hit": False, "age_s": 0.0}
+            return await self._fill_shared(key, ttl, fetch, build)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _shared_get(self, skey: str, ttl: float) -> Optional[Tuple[float, Any]]:
+        try:
+            got = await self.backend.get(skey)
+        except Exception:
+            log.exception("shared cache read failed for %s", skey)
+            return None
+        if got is None or time.time() - got[0] > ttl:
+            return None
+        return got
+
+    async def _acquire(self, skey: str) -> bool:
+        try:
+            return await self.backend.acquire(skey, SHARED_LEASE_S)
+        except Exception:
+            log.exception("shared cache lease failed for %s", skey)
+            return True
+
+    async def _fill_shared(self, key: Any, ttl: float, fetch: Callable[[], Awaitable[Any]], build: Callable[[Any], Any]) -> Tuple[Any, Dict[str, Any]]:
+        skey = shared_key(key)
+        got = await self._shared_get(skey, ttl)
+        if got is None:
+            leader = await self._acquire(skey)
+            if not leader:
+                # Another worker is refreshing this key; wait for it to publish, taking the lease over if it expires.
+                start = time.time()
+                retry_at = start + SHARED_RETRY_S
+                while got is None and not leader and time.time() < start + SHARED_WAIT_S:
+                    await asyncio.sleep(0.05)
+                    got = await self._shared_get(skey, ttl)
+                    if got is None and time.time() >= retry_at:
+                        leader = await self._acquire(skey)
+                        retry_at = time.time() + SHARED_RETRY_S
+                if got is None and not leader:
+                    stale = self.peek(key, math.inf)
+                    if stale is not None:
+                        value, age = stale
+                        return value, {"hit": True, "age_s": round(age, 1), "stale": True}
+                    leader = await self._acquire(skey)
+                    if not leader:
+                        log.warning("shared cache lease for %s still held after %.0fs; fetching without it", skey, SHARED_WAIT_S)
+        if got is not None:
+            stored_at, raw = got
+            value = build(raw)
+            # Keep the shared timestamp so this worker's copy expires when the shared one does.
+            self.put(key, value, stored_at=stored_at)
+            return value, {"hit": True, "age_s": round(time.time() - stored_at, 1), "shared": True}
+        try:
+            raw = await fetch()
+            try:
+                await self.backend.set(skey, raw, ttl)
+            except Exception:
+                log.exception("shared cache write failed for %s", skey)
+        finally:
+            if leader:
+                try:
+                    await self.backend.release(skey)
+                except Exception:
+                    pass
+        value = build(raw)
+        self.put(key, value)
+        return value, {"hit": False, "age_s": 0.0}
+
+CACHE = TTLCache(backend=SHARED_BACKEND)
+
+# ========= Pooled upstream connections =========
+
+HTTP_POOL_SIZE = int(env("HTTP_POOL_SIZE", "20"))
+HTTP_KEEPALIVE = int(env("HTTP_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(env("HTTP_KEEPALIVE_EXPIRY", "60"))
+HTTP_TIMEOUT = float(env("HTTP_TIMEOUT", "30"))
+HTTP2 = env("HTTP2", "1") == "1"
+
+# One long-lived client per upstream host, shared by every request for the app's lifetime.
+class Upstream:
+    def __init__(self, base_url: str, max_concurrency: int = 8, pool_size: int = HTTP_POOL_SIZE,
+                 keepalive: int = HTTP_KEEPALIVE, keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+                 http2: bool = HTTP2, transport: Optional[httpx.AsyncBaseTransport] = None, name: Optional[str] = None):
+        # Label for /metrics; defaults to the host.
+        self.name = name or httpx.URL(base_url).host
+        # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 keep-alive without it.
+        http2 = http2 and transport is None and importlib.util.find_spec("h2") is not None
+        self.client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=HTTP_TIMEOUT,
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=keepalive, keepalive_expiry=keepalive_expiry),
+            http2=http2,
+            transport=transport,
+        )
+        # HTTP/2 multiplexes many streams over one connection, so cap in-flight requests separately.
+        self.sem = asyncio.Semaphore(max_concurrency)
+
+    async def get(self, path: str, **kwargs) -> httpx.Response:
+        if not metrics.ENABLED:
+            async with self.sem:
+                r = await self.client.get(path, **kwargs)
+            r.raise_for_status()
+            return r
+        t0 = time.perf_counter()
+        try:
+            async with self.sem:
+                r = await self.client.get(path, **kwargs)
+        except httpx.TimeoutException:
+            metrics.UPSTREAM_ERRORS.inc((self.name, "timeout"))
+            raise
+        except httpx.TransportError:
+            metrics.UPSTREAM_ERRORS.inc((self.name, "transport"))
+            raise
+        metrics.UPSTREAM_SECONDS.observe((self.name,), time.perf_counter() - t0)
+        metrics.UPSTREAM_BYTES.observe((self.name,), len(r.content))
+        metrics.UPSTREAM_RESPONSES.inc((self.name, str(r.status_code)))
+        if r.is_error:
+            metrics.UPSTREAM_ERRORS.inc((self.name, "http"))
+        r.raise_for_status()
+        return r
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+# ========= Concurrent fan-out =========
+
+# Per-source budgets so one slow upstream can't hold the whole response hostage.
+FETCH_TIMEOUTS = {
+    "odds": float(env("ODDS_FETCH_TIMEOUT", "8")),
+    "sp": float(env("SP_FETCH_TIMEOUT", "5")),
+    "stats": float(env("STATS_FETCH_TIMEOUT", "8")),
+    "ppa": float(env("PPA_FETCH_TIMEOUT", "8")),
+    "venues": float(env("VENUES_FETCH_TIMEOUT", "8")),
+    "games": float(env("GAMES_FETCH_TIMEOUT", "8")),
+    "features": float(env("FEATURES_FETCH_TIMEOUT", "8")),
+    "schedule": float(env("SCHEDULE_FETCH_TIMEOUT", "8")),
+}
+
+async def fetch_all(jobs: Dict[str, Awaitable[Any]], timeouts: Optional[Dict[str, float]] = None) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    # Run independent fetches at once; a failed or timed-out source yields None and a status instead of raising.
+    # Jobs named "sp:2024" etc. use the timeout of their source ("sp").
+    timeouts = timeouts or FETCH_TIMEOUTS
+    async def run(name: str, job: Awaitable[Any]) -> Tuple[str, Any, str]:
+        with metrics.stage(name):
+            try:
+                timeout = timeouts.get(name, timeouts.get(name.split(":")[0], HTTP_TIMEOUT))
+                return name, await asyncio.wait_for(job, timeout), "ok"
+            except asyncio.TimeoutError:
+                return name, None, "timeout"
+            except Exception:
+                return name, None, "error"
+    done = await asyncio.gather(*(run(name, job) for name, job in jobs.items()))
+    if metrics.ENABLED:
+        for name, _, status in done:
+            metrics.FETCH_RESULTS.inc((name.split(":")[0], status))
+    return {name: value for name, value, _ in done}, {name: status for name, _, status in done}
+
+def cfbd_upstream(**kwargs) -> Upstream:
+    return Upstream(CFBD_BASE, max_concurrency=int(env("CFBD_MAX_CONCURRENCY", "8")), name="cfbd", **kwargs)
+
+def odds_upstream(**kwargs) -> Upstream:
+    return Upstream(ODDS_BASE, max_concurrency=int(env("ODDS_MAX_CONCURRENCY", "4")), name="odds", **kwargs)
+
 class CFBDClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, http: Optional[Upstream] = None, api_key: Optional[str] = None, cache: Optional[TTLCache] = None):
+        self.http = http or cfbd_upstream()
         self.api_key = api_key or env("CFBD_KEY")
         self.headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+        self.cache = cache or CACHE
+        self.cache_info: Dict[str, Dict[str, Any]] = {}
 
-    async def get_games_for_team(self, client: httpx.AsyncClient, year: int, team: str) -> List[Dict[str, Any]]:
-        r = await client.get(f"{CFBD_BASE}/games", params={"year": year, "team": team, "seasonType": "both"}, headers=self.headers, timeout=30)
-        r.raise_for_status()
-        return r.json()
+    @metrics.timed("cfbd.get_games_for_team")
+    async def get_games_for_team(self, year: int, team: str) -> List[Dict[str, Any]]:
+        r = await self.http.get("/games", params={"year": year, "team": team, "seasonType": "both"}, headers=self.headers)
+        return json_loads(r.content)
 
-    async def get_venues(self, client: httpx.AsyncClient) -> List[Dict[str, Any]]:
-        r = await client.get(f"{CFBD_BASE}/venues", headers=self.headers, timeout=30)
-        r.raise_for_status()
-        return r.json()
+    @metrics.timed("cfbd.get_games")
+    async def get_games(self, year: int, season_type: str = "both") -> List[Dict[str, Any]]:
+        # Whole season in one call; get_games_for_team is one call per team.
+        r = await self.http.get("/games", params={"year": year, "seasonType": season_type}, headers=self.headers)
+        return json_loads(r.content)
 
-    async def get_sp_ratings(self, client: httpx.AsyncClient, year: int) -> List[Dict[str, Any]]:
-        r = await client.get(f"{CFBD_BASE}/ratings/sp", params={"year": year}, headers=self.headers, timeout=30)
-        r.raise_for_status()
-        return r.json()
+    @metrics.timed("cfbd.get_lines")
+    async def get_lines(self, year: int, season_type: str = "both") -> List[Dict[str, Any]]:
+        # Per-game closing lines from CFBD's providers, with scores.
+        r = await self.http.get("/lines", params={"year": year, "seasonType": season_type}, headers=self.headers)
+        return json_loads(r.content)
 
-    async def get_team_season_stats(self, client: httpx.AsyncClient, year: int) -> List[Dict[str, Any]]:
-        r = await client.get(f"{CFBD_BASE}/stats/season", params={"year": year}, headers=self.headers, timeout=30)
-        r.raise_for_status()
-        return r.json()
+    @metrics.timed("cfbd.get_teams")
+    async def get_teams(self) -> List[Dict[str, Any]]:
+        # Every team CFBD knows (FBS and below), with abbreviations, alternate names and mascots.
+        async def fetch():
+            r = await self.http.get("/teams", headers=self.headers)
+            return json_loads(r.content)
+        teams, info = await self.cache.get_or_fetch(("cfbd", "teams"), TEAMS_TTL, fetch)
+        self.cache_info["teams"] = info
+        metrics.cache_lookup("teams", info)
+        return teams
+
+    @metrics.timed("cfbd.get_venues")
+    async def get_venues(self) -> List[Dict[str, Any]]:
+        async def fetch():
+            r = await self.http.get("/venues", headers=self.headers)
+            return json_loads(r.content)
+        venues, info = await self.cache.get_or_fetch(("cfbd", "venues"), VENUES_TTL, fetch)
+        self.cache_info["venues"] = info
+        return venues
+
+    @metrics.timed("cfbd.get_schedule")
+    async def get_schedule(self, year: int) -> ScheduleIndex:
+        # The whole season's schedule from one /games call, indexed by team (schedule.py).
+        async def fetch():
+            games, venues = await asyncio.gather(self.get_games(year), self.get_venues())
+            return {"games": games, "venues": venues}
+        schedule, info = await self.cache.get_or_fetch(("cfbd", "schedule", year), SCHEDULE_TTL, fetch,
+                                                       lambda raw: schedule_index(year, raw))
+        self.cache_info["schedule"] = info
+        metrics.cache_lookup("schedule", info)
+        return schedule
+
+    @metrics.timed("cfbd.get_sp_ratings")
+    async def get_sp_ratings(self, year: int) -> List[Dict[str, Any]]:
+        store = await self.get_ratings(year)
+        return store.items
+
+    @metrics.timed("cfbd.get_ratings")
+    async def get_ratings(self, year: int) -> RatingsStore:
+        async def fetch():
+            r = await self.http.get("/ratings/sp", params={"year": year}, headers=self.headers)
+            return json_loads(r.content)
+        store, info = await self.cache.get_or_fetch(("cfbd", "sp", year), SP_TTL, fetch, lambda raw: RatingsStore(year, raw))
+        self.cache_info["sp"] = info
+        metrics.cache_lookup("sp", info)
+        return store
+
+    @metrics.timed("cfbd.get_calendar")
+    async def get_calendar(self, year: int) -> List[Dict[str, Any]]:
+        # Week boundaries (first/last kickoff per week) for the season.
+        async def fetch():
+            r = await self.http.get("/calendar", params={"year": year}, headers=self.headers)
+            return json_loads(r.content)
+        calendar, info = await self.cache.get_or_fetch(("cfbd", "calendar", year), CALENDAR_TTL, fetch)
+        self.cache_info["calendar"] = info
+        return calendar
+
+    @metrics.timed("cfbd.get_team_season_stats")
+    async def get_team_season_stats(self, year: int, start_week: Optional[int] = None, end_week: Optional[int] = None) -> List[Dict[str, Any]]:
+        params: Dict[str, Any] = {"year": year}
+        if start_week is not None:
+            params["startWeek"] = start_week
+        if end_week is not None:
+            params["endWeek"] = end_week
+        r = await self.http.get("/stats/season", params=params, headers=self.headers)
+        return json_loads(r.content)
 
-    async def get_team_ppa(self, client: httpx.AsyncClient, year: int) -> List[Dict[str, Any]]:
-        url = f"{CFBD_BASE}/metrics/ppa/teams"
+    @metrics.timed("cfbd.get_advanced_season_stats")
+    async def get_advanced_season_stats(self, year: int) -> List[Dict[str, Any]]:
+        r = await self.http.get("/stats/season/advanced", params={"year": year}, headers=self.headers)
+        return json_loads(r.content)
+
+    @metrics.timed("cfbd.get_team_ppa")
+    async def get_team_ppa(self, year: int) -> List[Dict[str, Any]]:
         try:
-            r = await client.get(url, params={"year": year}, headers=self.headers, timeout=30)
-            r.raise_for_status()
-            return r.json()
+            r = await self.http.get("/metrics/ppa/teams", params={"year": year}, headers=self.headers)
+            return json_loads(r.content)
         except httpx.HTTPStatusError:
             return []
 
+    @metrics.timed("cfbd.get_features")
+    async def get_features(self, year: int) -> TeamFeatures:
+        # Season team-feature matrix; only weeks completed since the last check reach CFBD.
+        features, info = await self.cache.get_or_fetch(("cfbd", "features", year), FEATURES_TTL,
+                                                       lambda: load_season(self, year), lambda raw: TeamFeatures(year, raw))
+        self.cache_info["features"] = info
+        metrics.cache_lookup("features", info)
+        return features
+
 class OddsClient:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, http: Optional[Upstream] = None, api_key: Optional[str] = None, cache: Optional[TTLCache] = None,
+                 quota: Optional[OddsQuota] = None):
+        self.http = http or odds_upstream()
         self.api_key = api_key or env("ODDS_KEY")
+        self.cache = cache or CACHE
+        self.quota = quota or ODDS_QUOTA
+        self.cache_info: Dict[str, Dict[str, Any]] = {}
+
+    async def _get_metered(self, path: str, params: Dict[str, Any], cost: int) -> Any:
+        # Every credit-costing call goes through here so the quota sees its headers.
+        entry = self.quota.acquire(cost)
+        try:
+            r = await self.http.get(path, params={**params, "apiKey": self.api_key})
+        except httpx.HTTPStatusError as e:
+            self.quota.settle(entry, e.response.headers)
+            raise
+        except BaseException:
+            self.quota.settle(entry, None)
+            raise
+        self.quota.settle(entry, r.headers)
+        return json_loads(r.content)
+
+    async def _cached_or_stale(self, key: Any, ttl: float, cost: int, fetch: Callable[[], Awaitable[Any]],
+                               build: Callable[[Any], Any]) -> Tuple[Any, Dict[str, Any]]:
+        # Fresh means younger than `ttl`. Past it, the entry is refetched only as often as the budget
+        # allows (quota.min_interval); until then, and once the budget is spent, the last good value
+        # is served marked stale.
+        paced = self.quota.min_interval(cost)
+        if paced > ttl:
+            held = self.cache.peek(key, paced)
+            if held is not None and held[1] > ttl:
+                value, age = held
+                return value, {"hit": True, "age_s": round(age, 1), "stale": True}
+        try:
+            return await self.cache.get_or_fetch(key, ttl, fetch, build)
+        except QuotaExceeded:
+            stale = self.cache.peek(key, math.inf)
+            if stale is None:
+                raise
+            value, age = stale
+            return value, {"hit": True, "age_s": round(age, 1), "stale": True}
 
-    async def get_odds(self, client: httpx.AsyncClient) -> List[Dict[str, Any]]:
+    @metrics.timed("odds.get_odds")
+    async def get_odds(self) -> List[Dict[str, Any]]:
+        board = await self.get_board()
+        return board.events
+
+    @metrics.timed("odds.fetch_odds")
+    async def fetch_odds(self, markets: str = ODDS_MARKETS, event_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
         params = {
-            "regions": "us",
-            "markets": "h2h,spreads,totals",
+            "regions": ODDS_REGIONS,
+            "markets": markets,
             "oddsFormat": "american",
             "dateFormat": "iso",
-            "apiKey": self.api_key
         }
-        r = await client.get(f"{ODDS_BASE}/odds", params=params, timeout=30)
-        r.raise_for_status()
-        return r.json()
+        if event_ids:
+            params["eventIds"] = ",".join(event_ids)
+        return await self._get_metered("/odds", params, request_cost(markets, ODDS_REGIONS))
+
+    @metrics.timed("odds.fetch_event_odds")
+    async def fetch_event_odds(self, event_id: str, markets: str = ODDS_MARKETS) -> Dict[str, Any]:
+        params = {"regions": ODDS_REGIONS, "markets": markets, "oddsFormat": "american", "dateFormat": "iso"}
+        return await self._get_metered(f"/events/{event_id}/odds", params, request_cost(markets, ODDS_REGIONS))
+
+    @metrics.timed("odds.fetch_board")
+    async def fetch_board(self, markets: str = ODDS_MARKETS) -> OddsBoard:
+        return OddsBoard(await self.fetch_odds(markets))
+
+    @metrics.timed("odds.get_board")
+    async def get_board(self, markets: str = ODDS_MARKETS, ttl: float = ODDS_TTL) -> OddsBoard:
+        # The board is indexed once per fetched snapshot; every request that reuses it skips the parsing.
+        board, info = await self._cached_or_stale(("odds", markets), ttl, request_cost(markets, ODDS_REGIONS),
+                                                  lambda: self.fetch_odds(markets), OddsBoard)
+        self.cache_info["odds"] = info
+        metrics.cache_lookup("odds", info)
+        return board
+
+    @metrics.timed("odds.get_events")
+    async def get_events(self) -> OddsBoard:
+        # Event ids and teams only. The events endpoint costs no credits.
+        async def fetch():
+            r = await self.http.get("/events", params={"dateFormat": "iso", "apiKey": self.api_key})
+            return json_loads(r.content)
+        board, _ = await self.cache.get_or_fetch(("odds", "events"), ODDS_EVENTS_TTL, fetch, OddsBoard)
+        return board
+
+    @metrics.timed("odds.get_event_board")
+    async def get_event_board(self, home: str, away: str, markets: str = ODDS_MARKETS, ttl: float = ODDS_TTL) -> OddsBoard:
+        # Odds for one game. A fresh full board is reused for free; otherwise only this event is fetched.
+        cached = self.cache.peek(("odds", markets), ttl)
+        if cached is not None and cached[0].find(home, away) is not None:
+            board, age = cached
+            info = {"hit": True, "age_s": round(age, 1)}
+        else:
+            try:
+                events = await self.get_events()
+            except httpx.HTTPError:
+                log.warning("odds events list unavailable; fetching the full board instead")
+                return await self.get_board(markets, ttl)
+            idx = events.find(home, away)
+            if idx is None:
+                board, info = OddsBoard([]), {"hit": True, "age_s": 0.0, "event": None}
+            else:
+                event_id = events.keys[idx]
+                board, info = await self._cached_or_stale(
+                    ("odds", "event", event_id, markets), ttl, request_cost(markets, ODDS_REGIONS),
+                    lambda: self.fetch_event_odds(event_id, markets), lambda raw: OddsBoard([raw]))
+        self.cache_info["odds"] = info
+        metrics.cache_lookup("odds", info)
+        return board
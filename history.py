@@ -0,0 +1,276 @@
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+from typing import Dict, Any, Optional, List, Tuple
+
+from board import OddsBoard, SPREADS, HOME
+from model import normalize_team_name
+from teams import TEAMS
+
+HISTORY_DB = os.getenv("ODDS_HISTORY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "odds_history.sqlite3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    event_key TEXT NOT NULL UNIQUE,
+    home TEXT, away TEXT, commence REAL,
+    -- Matching keys (teams.TEAMS.key); rows from older versions hold normalize_team_name.
+    home_norm TEXT, away_norm TEXT
+);
+CREATE INDEX IF NOT EXISTS events_pair ON events (home_norm, away_norm, commence);
+CREATE TABLE IF NOT EXISTS names (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+-- Append-only. A row is written only when a quote differs from its previous value,
+-- so unchanged snapshots cost nothing and the latest row per key is the current line.
+CREATE TABLE IF NOT EXISTS quotes (
+    event_id INTEGER NOT NULL,
+    book_id INTEGER NOT NULL,
+    market_id INTEGER NOT NULL,
+    outcome_id INTEGER NOT NULL,
+    ts REAL NOT NULL,
+    point REAL,
+    price INTEGER,
+    PRIMARY KEY (event_id, book_id, market_id, outcome_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS quotes_event_ts ON quotes (event_id, ts);
+"""
+
+QuoteKey = Tuple[str, str, str, str]
+
+# Every fetched odds board, stored as line changes keyed by event/book/market/outcome/time.
+class OddsHistory:
+    def __init__(self, path: str = HISTORY_DB, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._ids: Dict[Tuple[str, str], int] = {}
+        self._last: Dict[QuoteKey, Tuple[Any, Any]] = {}
+        # Queries run on worker threads (asyncio.to_thread), so each thread gets its own reader;
+        # a sqlite3 connection must not be used by two threads at once.
+        self._local = threading.local()
+        self._readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        if readonly:
+            # Query-only handle (backtest workers): no writer, no schema changes, no warm start.
+            self.conn = None
+            self.reader  # opened now, so a missing file fails here
+            return
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._load_last()
+
+    @property
+    def reader(self) -> sqlite3.Connection:
+        # This thread's query connection; under WAL readers never wait on the writer.
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            if self.readonly:
+                conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            else:
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._local.reader = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+
+    def close(self) -> None:
+        # check_same_thread=False on the readers is only so this can close them from one thread.
+        with self._readers_lock:
+            readers, self._readers = self._readers, []
+        for conn in readers:
+            conn.close()
+        self._local = threading.local()
+        if self.conn is not None:
+            self.conn.close()
+
+    def _load_last(self) -> None:
+        # Warm start: the latest value per quote, so a restart doesn't rewrite the whole board.
+        rows = self.conn.execute("""
+            SELECT e.event_key, b.name, m.name, o.name, q.point, q.price
+            FROM quotes q
+            JOIN (SELECT event_id, book_id, market_id, outcome_id, MAX(ts) AS ts FROM quotes
+                  GROUP BY event_id, book_id, market_id, outcome_id) last
+              USING (event_id, book_id, market_id, outcome_id, ts)
+            JOIN events e ON e.id = q.event_id
+            JOIN names b ON b.id = q.book_id
+            JOIN names m ON m.id = q.market_id
+            JOIN names o ON o.id = q.outcome_id
+        """)
+        for ek, book, market, outcome, point, price in rows:
+            self._last[(ek, book, market, outcome)] = (point, price)
+
+    def _name_id(self, name: str) -> int:
+        key = ("name", name)
+        if key not in self._ids:
+            self.conn.execute("INSERT OR IGNORE INTO names (name) VALUES (?)", (name,))
+            self._ids[key] = self.conn.execute("SELECT id FROM names WHERE name = ?", (name,)).fetchone()[0]
+        return self._ids[key]
+
+    def _event_id(self, board: OddsBoard, event_key: str) -> int:
+        key = ("event", event_key)
+        if key not in self._ids:
+            idx = board.by_key[event_key]
+            e = board.events[idx]
+            home, away = e.get("home_team") or "", e.get("away_team") or ""
+            self.conn.execute(
+                "INSERT INTO events (event_key, home, away, commence, home_norm, away_norm) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(event_key) DO UPDATE SET commence = excluded.commence",
+                (event_key, home, away, board.kickoffs[idx], TEAMS.key(home), TEAMS.key(away)),
+            )
+            self._ids[key] = self.conn.execute("SELECT id FROM events WHERE event_key = ?", (event_key,)).fetchone()[0]
+        return self._ids[key]
+
+    def record(self, board: OddsBoard, ts: Optional[float] = None) -> int:
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            changed = [(k, v) for k, v in board.quotes().items() if self._last.get(k) != v]
+            if not changed:
+                return 0
+            self.conn.execute("BEGIN")
+            try:
+                rows = [
+                    (self._event_id(board, ek), self._name_id(book), self._name_id(market), self._name_id(outcome),
+                     ts, point, price)
+                    for (ek, book, market, outcome), (point, price) in changed
+                ]
+                self.conn.executemany("INSERT OR REPLACE INTO quotes VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                # Ids handed out inside the rolled-back transaction are gone too.
+                self._ids.clear()
+                raise
+            self._last.update(changed)
+            return len(rows)
+
+    async def arecord(self, board: OddsBoard, ts: Optional[float] = None) -> int:
+        return await asyncio.to_thread(self.record, board, ts)
+
+    async def on_snapshot(self, prev, snapshot) -> None:
+        # Poller listener.
+        await self.arecord(snapshot.board, snapshot.fetched_at)
+
+    def _ids_for(self, event_key: str, book: str, market: str, outcome: str) -> Optional[Tuple[int, int, int, int]]:
+        row = self.reader.execute("""
+            SELECT e.id, b.id, m.id, o.id FROM events e, names b, names m, names o
+            WHERE e.event_key = ? AND b.name = ? AND m.name = ? AND o.name = ?
+        """, (event_key, book, market, outcome)).fetchone()
+        return tuple(row) if row else None
+
+    def quote_at(self, event_key: str, book: str, market: str, outcome: str,
+                 at: Optional[float] = None, first: bool = False) -> Optional[Dict[str, Any]]:
+        # first=True: opening quote. at=T: the quote in force at T. Neither: the current quote.
+        ids = self._ids_for(event_key, book, market, outcome)
+        if ids is None:
+            return None
+        sql = "SELECT ts, point, price FROM quotes WHERE event_id=? AND book_id=? AND market_id=? AND outcome_id=?"
+        args: List[Any] = list(ids)
+        if at is not None:
+            sql += " AND ts <= ?"
+            args.append(at)
+        sql += " ORDER BY ts LIMIT 1" if first else " ORDER BY ts DESC LIMIT 1"
+        row = self.reader.execute(sql, args).fetchone()
+        return {"ts": row[0], "point": row[1], "price": row[2]} if row else None
+
+    def find_event(self, home: str, away: str) -> Optional[str]:
+        # Most recent recorded event for this home/away pairing, by canonical team or, for
+        # rows recorded before canonical keys, the normalized name.
+        row = self.reader.execute(
+            "SELECT event_key FROM events WHERE home_norm IN (?, ?) AND away_norm IN (?, ?) ORDER BY commence DESC LIMIT 1",
+            (TEAMS.key(home), normalize_team_name(home), TEAMS.key(away), normalize_team_name(away)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def commence(self, event_key: str) -> Optional[float]:
+        row = self.reader.execute("SELECT commence FROM events WHERE event_key = ?", (event_key,)).fetchone()
+        return row[0] if row else None
+
+    def line_summary(self, event_key: str, book: str, market: str, outcome: str) -> Dict[str, Any]:
+        kickoff = self.commence(event_key)
+        current = self.quote_at(event_key, book, market, outcome)
+        closing = None
+        if kickoff is not None and time.time() >= kickoff:
+            closing = self.quote_at(event_key, book, market, outcome, at=kickoff)
+        return {
+            "open": self.quote_at(event_key, book, market, outcome, first=True),
+            "current": current,
+            "closing": closing,
+        }
+
+    def events_between(self, start: float, end: float) -> List[Tuple[str, str, str, float]]:
+        # (event_key, home, away, commence) for every recorded game kicking off in [start, end).
+        return self.reader.execute(
+            "SELECT event_key, home, away, commence FROM events WHERE commence >= ? AND commence < ? ORDER BY commence",
+            (start, end),
+        ).fetchall()
+
+    def closing_quotes(self, event_key: str) -> Dict[QuoteKey, Tuple[Any, Any]]:
+        # Every book's last quote at or before kickoff, keyed like OddsBoard.quotes().
+        rows = self.reader.execute("""
+            SELECT b.name, m.name, o.name, q.point, q.price
+            FROM events e
+            JOIN quotes q ON q.event_id = e.id
+            JOIN (SELECT q2.book_id, q2.market_id, q2.outcome_id, MAX(q2.ts) AS ts
+                  FROM quotes q2 JOIN events e2 ON e2.id = q2.event_id
+                  WHERE e2.event_key = ? AND q2.ts <= e2.commence
+                  GROUP BY q2.book_id, q2.market_id, q2.outcome_id) last
+              ON last.book_id = q.book_id AND last.market_id = q.market_id
+             AND last.outcome_id = q.outcome_id AND last.ts = q.ts
+            JOIN names b ON b.id = q.book_id
+            JOIN names m ON m.id = q.market_id
+            JOIN names o ON o.id = q.outcome_id
+            WHERE e.event_key = ?
+        """, (event_key, event_key))
+        return {(event_key, book, market, outcome): (point, price) for book, market, outcome, point, price in rows}
+
+    def movement(self, event_key: str, since: float) -> List[Dict[str, Any]]:
+        # Every quote for the event that moved after `since`, with its value at `since` and now.
+        rows = self.reader.execute("""
+            SELECT b.name, m.name, o.name
+            FROM quotes q
+            JOIN events e ON e.id = q.event_id
+            JOIN names b ON b.id = q.book_id
+            JOIN names m ON m.id = q.market_id
+            JOIN names o ON o.id = q.outcome_id
+            WHERE e.event_key = ? AND q.ts > ?
+            GROUP BY q.book_id, q.market_id, q.outcome_id
+        """, (event_key, since)).fetchall()
+        out = []
+        for book, market, outcome in rows:
+            then = self.quote_at(event_key, book, market, outcome, at=since)
+            now = self.quote_at(event_key, book, market, outcome)
+            out.append({"book": book, "market": market, "outcome": outcome, "then": then, "now": now})
+        return out
+
+def line_history(history: OddsHistory, board: OddsBoard, event_idx: Optional[int], book_idx: Optional[int], lines: Dict[str, Any]) -> Dict[str, Any]:
+    # Opening line, closing line and CLV for the selected book's home spread and over.
+    # CLV is in points from the home/over bettor's view: positive means today's number
+    # beats the close.
+    if event_idx is None or book_idx is None:
+        return {}
+    event = board.events[event_idx]
+    event_key = board.keys[event_idx]
+    book = board.book_keys[event_idx][book_idx]
+    # The book's own name for the home side, matched on the canonical team when building the board.
+    home = board.outcome_name(event_idx, book_idx, SPREADS, HOME) or normalize_team_name(event.get("home_team",""))
+    spread = history.line_summary(event_key, book, "spreads", home)
+    total = history.line_summary(event_key, book, "totals", "over")
+    out = {
+        "open_spread_home": spread["open"]["point"] if spread["open"] else None,
+        "open_total": total["open"]["point"] if total["open"] else None,
+        "closing_spread_home": spread["closing"]["point"] if spread["closing"] else None,
+        "closing_total": total["closing"]["point"] if total["closing"] else None,
+        "clv_spread_home_pts": None,
+        "clv_total_over_pts": None,
+    }
+    if out["closing_spread_home"] is not None and lines["spread_home"] is not None:
+        out["clv_spread_home_pts"] = round(lines["spread_home"] - out["closing_spread_home"], 2)
+    if out["closing_total"] is not None and lines["total"] is not None:
+        out["clv_total_over_pts"] = round(out["closing_total"] - lines["total"], 2)
+    return out
@@ -1,18 +1,16 @@
 import os
-from fastapi import FastAPI, Query, Request, Form
-from fastapi.responses import HTMLResponse
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Query, Request, Form, HTTPException
+from fastapi.responses import HTMLResponse, StreamingResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
-import httpx
-
-from utils import load_config, to_float
-from fetchers import CFBDClient, OddsClient
-from model import (
-    apply_injuries, apply_situational, apply_matchup_efficiency,
-    apply_explosiveness, apply_weather_total_adj, decision_from_edges,
-    select_book_line, normalize_team_name
-)
+from typing import Optional, Dict, Any, List, Tuple
 
 try:
     from dotenv import load_dotenv
@@ -20,11 +18,86 @@ try:
 except Exception:
     pass
 
+# Local modules read tuning knobs from the environment at import, so load .env first.
+import metrics
+from utils import parse_kickoff
+from config import ConfigManager, ModelConfig
+from board import OddsBoard
+from fetchers import CFBDClient, OddsClient, cfbd_upstream, odds_upstream, fetch_all
+from analysis import analyze_matchup, matchup_inputs, run_model_batch, board_games_on, market_summary
+from poller import OddsPoller
+from quota import ODDS_QUOTA
+from teams import keep_loaded
+from edges import EdgeTable
+from stream import EdgeBroadcaster, EdgeFilter, sse, edge_message
+from history import OddsHistory, HISTORY_DB, line_history
+from backtest import fetch_seasons
+from sweep import expand_grid, run_sweep
+from weather import WeatherService, make_provider, slate_weather
+from responses import ResponseCache, request_params, response_key, send
+
 CFG_PATH = os.path.join(os.path.dirname(__file__), "config.yaml")
-CFG = load_config(CFG_PATH)
+# Values posted through the /config form, layered over config.yaml. Shared by every worker.
+CFG_OVERRIDES_PATH = os.getenv("CONFIG_OVERRIDES", os.path.join(os.path.dirname(__file__), "config.overrides.yaml"))
+CONFIG = ConfigManager(CFG_PATH, CFG_OVERRIDES_PATH)
+# Single-game /analyze calls fetch just that event's odds instead of the whole board. Off by
+# default: an event call costs the same credits as the full board, which then serves every game.
+ODDS_EVENT_LOOKUPS = os.getenv("ODDS_EVENT_LOOKUPS", "0") == "1"
 
-app = FastAPI(title="Ken CFB Middleware", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pooled keep-alive connections per upstream, reused by every request.
+    app.state.cfbd_http = cfbd_upstream()
+    app.state.odds_http = odds_upstream()
+    # Optional background odds poller: /analyze then reads its snapshot instead of fetching.
+    app.state.poller = None
+    app.state.edges = None
+    app.state.broadcaster = EdgeBroadcaster()
+    # Append-only odds history (opening/closing lines, CLV, movement); ODDS_HISTORY_DB="" disables it.
+    app.state.history = OddsHistory(HISTORY_DB) if HISTORY_DB else None
+    # Config sweep jobs (POST /sweep); the worker pool starts with the first job.
+    app.state.sweeps = OrderedDict()
+    app.state.sweep_tasks = set()
+    app.state.sweep_pool = None
+    # Team-name index (teams.py) gains CFBD's full team list in the background.
+    app.state.teams_task = asyncio.create_task(keep_loaded(CFBDClient(app.state.cfbd_http).get_teams))
+    # Kickoff-hour forecasts (weather.py); off unless WEATHER_PROVIDER names a source, so games stay calm.
+    provider = make_provider()
+    app.state.weather = WeatherService(provider) if provider else None
+    # Serialized /analyze responses with their ETags (responses.py).
+    app.state.responses = ResponseCache()
+    if os.getenv("ODDS_POLLER", "0") == "1":
+        app.state.poller = OddsPoller(OddsClient(app.state.odds_http))
+        # Materialized edges for the whole board, refreshed incrementally on every poll.
+        cfbd = CFBDClient(app.state.cfbd_http)
+        app.state.edges = EdgeTable(CONFIG.get, *book_prefs(), load_ratings=cfbd.get_ratings,
+                                    load_features=cfbd.get_features, load_schedule=cfbd.get_schedule,
+                                    weather=app.state.weather)
+        app.state.poller.listeners.append(app.state.edges.on_snapshot)
+        if app.state.history:
+            app.state.poller.listeners.append(app.state.history.on_snapshot)
+        app.state.edges.listeners.append(app.state.broadcaster.publish)
+        app.state.poller.start()
+    try:
+        yield
+    finally:
+        app.state.teams_task.cancel()
+        if app.state.poller:
+            await app.state.poller.stop()
+        if app.state.history:
+            app.state.history.close()
+        if app.state.sweep_pool:
+            app.state.sweep_pool.shutdown(wait=False, cancel_futures=True)
+        if app.state.weather:
+            await app.state.weather.aclose()
+        await app.state.cfbd_http.aclose()
+        await app.state.odds_http.aclose()
+
+app = FastAPI(title="Ken CFB Middleware", version="1.0.0", lifespan=lifespan)
 templates = Jinja2Templates(directory="templates")
+if metrics.ENABLED:
+    # Server-Timing on every response, plus request latency histograms for /metrics.
+    app.add_middleware(metrics.TimingMiddleware)
 
 # ========= Analyze Endpoint =========
 
@@ -56,13 +129,78 @@ class AnalyzeResponse(BaseModel):
     lines: Dict[str, Any]
     model: Dict[str, Any]
     decisions: Dict[str, Any]
+    cache: Dict[str, Any] = {}
+    degraded: List[str] = []
+    history: Dict[str, Any] = {}
+    market: Dict[str, Any] = {}
+    config_version: Optional[str] = None
+
+def book_prefs():
+    primary_book_kw = os.getenv("PRIMARY_BOOK_KEYWORD", "DraftKings")
+    allowed_books = [s.strip() for s in os.getenv("ALLOWED_BOOKS", "DraftKings,FanDuel,Caesars").split(",") if s.strip()]
+    return primary_book_kw, allowed_books
+
+async def load_inputs(request: Request, years: List[int], game: Optional[Tuple[str, str]] = None):
+    # Board, SP+, team features and schedule for each season. A published poller snapshot is used as-is (no I/O);
+    # otherwise the odds fetch joins the fan-out. With `game` (home, away) only that event's
+    # odds are fetched unless a fresh full board is already cached.
+    cfbd = CFBDClient(request.app.state.cfbd_http)
+    odds = OddsClient(request.app.state.odds_http)
+    poller = getattr(request.app.state, "poller", None)
+    snapshot = poller.snapshot if poller else None
+
+    # Independent upstreams fan out together; each degrades to None on its own timeout/error.
+    jobs = {f"sp:{y}": cfbd.get_ratings(y) for y in years}
+    jobs.update({f"features:{y}": cfbd.get_features(y) for y in years})
+    jobs.update({f"schedule:{y}": cfbd.get_schedule(y) for y in years})
+    if snapshot is None:
+        jobs["odds"] = odds.get_event_board(*game) if game and ODDS_EVENT_LOOKUPS else odds.get_board()
+    data, status = await fetch_all(jobs)
+    degraded = [name for name, s in status.items() if s != "ok"]
+
+    board = snapshot.board if snapshot else (data["odds"] or OddsBoard([]))
+    ratings = {y: data[f"sp:{y}"] for y in years}
+    features = {y: data[f"features:{y}"] for y in years}
+    schedules = {y: data[f"schedule:{y}"] for y in years}
+    cache = {**odds.cache_info, **cfbd.cache_info}
+    history = getattr(request.app.state, "history", None)
+    if history and data.get("odds") and not cache["odds"]["hit"]:
+        # A fresh on-demand board goes into the history; the poller records its own.
+        await history.arecord(board)
+    if snapshot:
+        cache["odds"] = snapshot.info()
+    return board, ratings, features, schedules, cache, degraded
+
+async def load_weather(request: Request, board: OddsBoard, schedules: Dict[int, Any],
+                       games: List[Tuple[str, str, str]], degraded: List[str]) -> List[Dict[str, float]]:
+    # Kickoff-hour conditions per (home, away, date). Only outdoor games missing from the
+    # weather cache are fetched, all in one batch; a warm slate does no I/O here.
+    service = getattr(request.app.state, "weather", None)
+    slots = [service.slot(schedules.get(int(d.split("-")[0])), board, h, a, d) if service else None for h, a, d in games]
+    weather, ok = await slate_weather(service, slots)
+    if not ok:
+        degraded.append("weather")
+    return weather
+
+def odds_version(board: OddsBoard, cache: Dict[str, Any]) -> str:
+    # The poller snapshot a request read, else the fetched board it used.
+    version = cache.get("odds", {}).get("version")
+    return f"snapshot:{version}" if version is not None else f"board:{board.serial}"
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "config_version": CONFIG.get().version, "odds_quota": ODDS_QUOTA.info()}
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    # Prometheus text format, this worker only.
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="metrics are disabled (METRICS=0)")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/analyze", response_model=AnalyzeResponse)
 async def analyze_game(
+    request: Request,
     home: str = Query(..., description="Home team name"),
     away: str = Query(..., description="Away team name"),
     date: str = Query(..., description="Game date YYYY-MM-DD"),
@@ -70,106 +208,265 @@ async def analyze_game(
     injuries_away: Optional[InjuryPayload] = None,
     situational: Optional[SituationalPayload] = None
 ):
-    primary_book_kw = os.getenv("PRIMARY_BOOK_KEYWORD", "DraftKings")
-    allowed_books = [s.strip() for s in os.getenv("ALLOWED_BOOKS", "DraftKings,FanDuel,Caesars").split(",") if s.strip()]
+    primary_book_kw, allowed_books = book_prefs()
+    cfg = CONFIG.get()
+    responses = request.app.state.responses
+    params = request_params(home, away, date, injuries_home, injuries_away, situational)
+    # With the poller the odds version is known up front, so a repeat costs one lookup.
+    poller = getattr(request.app.state, "poller", None)
+    snapshot = poller.snapshot if poller else None
+    key = response_key(params, f"snapshot:{snapshot.version}", cfg.version) if snapshot else None
+    hit = responses.get(key)
+    if hit:
+        return send(request, hit)
 
     year = int(date.split("-")[0])
-    cfbd = CFBDClient()
-    odds = OddsClient()
-
-    game_info = {"home": home, "away": away, "date": date}
-    async with httpx.AsyncClient(timeout=30) as client:
-        odds_list = await odds.get_odds(client)
-        event = None
-        nh, na = normalize_team_name(home), normalize_team_name(away)
-        for e in odds_list:
-            teams = [normalize_team_name(t) for t in e.get("teams",[])]
-            home_team = normalize_team_name(e.get("home_team",""))
-            if nh in teams and na in teams and home_team == nh:
-                event = e
-                break
-        selected_book = select_book_line(event, primary_book_kw, allowed_books) if event else {}
-
-        spread_line = None
-        spread_odds = None
-        total_line = None
-        total_odds = None
-        moneyline_odds = None
-
-        if selected_book:
-            for m in selected_book.get("markets", []):
-                key = m.get("key") or m.get("market_key") or ""
-                if "spreads" in key:
-                    for out in m.get("outcomes", []):
-                        if normalize_team_name(out.get("name","")) == nh:
-                            spread_line = to_float(out.get("point"))
-                            spread_odds = int(out.get("price", -110))
-                elif "totals" in key:
-                    for out in m.get("outcomes", []):
-                        if out.get("name","").lower().startswith("over"):
-                            total_line = to_float(out.get("point"))
-                            total_odds = int(out.get("price", -110))
-                elif key in ("h2h","moneyline"):
-                    for out in m.get("outcomes", []):
-                        if normalize_team_name(out.get("name","")) == nh:
-                            moneyline_odds = int(out.get("price", -110))
-
-        # Ratings delta via SP+ (fallback to 0 if not available)
-        ratings_delta = 0.0
+    board, ratings, features, schedules, cache, degraded = await load_inputs(request, [year], (home, away))
+
+    loaded_key = response_key(params, odds_version(board, cache), cfg.version)
+    if loaded_key != key:
+        key = loaded_key
+        hit = responses.get(key)
+        if hit:
+            return send(request, hit)
+
+    (weather,) = await load_weather(request, board, schedules, [(home, away, date)], degraded)
+
+    result = analyze_matchup(
+        home, away, date, board, ratings[year], cfg, primary_book_kw, allowed_books,
+        injuries_home=(injuries_home.dict() if injuries_home else {}),
+        injuries_away=(injuries_away.dict() if injuries_away else {}),
+        situational=(situational.dict() if situational else {}),
+        features=features[year],
+        schedule=schedules[year],
+        weather=weather,
+    )
+    result["cache"] = cache
+    result["degraded"] = degraded
+    result["config_version"] = cfg.version
+    event_idx = board.find(home, away)
+    result["market"] = market_summary(board, event_idx, allowed_books)
+    history = getattr(request.app.state, "history", None)
+    if history:
+        book_idx = board.select_book(event_idx, primary_book_kw, allowed_books) if event_idx is not None else None
+        with metrics.stage("history"):
+            # SQLite reads; kept off the event loop.
+            result["history"] = await asyncio.to_thread(line_history, history, board, event_idx, book_idx, result["lines"])
+    if degraded:
+        return result
+    # Same fields and order FastAPI would send for the response model.
+    return send(request, responses.put(key, AnalyzeResponse(**result).dict()))
+
+@app.get("/lines/movement")
+async def line_movement(
+    request: Request,
+    home: str = Query(..., description="Home team name"),
+    away: str = Query(..., description="Away team name"),
+    since: Optional[str] = Query(None, description="ISO timestamp; default 24 hours ago")
+):
+    # Every quote for the game that moved after `since`: its value then and now, per book/market/outcome.
+    history = getattr(request.app.state, "history", None)
+    if history is None:
+        raise HTTPException(status_code=503, detail="Odds history is disabled (ODDS_HISTORY_DB is empty)")
+    event_key = await asyncio.to_thread(history.find_event, home, away)
+    if event_key is None:
+        raise HTTPException(status_code=404, detail="No recorded odds for this game")
+    since_dt = parse_kickoff(since) if since else None
+    since_ts = since_dt.timestamp() if since_dt else time.time() - 86400
+    return {"event": event_key, "since": since_ts, "moves": await asyncio.to_thread(history.movement, event_key, since_ts)}
+
+# ========= Slate Endpoint =========
+
+class SlateGame(BaseModel):
+    home: str
+    away: str
+    date: Optional[str] = None
+    injuries_home: Optional[InjuryPayload] = None
+    injuries_away: Optional[InjuryPayload] = None
+    situational: Optional[SituationalPayload] = None
+
+class SlateRequest(BaseModel):
+    date: Optional[str] = None
+    games: Optional[List[SlateGame]] = None
+
+class SlateResponse(BaseModel):
+    date: Optional[str]
+    games: List[Dict[str, Any]]
+    cache: Dict[str, Any] = {}
+    degraded: List[str] = []
+    config_version: Optional[str] = None
+
+@app.post("/analyze/slate", response_model=SlateResponse)
+async def analyze_slate(request: Request, slate: SlateRequest):
+    # One odds fetch and one ratings, features and schedule fetch per season cover the whole slate.
+    # With no games listed, every event on the board for `date` is analyzed.
+    if not slate.games and not slate.date:
+        raise HTTPException(status_code=422, detail="Provide a date, a list of games, or both")
+    primary_book_kw, allowed_books = book_prefs()
+
+    games = slate.games
+    dates = [g.date or slate.date for g in games] if games else []
+    if games and not all(dates):
+        raise HTTPException(status_code=422, detail="Each game needs a date when no slate date is given")
+    years = sorted({int(d.split("-")[0]) for d in (dates or [slate.date])})
+
+    board, ratings, features, schedules, cache, degraded = await load_inputs(request, years)
+
+    if games:
+        inputs = [
+            (g.home, g.away, d,
+             g.injuries_home.dict() if g.injuries_home else {},
+             g.injuries_away.dict() if g.injuries_away else {},
+             g.situational.dict() if g.situational else {})
+            for g, d in zip(games, dates)
+        ]
+    else:
+        inputs = [(g["home"], g["away"], g["date"], {}, {}, {}) for g in board_games_on(board, slate.date)]
+
+    weather = await load_weather(request, board, schedules, [(home, away, d) for home, away, d, *_ in inputs], degraded)
+
+    cfg = CONFIG.get()
+    results = run_model_batch([
+        matchup_inputs(home, away, d, board, ratings[y], primary_book_kw, allowed_books, ih, ia, situ, features[y], schedules[y], wx)
+        for (home, away, d, ih, ia, situ), wx in zip(inputs, weather)
+        for y in [int(d.split("-")[0])]
+    ], cfg)
+    return {
+        "date": slate.date,
+        "games": results,
+        "cache": cache,
+        "degraded": degraded,
+        "config_version": cfg.version,
+    }
+
+# ========= Edge Table Endpoint =========
+
+@app.get("/edges")
+async def current_edges(request: Request):
+    # Every game on the board with its current edges; needs the background poller.
+    edges = getattr(request.app.state, "edges", None)
+    if edges is None:
+        raise HTTPException(status_code=503, detail="Edge table requires ODDS_POLLER=1")
+    edges.sync_config()
+    return edges.table()
+
+SSE_HEARTBEAT_S = float(os.getenv("SSE_HEARTBEAT_S", "15"))
+
+def csv_list(s: Optional[str]) -> List[str]:
+    return [x.strip() for x in s.split(",") if x.strip()] if s else []
+
+@app.get("/stream/edges")
+async def stream_edges(
+    request: Request,
+    teams: Optional[str] = Query(None, description="Comma-separated teams to follow"),
+    books: Optional[str] = Query(None, description="Comma-separated book names to follow"),
+    min_edge: float = Query(0.0, description="Only games whose spread or total edge reaches this many points")
+):
+    # Server-Sent Events: the current table first, then one "edge" event per game whose
+    # edges or decisions change. Slow clients get the latest state per game, not a backlog.
+    edges = getattr(request.app.state, "edges", None)
+    if edges is None:
+        raise HTTPException(status_code=503, detail="Edge stream requires ODDS_POLLER=1")
+    edges.sync_config()
+    flt = EdgeFilter(csv_list(teams), csv_list(books), min_edge)
+    broadcaster = request.app.state.broadcaster
+    sub = broadcaster.subscribe(flt)
+
+    async def events():
         try:
-            sp = await cfbd.get_sp_ratings(client, year)
-            sp_map = { (item.get("team","") or "").lower(): item for item in sp }
-            h_sp = sp_map.get(home.lower(), {})
-            a_sp = sp_map.get(away.lower(), {})
-            ratings_delta = (h_sp.get("rating", 0.0) or 0.0) - (a_sp.get("rating", 0.0) or 0.0)
-        except Exception:
-            pass
-
-        matchup = {"rush_adv": 0.0, "pass_adv": 0.0, "finish_adv": 0.0, "havoc_adv": 0.0}
-        explosiveness = {"home_top_offense": False, "away_leaky_def": False, "extreme": False, "favored_team_leaky": False}
-
-        model_line = ratings_delta + CFG["home_field"]["base_hfa_pts"]
-        model_total = 52.0
-
-        model_line = apply_situational(model_line, (situational.dict() if situational else {}), CFG)
-        model_line = apply_matchup_efficiency(model_line, matchup, CFG)
-        model_line = apply_explosiveness(model_line, explosiveness, CFG, is_favorite_home=(model_line >= 0))
-        model_line = apply_injuries(model_line, (injuries_home.dict() if injuries_home else {}), (injuries_away.dict() if injuries_away else {}), CFG)
-        model_total = apply_weather_total_adj(model_total, {"wind_mph": 0.0, "precip_mm": 0.0}, CFG)
-
-        edges = {
-            "spread_edge_pts": round(model_line - (spread_line if spread_line is not None else model_line), 2),
-            "total_edge_pts": round(model_total - (total_line if total_line is not None else model_total), 2)
-        }
-
-        decisions = decision_from_edges(edges["spread_edge_pts"], edges["total_edge_pts"], CFG)
-
-        return {
-            "game": game_info,
-            "lines": {
-                "book": selected_book.get("title") or selected_book.get("key") or "unknown",
-                "spread_home": spread_line,
-                "spread_odds_home": spread_odds,
-                "total": total_line,
-                "total_over_odds": total_odds,
-                "moneyline_home_odds": moneyline_odds
-            },
-            "model": {
-                "model_line_home_minus": round(model_line, 2),
-                "model_total": round(model_total, 1),
-                "components": {
-                    "ratings_delta": round(ratings_delta, 2),
-                    "notes": "Matchup, explosiveness, injuries, situational applied per config"
-                },
-                "edges": edges
-            },
-            "decisions": decisions
-        }
+            for key, row in list(edges.rows.items()):
+                event = {"key": key, "type": "snapshot", "version": edges.version,
+                         "config_version": edges.config_version, "previous": None, "current": row}
+                if flt.matches(event):
+                    yield sse("edge", edge_message(event))
+            while not await request.is_disconnected():
+                batch = await sub.next_batch(SSE_HEARTBEAT_S)
+                if not batch:
+                    yield ": keepalive\n\n"
+                    continue
+                for event in batch:
+                    yield sse("edge", edge_message(event))
+        finally:
+            broadcaster.unsubscribe(sub)
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ========= Config Sweep Jobs =========
+
+SWEEP_WORKERS = int(os.getenv("SWEEP_WORKERS", "1"))
+SWEEP_MAX_JOBS = int(os.getenv("SWEEP_MAX_JOBS", "20"))
+
+class SweepRequest(BaseModel):
+    years: List[int]
+    grid: Dict[str, List[float]]
+    top: int = 25
+    sort: str = "roi"
+    min_bets: int = 0
+    prior_ratings: bool = False
+
+async def sweep_job(app: FastAPI, job: Dict[str, Any], req: SweepRequest, cfg: ModelConfig) -> None:
+    try:
+        job["status"] = "fetching"
+        needed = sorted(set(req.years) | ({y - 1 for y in req.years} if req.prior_ratings else set()))
+        await fetch_seasons(needed, cfbd=CFBDClient(app.state.cfbd_http))
+        job["status"] = "running"
+        if app.state.sweep_pool is None:
+            app.state.sweep_pool = ProcessPoolExecutor(max_workers=SWEEP_WORKERS)
+        primary_book_kw, allowed_books = book_prefs()
+        job["result"] = await asyncio.get_running_loop().run_in_executor(app.state.sweep_pool, partial(
+            run_sweep, req.years, cfg, req.grid, primary_book_kw, allowed_books,
+            prior_ratings=req.prior_ratings, top=req.top, sort=req.sort, min_bets=req.min_bets,
+        ))
+        job["status"] = "done"
+    except Exception as e:
+        job["status"], job["error"] = "error", str(e)
+    finally:
+        job["finished_at"] = time.time()
+
+@app.post("/sweep", status_code=202)
+async def start_sweep(request: Request, req: SweepRequest):
+    # Scores every combination in `grid` against the given seasons in a worker process.
+    # Poll GET /sweep/{job_id} for the ranked table.
+    try:
+        expand_grid(req.grid)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if req.sort not in ("roi", "won"):
+        raise HTTPException(status_code=422, detail="sort must be 'roi' or 'won'")
+    jobs = request.app.state.sweeps
+    while len(jobs) >= SWEEP_MAX_JOBS:
+        oldest = next((k for k, j in jobs.items() if j.get("finished_at")), None)
+        if oldest is None:
+            raise HTTPException(status_code=429, detail="Too many sweep jobs in progress")
+        jobs.pop(oldest)
+    cfg = CONFIG.get()
+    job = {"id": uuid.uuid4().hex, "status": "queued", "created_at": time.time(), "config_version": cfg.version}
+    jobs[job["id"]] = job
+    task = asyncio.create_task(sweep_job(request.app, job, req, cfg))
+    request.app.state.sweep_tasks.add(task)
+    task.add_done_callback(request.app.state.sweep_tasks.discard)
+    return {"job_id": job["id"], "status": job["status"], "config_version": cfg.version}
+
+@app.get("/sweep/{job_id}")
+async def sweep_status(request: Request, job_id: str):
+    job = request.app.state.sweeps.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown sweep job")
+    return job
 
 # ========= Config Form Endpoint =========
 
 config_store = {}
 
+# Form field -> config.yaml setting it tunes. Fields without a model setting are kept for display only.
+FORM_SETTINGS = {
+    "home_field": ("home_field", "base_hfa_pts"),
+    "bye_week": ("situational", "bye_week_bonus_pts"),
+    "travel_fatigue": ("situational", "longhaul_altitude_penalty_pts"),
+    "lookahead": ("situational", "trap_game_penalty_pts_low"),
+}
+
 @app.get("/config", response_class=HTMLResponse)
 async def get_config(request: Request):
     return templates.TemplateResponse("config.html", {"request": request})
@@ -197,7 +494,17 @@ async def post_config(
         "bye_week": bye_week,
         "lookahead": lookahead
     }
-    return templates.TemplateResponse("result.html", {"request": request, "config": config_store})
+    overrides: Dict[str, Dict[str, float]] = {}
+    for field, (section, key) in FORM_SETTINGS.items():
+        overrides.setdefault(section, {})[key] = config_store[field]
+    try:
+        cfg = CONFIG.update(overrides)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    edges = getattr(request.app.state, "edges", None)
+    if edges:
+        edges.sync_config()
+    return templates.TemplateResponse("result.html", {"request": request, "config": config_store, "config_version": cfg.version})
 
 # after endpoints
 print("Routes:", [route.path for route in app.routes])
@@ -0,0 +1,217 @@
+import os
+import math
+import time
+import functools
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Tuple, List, Callable
+
+# Per-stage timings for the hot path. Every timed stage lands in a Prometheus histogram
+# (GET /metrics) and, inside a request, in that response's Server-Timing header.
+# METRICS=0 turns it all off: stage() hands back a shared no-op, timed() leaves functions
+# undecorated and the middleware isn't installed.
+#
+# Numbers are per worker process; scrape each worker (or run one) for the full picture.
+
+ENABLED = os.getenv("METRICS", "1") == "1"
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+
+Labels = Tuple[str, ...]
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...]):
+        self.name, self.help, self.labelnames = name, help, labelnames
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, value: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in sorted(self.values.items()):
+            out.append(f"{self.name}{_labels(self.labelnames, labels)} {_num(v)}")
+        return out
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames, self.buckets = name, help, labelnames, buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        row = self.values.get(labels)
+        if row is None:
+            row = self.values[labels] = [0.0] * (len(self.buckets) + 2)
+        for i, le in enumerate(self.buckets):
+            if value <= le:
+                row[i] += 1
+                break
+        else:
+            row[-2] += 1
+        row[-1] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, row in sorted(self.values.items()):
+            cum = 0.0
+            for le, n in zip(self.buckets + (math.inf,), row[:-1]):
+                cum += n
+                out.append(f"{self.name}_bucket{_labels(names, labels + ('+Inf' if le == math.inf else _num(le),))} {_num(cum)}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_num(row[-1])}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, labels)} {_num(cum)}")
+        return out
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+def _labels(names: Tuple[str, ...], values: Labels) -> str:
+    if not names:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, esc)) + "}"
+
+HTTP_SECONDS = Histogram("cfb_http_request_seconds", "Request latency by route, up to the response headers.", ("method", "route", "status"))
+STAGE_SECONDS = Histogram("cfb_stage_seconds", "Time spent in each request stage.", ("stage",))
+CLIENT_SECONDS = Histogram("cfb_client_seconds", "CFBDClient/OddsClient method latency, cache hits included.", ("method",))
+UPSTREAM_SECONDS = Histogram("cfb_upstream_request_seconds", "Upstream HTTP latency, semaphore wait included.", ("upstream",))
+UPSTREAM_BYTES = Histogram("cfb_upstream_response_bytes", "Upstream response body size.", ("upstream",), SIZE_BUCKETS)
+UPSTREAM_RESPONSES = Counter("cfb_upstream_responses_total", "Upstream HTTP responses by status code.", ("upstream", "status"))
+UPSTREAM_ERRORS = Counter("cfb_upstream_errors_total", "Upstream failures: timeout, transport or http status.", ("upstream", "kind"))
+FETCH_RESULTS = Counter("cfb_fetch_total", "Fan-out jobs by source and outcome (ok, timeout, error).", ("source", "status"))
+CACHE_LOOKUPS = Counter("cfb_cache_lookups_total", "Cache lookups by result (hit, shared, coalesced, stale, miss).", ("cache", "result"))
+
+REGISTRY = [HTTP_SECONDS, STAGE_SECONDS, CLIENT_SECONDS, UPSTREAM_SECONDS, UPSTREAM_BYTES,
+            UPSTREAM_RESPONSES, UPSTREAM_ERRORS, FETCH_RESULTS, CACHE_LOOKUPS]
+
+# Stage name -> seconds for the request being served; None outside a request.
+_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("server_timing", default=None)
+
+def record(name: str, seconds: float, hist: Histogram = STAGE_SECONDS) -> None:
+    # "sp:2025" is one Server-Timing entry per season but a single "sp" histogram series.
+    hist.observe((name.split(":")[0],), seconds)
+    timings = _timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+class _Stage:
+    __slots__ = ("name", "hist", "t0")
+
+    def __init__(self, name: str, hist: Histogram):
+        self.name, self.hist = name, hist
+
+    def __enter__(self) -> "_Stage":
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        record(self.name, time.perf_counter() - self.t0, self.hist)
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoStage":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+_NO_STAGE = _NoStage()
+
+def stage(name: str):
+    # with stage("match"): ...
+    return _Stage(name, STAGE_SECONDS) if ENABLED else _NO_STAGE
+
+def timed(name: str) -> Callable:
+    # Decorator for async client methods.
+    def wrap(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+        @functools.wraps(fn)
+        async def inner(*args, **kwargs):
+            with _Stage(name, CLIENT_SECONDS):
+                return await fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def cache_lookup(cache: str, info: Dict[str, Any]) -> None:
+    if not ENABLED:
+        return
+    if not info.get("hit"):
+        result = "miss"
+    elif info.get("stale"):
+        result = "stale"
+    elif info.get("coalesced"):
+        result = "coalesced"
+    elif info.get("shared"):
+        result = "shared"
+    else:
+        result = "hit"
+    CACHE_LOOKUPS.inc((cache, result))
+
+def render() -> str:
+    lines: List[str] = []
+    for m in REGISTRY:
+        lines.extend(m.render())
+    # Convenience gauge; rate() over cfb_cache_lookups_total is the better alert source.
+    lines += ["# HELP cfb_cache_hit_ratio Share of cache lookups served without an upstream call.",
+              "# TYPE cfb_cache_hit_ratio gauge"]
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), n in CACHE_LOOKUPS.values.items():
+        t = totals.setdefault(cache, [0.0, 0.0])
+        t[1] += n
+        if result != "miss":
+            t[0] += n
+    for cache, (hits, total) in sorted(totals.items()):
+        lines.append(f"cfb_cache_hit_ratio{_labels(('cache',), (cache,))} {_num(round(hits / total, 6))}")
+    return "\n".join(lines) + "\n"
+
+def server_timing(timings: Dict[str, float], total: float) -> str:
+    # Server-Timing names are HTTP tokens, so "sp:2025" goes out as "sp-2025".
+    parts = [f"{name.replace(':', '-')};dur={s * 1000:.2f}" for name, s in timings.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+def _route(scope: Dict[str, Any]) -> str:
+    # The route template ("/sweep/{job_id}"), never the raw path, to keep label sets bounded.
+    route = scope.get("route")
+    if route is None:
+        from starlette.routing import Match
+        for r in getattr(scope.get("app"), "routes", ()):
+            if r.matches(scope)[0] == Match.FULL:
+                route = r
+                break
+    return getattr(route, "path", "unmatched")
+
+class TimingMiddleware:
+    # Plain ASGI so streaming responses (SSE) pass through untouched; only the headers are amended.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings: Dict[str, float] = {}
+        token = _timings.set(timings)
+        t0 = time.perf_counter()
+        status = [0]
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - t0
+                status[0] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(timings, total).encode("latin-1")))
+                message = {**message, "headers": headers}
+                HTTP_SECONDS.observe((scope["method"], _route(scope), str(status[0])), total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        except Exception:
+            if not status[0]:
+                HTTP_SECONDS.observe((scope["method"], _route(scope), "500"), time.perf_counter() - t0)
+            raise
+        finally:
+            _timings.reset(token)
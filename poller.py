@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+from board import OddsBoard
+from fetchers import OddsClient, ODDS_MARKETS, ODDS_REGIONS
+from quota import request_cost
+
+log = logging.getLogger(__name__)
+
+# Poll fast while games are close to (or past) kickoff, slower on game day, slowest midweek.
+POLL_NEAR_KICKOFF_S = float(os.getenv("POLL_NEAR_KICKOFF_S", "60"))
+POLL_GAMEDAY_S = float(os.getenv("POLL_GAMEDAY_S", "300"))
+POLL_MIDWEEK_S = float(os.getenv("POLL_MIDWEEK_S", "1800"))
+NEAR_KICKOFF_WINDOW_S = float(os.getenv("POLL_NEAR_KICKOFF_WINDOW_S", "7200"))
+GAMEDAY_WINDOW_S = float(os.getenv("POLL_GAMEDAY_WINDOW_S", "86400"))
+# Games stay "live" on the board for roughly this long after kickoff.
+IN_PROGRESS_S = 4 * 3600
+
+@dataclass(frozen=True)
+class OddsSnapshot:
+    version: int
+    fetched_at: float
+    board: OddsBoard
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "source": "poller",
+            "version": self.version,
+            "fetched_at": self.fetched_at,
+            "age_s": round(time.time() - self.fetched_at, 1),
+        }
+
+def poll_interval(board: Optional[OddsBoard], now: Optional[float] = None) -> float:
+    if board is None:
+        return POLL_NEAR_KICKOFF_S
+    now = time.time() if now is None else now
+    upcoming = [k - now for k in board.kickoffs if k is not None and k > now - IN_PROGRESS_S]
+    if not upcoming:
+        return POLL_MIDWEEK_S
+    soonest = min(upcoming)
+    if soonest <= NEAR_KICKOFF_WINDOW_S:
+        return POLL_NEAR_KICKOFF_S
+    if soonest <= GAMEDAY_WINDOW_S:
+        return POLL_GAMEDAY_S
+    return POLL_MIDWEEK_S
+
+# Background task that owns the odds board. Each successful poll publishes a new immutable
+# snapshot; readers grab `poller.snapshot` without awaiting anything.
+class OddsPoller:
+    def __init__(self, odds: OddsClient):
+        self.odds = odds
+        self.snapshot: Optional[OddsSnapshot] = None
+        # Called with (previous, new) after every publish, e.g. EdgeTable.on_snapshot.
+        self.listeners: List[Callable[[Optional[OddsSnapshot], OddsSnapshot], Awaitable[None]]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> OddsSnapshot:
+        # Going through the cache lets the on-demand path share this board, and with a shared
+        # backend only one worker on the host polls upstream; the others pick up its result.
+        prev = self.snapshot
+        interval = poll_interval(prev.board if prev else None)
+        board = await self.odds.get_board(ttl=interval / 2)
+        if prev is not None and board is prev.board:
+            return prev
+        age = self.odds.cache_info["odds"]["age_s"]
+        version = prev.version + 1 if prev else 1
+        # Swapping one reference is atomic for readers on the event loop.
+        self.snapshot = OddsSnapshot(version=version, fetched_at=time.time() - age, board=board)
+        for listener in self.listeners:
+            try:
+                await listener(prev, self.snapshot)
+            except Exception:
+                log.exception("odds snapshot listener failed")
+        return self.snapshot
+
+    def next_interval(self) -> float:
+        # The kickoff-driven interval, stretched when the odds API budget can't sustain it.
+        # Capped at an hour so a spent budget is re-checked once it refills.
+        base = poll_interval(self.snapshot.board if self.snapshot else None)
+        paced = self.odds.quota.min_interval(request_cost(ODDS_MARKETS, ODDS_REGIONS))
+        return max(base, min(paced, 3600.0))
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("odds poll failed; keeping snapshot v%s", self.snapshot.version if self.snapshot else 0)
+            await asyncio.sleep(self.next_interval())
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,121 @@
+import os
+import time
+import datetime as dt
+from collections import deque
+from typing import Dict, Any, Optional, Deque, List, Mapping
+
+# Credit accounting for the Odds API. Every call costs (markets x regions) credits and the
+# response headers report what's left for the month:
+#   x-requests-remaining, x-requests-used, x-requests-last (cost of this call)
+# The hourly budget is the smaller of ODDS_HOURLY_BUDGET and the remaining credits spread
+# evenly over the hours until the monthly reset. Callers stretch their refresh interval to
+# fit it (min_interval), serving what they have marked stale in between, and calls that
+# would overspend raise QuotaExceeded.
+#
+# Accounting is per worker process; with several workers give each a share of the budget.
+
+ODDS_HOURLY_BUDGET = float(os.getenv("ODDS_HOURLY_BUDGET", "0"))  # 0: pace by the remaining quota only
+ODDS_QUOTA_RESERVE = float(os.getenv("ODDS_QUOTA_RESERVE", "0"))   # credits never spent
+ODDS_QUOTA_RESET_DAY = int(os.getenv("ODDS_QUOTA_RESET_DAY", "1"))  # day of month (UTC) the plan renews
+
+class QuotaExceeded(Exception):
+    pass
+
+def request_cost(markets: str, regions: str = "us") -> int:
+    # Credits the Odds API charges for one odds call.
+    n_markets = len([m for m in markets.split(",") if m.strip()])
+    n_regions = len([r for r in regions.split(",") if r.strip()])
+    return max(1, n_markets * n_regions)
+
+def _header(headers: Mapping[str, str], name: str) -> Optional[float]:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+class OddsQuota:
+    def __init__(self, hourly_budget: float = ODDS_HOURLY_BUDGET, reserve: float = ODDS_QUOTA_RESERVE,
+                 reset_day: int = ODDS_QUOTA_RESET_DAY):
+        self.hourly_budget = hourly_budget
+        self.reserve = reserve
+        self.reset_day = reset_day
+        self.remaining: Optional[float] = None
+        self.used: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        # [ts, credits] per call in the last hour; costs are charged up front and settled from headers.
+        self._spent: Deque[List[float]] = deque()
+
+    def hours_to_reset(self, now: Optional[float] = None) -> float:
+        t = dt.datetime.fromtimestamp(time.time() if now is None else now, dt.timezone.utc)
+        day = min(self.reset_day, 28)
+        reset = t.replace(day=day, hour=0, minute=0, second=0, microsecond=0)
+        if reset <= t:
+            reset = (reset.replace(day=1) + dt.timedelta(days=32)).replace(day=day)
+        return max((reset - t).total_seconds() / 3600, 1.0)
+
+    def budget(self, now: Optional[float] = None) -> Optional[float]:
+        # Credits per hour we may spend; None when nothing limits us yet.
+        limits = []
+        if self.hourly_budget > 0:
+            limits.append(self.hourly_budget)
+        if self.remaining is not None:
+            limits.append(max(self.remaining - self.reserve, 0.0) / self.hours_to_reset(now))
+        return min(limits) if limits else None
+
+    def spent_last_hour(self, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        while self._spent and self._spent[0][0] <= now - 3600:
+            self._spent.popleft()
+        return sum(c for _, c in self._spent)
+
+    def allow(self, cost: float, now: Optional[float] = None) -> bool:
+        if self.remaining is not None and self.remaining - cost < self.reserve:
+            return False
+        if self.hourly_budget > 0 and self.spent_last_hour(now) + cost > self.hourly_budget:
+            return False
+        return True
+
+    def acquire(self, cost: float) -> List[float]:
+        # Charge a call before it's made so concurrent callers see it; settle() corrects the amount.
+        now = time.time()
+        if not self.allow(cost, now):
+            raise QuotaExceeded(f"odds API budget exhausted ({self.spent_last_hour(now):g} credits this hour, "
+                                f"{self.remaining if self.remaining is not None else '?'} remaining)")
+        entry = [now, float(cost)]
+        self._spent.append(entry)
+        return entry
+
+    def settle(self, entry: List[float], headers: Optional[Mapping[str, str]] = None) -> None:
+        # headers=None: the call never reached the API, so it cost nothing.
+        if headers is None:
+            entry[1] = 0.0
+            return
+        last = _header(headers, "x-requests-last")
+        if last is not None:
+            entry[1] = last
+        remaining = _header(headers, "x-requests-remaining")
+        if remaining is not None:
+            self.remaining = remaining
+            self.used = _header(headers, "x-requests-used")
+            self.updated_at = time.time()
+
+    def min_interval(self, cost: float, now: Optional[float] = None) -> float:
+        # Shortest refresh period for a call of this cost that keeps us inside the budget.
+        budget = self.budget(now)
+        if budget is None:
+            return 0.0
+        if budget <= 0:
+            return float("inf")
+        return 3600.0 * cost / budget
+
+    def info(self) -> Dict[str, Any]:
+        budget = self.budget()
+        return {
+            "remaining": self.remaining,
+            "used": self.used,
+            "spent_last_hour": self.spent_last_hour(),
+            "hourly_budget": round(budget, 2) if budget is not None else None,
+            "updated_at": self.updated_at,
+        }
+
+ODDS_QUOTA = OddsQuota()
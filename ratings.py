@@ -0,0 +1,43 @@
+import numpy as np
+from typing import Dict, Any, Optional, List
+
+from teams import TeamRows
+from utils import to_float
+
+def _unit_rating(x) -> float:
+    # CFBD nests unit ratings ({"offense": {"rating": 34.1}}); older payloads use plain numbers.
+    if isinstance(x, dict):
+        return to_float(x.get("rating"))
+    return to_float(x)
+
+# One season of SP+ ratings, built once per fetched payload.
+# Team ids index flat arrays; names resolve to ids through TeamRows.
+class RatingsStore(TeamRows):
+    def __init__(self, season: int, items: List[Dict[str, Any]]):
+        self.season = season
+        self.items = items
+        rows = [item for item in items if item.get("team")]
+        n = len(rows)
+        self.teams: List[str] = [item["team"] for item in rows]
+        self.rating = np.fromiter((to_float(item.get("rating")) for item in rows), dtype=np.float64, count=n)
+        self.offense = np.fromiter((_unit_rating(item.get("offense")) for item in rows), dtype=np.float64, count=n)
+        self.defense = np.fromiter((_unit_rating(item.get("defense")) for item in rows), dtype=np.float64, count=n)
+        self._index_rows(self.teams)
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        tid = self.team_id(name)
+        if tid is None:
+            return None
+        return {
+            "team": self.teams[tid],
+            "rating": float(self.rating[tid]),
+            "offense": float(self.offense[tid]),
+            "defense": float(self.defense[tid]),
+        }
+
+    def rating_of(self, name: str, default: float = 0.0) -> float:
+        tid = self.team_id(name)
+        return default if tid is None else float(self.rating[tid])
@@ -0,0 +1,78 @@
+import os
+import time
+import hashlib
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+import metrics
+from fetchers import TTLCache
+from utils import json_dumps
+
+# Serialized /analyze responses, keyed by the request's inputs, the odds they were priced
+# from (poller snapshot version, else the board's serial) and the config version. A repeat
+# of a cached request is one dict lookup and a bytes write; a client that sends back the
+# ETag with If-None-Match gets a 304 with no body.
+#
+# Ratings, features, schedule and weather are not part of the key: they refresh on their
+# own TTLs (hours), so entries live at most ANALYZE_CACHE_TTL seconds. Responses with a
+# degraded upstream are never cached, so a transient failure isn't served after it clears.
+
+ANALYZE_CACHE_TTL = float(os.getenv("ANALYZE_CACHE_TTL", "300"))
+ANALYZE_CACHE_MAX = int(os.getenv("ANALYZE_CACHE_MAX", "2048"))
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    built_at: float
+
+def response_key(params: Any, odds_version: str, config_version: str) -> str:
+    # params: the request's inputs as plain JSON-able values (canonical order is the caller's).
+    return hashlib.blake2b(json_dumps([params, odds_version, config_version]), digest_size=16).hexdigest()
+
+def etag_of(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+def not_modified(request: Request, etag: str) -> bool:
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+class ResponseCache:
+    def __init__(self, ttl: float = ANALYZE_CACHE_TTL, max_entries: int = ANALYZE_CACHE_MAX):
+        self.ttl = ttl
+        self.cache = TTLCache(max_entries=max_entries)
+
+    def get(self, key: Optional[str]) -> Optional[CachedResponse]:
+        if key is None or self.ttl <= 0:
+            return None
+        hit = self.cache.peek(key, self.ttl)
+        metrics.cache_lookup("response", {"hit": hit is not None})
+        return hit[0] if hit is not None else None
+
+    def put(self, key: str, result: Dict[str, Any]) -> CachedResponse:
+        # Serializes once; the stored bytes are what every later hit sends.
+        with metrics.stage("serialize"):
+            body = json_dumps(result)
+        entry = CachedResponse(body=body, etag=etag_of(body), built_at=time.time())
+        if self.ttl > 0:
+            self.cache.put(key, entry, entry.built_at)
+        return entry
+
+def send(request: Request, entry: CachedResponse) -> Response:
+    # Age: seconds since the body (including its `cache` block) was built.
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Age": str(int(time.time() - entry.built_at))}
+    if not_modified(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+def request_params(home: str, away: str, date: str, *payloads: Optional[Any]) -> Tuple[Any, ...]:
+    # The inputs that shape an /analyze result; pydantic payloads as plain dicts.
+    return (home, away, date) + tuple(p.dict() if p is not None else None for p in payloads)
@@ -0,0 +1,122 @@
+import os
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple
+
+from teams import TeamRows
+from venues import Venue, VenueIndex, miles_between
+from utils import approx_detect_bye, field, parse_kickoff, slate_date
+
+# One season's schedule from a single CFBD /games call (plus /venues), indexed by team.
+# Bye weeks, back-to-back road games and long trips are worked out for every team-game
+# when the index is built, so the situational flags for a whole slate are dict lookups.
+# A refetched schedule that hasn't changed reuses the index already built.
+
+SCHEDULE_LONGHAUL_MI = float(os.getenv("SCHEDULE_LONGHAUL_MI", "1500"))
+# Venue this much higher than the team's home stadium counts as an altitude trip.
+SCHEDULE_ALTITUDE_GAIN_M = float(os.getenv("SCHEDULE_ALTITUDE_GAIN_M", "1200"))
+
+SIDES = ("home", "away")
+
+class ScheduleIndex(TeamRows):
+    def __init__(self, season: int, games: List[Dict[str, Any]], venues: Optional[VenueIndex] = None):
+        self.season = season
+        self.venues = venues or VenueIndex([])
+        # team -> [(kickoff, at_home, venue_id)]; a neutral site is a road game for both teams.
+        per_team: Dict[str, List[Tuple[datetime, bool, Optional[int]]]] = {}
+        for g in games:
+            start = parse_kickoff(field(g, "startDate", "start_date") or "")
+            home, away = field(g, "homeTeam", "home_team"), field(g, "awayTeam", "away_team")
+            if start is None or not home or not away:
+                continue
+            neutral = bool(field(g, "neutralSite", "neutral_site"))
+            venue = field(g, "venueId", "venue_id")
+            per_team.setdefault(home, []).append((start, not neutral, venue))
+            per_team.setdefault(away, []).append((start, False, venue))
+
+        self.teams: List[str] = sorted(per_team)
+        # Per team id, in kickoff order.
+        self.dates: List[List[datetime]] = []
+        self.at_home: List[List[bool]] = []
+        self.venue_ids: List[List[Optional[int]]] = []
+        self.home_venue: List[Optional[Venue]] = []
+        # (team id, slate date) -> that game's venue, kickoff and schedule flags.
+        self.flags: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        for tid, team in enumerate(self.teams):
+            rows = sorted(per_team[team], key=lambda r: r[0])
+            self.dates.append([r[0] for r in rows])
+            self.at_home.append([r[1] for r in rows])
+            self.venue_ids.append([r[2] for r in rows])
+            home_ids = Counter(v for _, at_home, v in rows if at_home and v is not None)
+            home_venue = self.venues.get(home_ids.most_common(1)[0][0]) if home_ids else None
+            self.home_venue.append(home_venue)
+            for i, (start, at_home, venue_id) in enumerate(rows):
+                prev = rows[i - 1] if i else None
+                bye = approx_detect_bye(prev[0] if prev else None, start)
+                travel = (0.0, 0.0) if at_home else self._travel(home_venue, self.venues.get(venue_id))
+                self.flags[(tid, slate_date(start.isoformat()))] = {
+                    "venue_id": venue_id,
+                    "kickoff": start.timestamp(),
+                    "bye": bye,
+                    "b2b_road": not at_home and prev is not None and not prev[1] and not bye,
+                    "longhaul_altitude": travel is not None and (travel[0] >= SCHEDULE_LONGHAUL_MI or travel[1] >= SCHEDULE_ALTITUDE_GAIN_M),
+                    "travel_mi": None if travel is None else round(travel[0]),
+                }
+        self._index_rows(self.teams)
+
+    @staticmethod
+    def _travel(home: Optional[Venue], venue: Optional[Venue]) -> Optional[Tuple[float, float]]:
+        # (miles from the home stadium, elevation gain in meters), None without coordinates.
+        if home is None or venue is None:
+            return None
+        miles = miles_between(home, venue)
+        if miles is None:
+            return None
+        if venue.elevation_m is None or home.elevation_m is None:
+            return miles, 0.0
+        return miles, venue.elevation_m - home.elevation_m
+
+    def __len__(self) -> int:
+        return len(self.teams)
+
+    def team_flags(self, team: str, date: str) -> Optional[Dict[str, Any]]:
+        tid = self.team_id(team)
+        return None if tid is None else self.flags.get((tid, date))
+
+    def game(self, home: str, away: str, date: str) -> Optional[Dict[str, Any]]:
+        # Either team's entry for the game; both carry the same venue and kickoff.
+        return self.team_flags(home, date) or self.team_flags(away, date)
+
+    def situational(self, home: str, away: str, date: str) -> Dict[str, bool]:
+        # SituationalPayload flags derived from the schedule; only the ones that apply.
+        out = {}
+        for side, team in zip(SIDES, (home, away)):
+            flags = self.team_flags(team, date)
+            if not flags:
+                continue
+            for name in ("bye", "b2b_road", "longhaul_altitude"):
+                if flags[name]:
+                    out[f"{side}_{name}"] = True
+        return out
+
+def fingerprint(raw: Dict[str, Any]) -> str:
+    # Only what the index reads: scores and attendance change every week without moving a game.
+    keys = sorted(
+        (str(field(g, "startDate", "start_date")), str(field(g, "homeTeam", "home_team")), str(field(g, "awayTeam", "away_team")),
+         str(field(g, "venueId", "venue_id")), bool(field(g, "neutralSite", "neutral_site")))
+        for g in raw.get("games") or []
+    )
+    return hashlib.blake2b(repr((keys, len(raw.get("venues") or []))).encode(), digest_size=16).hexdigest()
+
+_BUILT: Dict[int, Tuple[str, ScheduleIndex]] = {}
+
+def schedule_index(season: int, raw: Dict[str, Any]) -> ScheduleIndex:
+    # raw is {"games": CFBD /games, "venues": CFBD /venues}.
+    fp = fingerprint(raw)
+    built = _BUILT.get(season)
+    if built is not None and built[0] == fp:
+        return built[1]
+    index = ScheduleIndex(season, raw.get("games") or [], VenueIndex(raw.get("venues") or []))
+    _BUILT[season] = (fp, index)
+    return index
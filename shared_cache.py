@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+from typing import Any, Optional, Tuple
+
+from utils import json_loads
+
+# Second-level cache shared by every worker process on the host. Values are raw upstream
+# JSON; each worker still builds its own OddsBoard/RatingsStore from it. A per-key lease
+# makes sure only one worker refreshes a given key at a time.
+#
+# Backends implement:
+#   async get(key) -> Optional[(stored_at, value)]
+#   async set(key, value, ttl)
+#   async acquire(key, lease_s) -> bool
+#   async release(key)
+
+class SQLiteBackend:
+    def __init__(self, path: str):
+        self.path = path
+        self.owner = uuid.uuid4().hex
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, stored_at REAL, expires REAL, value TEXT);
+            CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, owner TEXT, expires REAL);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread; asyncio.to_thread may run us on any pool thread.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def _get(self, key: str) -> Optional[Tuple[float, Any]]:
+        row = self._conn().execute("SELECT stored_at, expires, value FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0], json_loads(row[2])
+
+    def _set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?, ?)", (key, now, now + ttl, json.dumps(value, separators=(",", ":"))))
+        conn.execute("DELETE FROM kv WHERE expires < ?", (now,))
+
+    def _acquire(self, key: str, lease_s: float) -> bool:
+        now = time.time()
+        conn = self._conn()
+        # BEGIN IMMEDIATE takes the database write lock, so check-and-claim is atomic across processes.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT owner, expires FROM leases WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[0] != self.owner and row[1] > now:
+                conn.execute("COMMIT")
+                return False
+            conn.execute("INSERT OR REPLACE INTO leases VALUES (?, ?, ?)", (key, self.owner, now + lease_s))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _release(self, key: str) -> None:
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    async def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def acquire(self, key: str, lease_s: float) -> bool:
+        return await asyncio.to_thread(self._acquire, key, lease_s)
+
+    async def release(self, key: str) -> None:
+        await asyncio.to_thread(self._release, key)
+
+class RedisBackend:
+    # Any Redis-protocol server (Redis, Valkey, KeyDB, ...). Needs the optional `redis` package.
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+        self.client = redis.from_url(url)
+        self.owner = uuid.uuid4().hex
+
+    async def get(self, key: str) -> Optional[Tuple[float, Any]]:
+        raw = await self.client.get(f"cfb:kv:{key}")
+        if raw is None:
+            return None
+        item = json_loads(raw)
+        return item["stored_at"], item["value"]
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        payload = json.dumps({"stored_at": time.time(), "value": value}, separators=(",", ":"))
+        await self.client.set(f"cfb:kv:{key}", payload, px=max(1, int(ttl * 1000)))
+
+    async def acquire(self, key: str, lease_s: float) -> bool:
+        return bool(await self.client.set(f"cfb:lease:{key}", self.owner, nx=True, px=max(1, int(lease_s * 1000))))
+
+    async def release(self, key: str) -> None:
+        # Only drop the lease if we still hold it.
+        await self.client.eval(
+            "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0",
+            1, f"cfb:lease:{key}", self.owner,
+        )
+
+def backend_from_url(url: Optional[str]):
+    # SHARED_CACHE_URL: "sqlite:///path/to/cache.sqlite3" or "redis://host:6379/0"; empty = per-process only.
+    if not url:
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):] or "/tmp/cfb-shared-cache.sqlite3")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported SHARED_CACHE_URL: {url}")
+
+SHARED_BACKEND = backend_from_url(os.getenv("SHARED_CACHE_URL"))
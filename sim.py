@@ -0,0 +1,171 @@
+import os
+import math
+from typing import Dict, Any, Optional, List, Tuple, Sequence
+
+import numpy as np
+
+from config import ModelConfig
+
+# Monte Carlo pricing around the model's line and total. Each game draws final margins
+# (home minus away) and combined scores, rounded to whole points. Margins one point off
+# 3 or 7 move onto the key number with the configured weight, and a tie goes to overtime
+# as a 3-point game either way. Every game prices off its own draw histogram.
+#
+# All games share one seeded block of standardized draws, shifted and scaled per game. The
+# block is kept sorted, so a game's histogram is one searchsorted of its bin edges: the
+# same counts as rounding every draw, in microseconds instead of a pass over all of them.
+# A game's numbers depend only on its own inputs, so one game, a slate and the edge table
+# all agree, and a rerun gives the same result.
+
+SIM_DRAWS = int(os.getenv("SIM_DRAWS", "100000"))
+SIM_SEED = int(os.getenv("SIM_SEED", "20250830"))
+# Alternate lines priced around the book's spread and total, as point offsets.
+SIM_ALT_STEPS = tuple(float(x) for x in os.getenv("SIM_ALT_STEPS", "-7,-3,3,7").split(",") if x.strip())
+
+# Histogram ranges: margins in [-MAX_MARGIN, MAX_MARGIN], totals in [0, MAX_TOTAL]; draws
+# beyond them count at the end bins.
+MAX_MARGIN = 160
+MAX_TOTAL = 220
+OT_MARGIN = 3
+# Key number -> the margins next to it that feed it.
+KEY_NUMBERS = {3: (2, 4), 7: (6, 8)}
+
+_NOISE: Dict[Tuple[int, int, str, float], Tuple[np.ndarray, np.ndarray]] = {}
+
+def noise(cfg: ModelConfig, draws: int = SIM_DRAWS, seed: int = SIM_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    # Sorted (margin z, total z) draws with unit variance under either distribution, so
+    # margin_sd/total_sd mean the same thing for both.
+    key = (draws, seed, cfg.sim_distribution, cfg.sim_t_df)
+    block = _NOISE.get(key)
+    if block is None:
+        rng = np.random.default_rng(seed)
+        if cfg.sim_distribution == "t":
+            df = cfg.sim_t_df
+            scale = math.sqrt((df - 2) / df)
+            zm, zt = rng.standard_t(df, draws) * scale, rng.standard_t(df, draws) * scale
+        else:
+            zm, zt = rng.standard_normal(draws), rng.standard_normal(draws)
+        if len(_NOISE) >= 4:
+            _NOISE.clear()
+        block = _NOISE[key] = (np.sort(zm), np.sort(zt))
+    return block
+
+def _counts(z: np.ndarray, mean: np.ndarray, sd: float, lo: int, hi: int) -> np.ndarray:
+    # (games, hi - lo + 1) counts of round(mean + sd * z) per whole point in [lo, hi].
+    edges = np.arange(lo, hi + 1) + 0.5
+    below = np.searchsorted(z, (edges[None, :] - mean[:, None]) / sd)
+    counts = np.diff(below, axis=1, prepend=0)
+    counts[:, -1] += len(z) - below[:, -1]
+    return counts
+
+def histograms(model_line: np.ndarray, model_total: np.ndarray, cfg: ModelConfig,
+               draws: int = SIM_DRAWS, seed: int = SIM_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    # Cumulative margin and total distributions per game: (games, 2 * MAX_MARGIN + 1) and
+    # (games, MAX_TOTAL + 1), entry k = P(X <= k), margins offset by MAX_MARGIN.
+    zm, zt = noise(cfg, draws, seed)
+    pm = _counts(zm, model_line, cfg.sim_margin_sd, -MAX_MARGIN, MAX_MARGIN) / draws
+    pt = _counts(zt, model_total, cfg.sim_total_sd, 0, MAX_TOTAL) / draws
+    c = MAX_MARGIN
+    tie = pm[:, c].copy()
+    pm[:, c] = 0.0
+    pm[:, c + OT_MARGIN] += tie / 2
+    pm[:, c - OT_MARGIN] += tie / 2
+    for key, weight in ((3, cfg.sim_key_3), (7, cfg.sim_key_7)):
+        for sign in (1, -1):
+            for near in KEY_NUMBERS[key]:
+                moved = pm[:, c + sign * near] * weight
+                pm[:, c + sign * near] -= moved
+                pm[:, c + sign * key] += moved
+    return np.cumsum(pm, axis=1), np.cumsum(pt, axis=1)
+
+def _above(cdf: np.ndarray, offset: int, x: float) -> Tuple[float, float]:
+    # (P(X > x), P(X == x)) from one game's cumulative distribution.
+    k = math.floor(x) + offset
+    at_or_below = 0.0 if k < 0 else 1.0 if k >= len(cdf) else float(cdf[k])
+    push = 0.0
+    if x == math.floor(x) and 0 <= k < len(cdf):
+        push = at_or_below - (float(cdf[k - 1]) if k > 0 else 0.0)
+    return 1.0 - at_or_below, push
+
+def payout(american: int) -> float:
+    # Profit per unit staked on a win.
+    return american / 100.0 if american > 0 else 100.0 / -american
+
+def fair_american(p: float) -> Optional[int]:
+    if p <= 0.0 or p >= 1.0:
+        return None
+    return round(-100.0 * p / (1.0 - p)) if p >= 0.5 else round(100.0 * (1.0 - p) / p)
+
+def expected_value(win: float, push: float, american: Optional[int]) -> Optional[float]:
+    if american is None:
+        return None
+    return round(win * payout(american) - (1.0 - win - push), 4)
+
+def _prob(x: float) -> float:
+    return round(x, 4)
+
+def _center(book: Optional[float], model: float, sign: float) -> float:
+    # Alternate lines sit around the book's number, or the model's (to the half point) without one.
+    return book if book is not None else sign * round(model * 2) / 2
+
+def price(margin_cdf: np.ndarray, total_cdf: np.ndarray, lines: Dict[str, Any], model_line: float, model_total: float,
+          draws: int = SIM_DRAWS) -> Dict[str, Any]:
+    # Win probability, fair moneyline, cover probabilities and EV at the book's prices for one game.
+    home_win, _ = _above(margin_cdf, MAX_MARGIN, 0.0)
+    spread, total = lines.get("spread_home"), lines.get("total")
+    ev = {
+        "ml_home": expected_value(home_win, 0.0, lines.get("moneyline_home_odds")),
+        "ml_away": expected_value(1.0 - home_win, 0.0, lines.get("moneyline_away_odds")),
+        "spread_home": None, "spread_away": None, "over": None, "under": None,
+    }
+    out: Dict[str, Any] = {
+        "draws": draws,
+        "home_win_prob": _prob(home_win),
+        "fair_ml_home": fair_american(home_win),
+        "fair_ml_away": fair_american(1.0 - home_win),
+        "spread": None,
+        "total": None,
+        "ev": ev,
+    }
+    if spread is not None:
+        cover, push = _above(margin_cdf, MAX_MARGIN, -spread)
+        out["spread"] = {"spread_home": spread, "home_cover": _prob(cover), "push": _prob(push)}
+        ev["spread_home"] = expected_value(cover, push, lines.get("spread_odds_home"))
+        ev["spread_away"] = expected_value(1.0 - cover - push, push, lines.get("spread_odds_away"))
+    if total is not None:
+        over, push = _above(total_cdf, 0, total)
+        out["total"] = {"total": total, "over": _prob(over), "push": _prob(push)}
+        ev["over"] = expected_value(over, push, lines.get("total_over_odds"))
+        ev["under"] = expected_value(1.0 - over - push, push, lines.get("total_under_odds"))
+    alt_spreads, alt_totals = [], []
+    spread_center, total_center = _center(spread, model_line, -1.0), _center(total, model_total, 1.0)
+    for step in SIM_ALT_STEPS:
+        cover, push = _above(margin_cdf, MAX_MARGIN, -(spread_center + step))
+        alt_spreads.append({"spread_home": spread_center + step, "home_cover": _prob(cover), "push": _prob(push)})
+        over, push = _above(total_cdf, 0, total_center + step)
+        alt_totals.append({"total": total_center + step, "over": _prob(over), "push": _prob(push)})
+    out["alt_spreads"], out["alt_totals"] = alt_spreads, alt_totals
+    return out
+
+def price_games(lines: Sequence[Dict[str, Any]], model_line: Sequence[float], model_total: Sequence[float],
+                cfg: ModelConfig) -> List[Dict[str, Any]]:
+    # price() for every game, simulating them together.
+    if not lines:
+        return []
+    model_line = np.asarray(model_line, dtype=np.float64)
+    model_total = np.asarray(model_total, dtype=np.float64)
+    margin_cdf, total_cdf = histograms(model_line, model_total, cfg)
+    return [price(margin_cdf[i], total_cdf[i], l, float(model_line[i]), float(model_total[i]))
+            for i, l in enumerate(lines)]
+
+def moneyline_pick(priced: Optional[Dict[str, Any]], cfg: ModelConfig) -> Optional[Dict[str, Any]]:
+    # The moneyline side with the better EV at the book's price, when it clears risk.moneyline_ev_min.
+    if not priced:
+        return None
+    best = None
+    for side, key, fair, p in (("home", "ml_home", "fair_ml_home", priced["home_win_prob"]),
+                               ("away", "ml_away", "fair_ml_away", round(1.0 - priced["home_win_prob"], 4))):
+        ev = priced["ev"][key]
+        if ev is not None and ev >= cfg.moneyline_ev_min and (best is None or ev > best["ev"]):
+            best = {"side": side, "units": cfg.small_units, "ev": ev, "win_prob": p, "fair_odds": priced[fair]}
+    return best
@@ -0,0 +1,105 @@
+import json
+import asyncio
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Set
+
+from teams import TEAMS, team_key
+
+def _max_edge(row: Optional[Dict[str, Any]]) -> float:
+    if not row:
+        return 0.0
+    edges = row["model"]["edges"]
+    return max(abs(edges["spread_edge_pts"]), abs(edges["total_edge_pts"]))
+
+class EdgeFilter:
+    def __init__(self, teams: Optional[List[str]] = None, books: Optional[List[str]] = None, min_edge: float = 0.0):
+        self.team_names = [t for t in teams or [] if t.strip()]
+        self._teams: Set[str] = set()
+        self._teams_version: Optional[int] = None
+        self.books = [b.lower() for b in books or [] if b.strip()]
+        self.min_edge = min_edge
+
+    @property
+    def teams(self) -> Set[str]:
+        # Canonical keys of the requested teams, re-resolved whenever the team index changes
+        # (CFBD's list loading after the client subscribed, a new alias).
+        if self._teams_version != TEAMS.version:
+            self._teams = {team_key(t) for t in self.team_names}
+            self._teams_version = TEAMS.version
+        return self._teams
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        row = event["current"] or event["previous"]
+        if self.team_names:
+            game = row["game"]
+            if team_key(game["home"]) not in self.teams and team_key(game["away"]) not in self.teams:
+                return False
+        if self.books and not any(b in (row["lines"]["book"] or "").lower() for b in self.books):
+            return False
+        # Either side of the change clearing the bar counts, so clients also hear when an edge disappears.
+        return max(_max_edge(event["current"]), _max_edge(event["previous"])) >= self.min_edge
+
+# One connected client. Pending events are conflated per game: a slow consumer only ever
+# holds the latest state for each game, so its backlog is bounded by the board size.
+class EdgeSubscriber:
+    def __init__(self, flt: EdgeFilter):
+        self.filter = flt
+        self.pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.superseded = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        if not self.filter.matches(event):
+            return
+        old = self.pending.pop(event["key"], None)
+        if old is not None:
+            # Keep the oldest "previous" so the client still sees the full move.
+            event = dict(event, previous=old["previous"])
+            self.superseded += 1
+        self.pending[event["key"]] = event
+        self._ready.set()
+
+    async def next_batch(self, timeout: float) -> List[Dict[str, Any]]:
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        self._ready.clear()
+        batch = list(self.pending.values())
+        self.pending.clear()
+        return batch
+
+class EdgeBroadcaster:
+    def __init__(self):
+        self.subscribers: Set[EdgeSubscriber] = set()
+
+    def publish(self, events: List[Dict[str, Any]]) -> None:
+        for sub in list(self.subscribers):
+            for event in events:
+                sub.offer(event)
+
+    def subscribe(self, flt: EdgeFilter) -> EdgeSubscriber:
+        sub = EdgeSubscriber(flt)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: EdgeSubscriber) -> None:
+        self.subscribers.discard(sub)
+
+def sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+def edge_message(event: Dict[str, Any]) -> Dict[str, Any]:
+    current, previous = event["current"], event["previous"]
+    return {
+        "key": event["key"],
+        "type": event["type"],
+        "version": event["version"],
+        "config_version": event.get("config_version"),
+        "game": (current or previous)["game"],
+        "lines": current["lines"] if current else None,
+        "edges": current["model"]["edges"] if current else None,
+        "decisions": current["decisions"] if current else None,
+        "previous_edges": previous["model"]["edges"] if previous else None,
+        "previous_decisions": previous["decisions"] if previous else None,
+    }
@@ -0,0 +1,204 @@
+import os
+import json
+import asyncio
+import argparse
+import itertools
+import dataclasses
+from typing import Dict, Any, Optional, List, Tuple, Union
+
+import numpy as np
+import yaml
+
+import engine
+from backtest import (
+    APP_DIR, BACKTEST_CACHE_DIR, fetch_seasons, season_inputs, outcomes, profit,
+)
+from config import ModelConfig, INT_FIELDS, as_config, field_for
+from history import HISTORY_DB
+from utils import load_config
+
+# Grid search over config.yaml knobs. Every variant is a row of a (V, 1) parameter column
+# fed to engine.run, so one pass scores a whole block of variants against every game.
+
+SWEEP_MAX_VARIANTS = int(os.getenv("SWEEP_MAX_VARIANTS", "100000"))
+# Variants x games evaluated per engine pass; bounds memory for big grids.
+SWEEP_CHUNK_CELLS = int(os.getenv("SWEEP_CHUNK_CELLS", "1000000"))
+STATS = ("bets", "wins", "losses", "pushes", "risked", "won")
+# Settings the replayed games can respond to. Past games carry only SP+, closing lines and
+# scores (backtest.season_inputs): no injuries, situational flags, matchup stats, big-play
+# flags or weather, so those adjustments are zero for every variant, and the moneyline and
+# simulation settings aren't graded. Sweeping them would rank identical rows.
+SWEEPABLE = (
+    "base_hfa_pts", "big_edge_spread_pts", "big_edge_total_pts", "small_units", "big_units",
+    "small_spread_edge_min", "small_total_edge_min",
+)
+
+def parse_values(spec: str) -> List[float]:
+    # "1,2,3" or an inclusive range "start:stop:step".
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        if step <= 0:
+            raise ValueError(f"range step must be positive: {spec}")
+        n = int(np.floor((stop - start) / step + 1e-9)) + 1
+        return [round(start + i * step, 10) for i in range(max(n, 0))]
+    return [float(x) for x in spec.split(",") if x.strip()]
+
+def expand_grid(grid: Dict[str, List[float]]) -> Tuple[List[str], np.ndarray]:
+    # Cartesian product of the grid: ModelConfig field names and a (V, P) value matrix.
+    if not grid:
+        raise ValueError("grid is empty")
+    fields = [field_for(name) for name in grid]
+    inert = [name for name, f in zip(grid, fields) if f not in SWEEPABLE]
+    if inert:
+        raise ValueError(f"{', '.join(inert)} can't change backtest results (past games have no such inputs); "
+                         f"sweepable settings: {', '.join(SWEEPABLE)}")
+    if len(set(fields)) != len(fields):
+        raise ValueError("grid names the same setting twice")
+    sizes = [len(v) for v in grid.values()]
+    if not all(sizes):
+        raise ValueError("every grid setting needs at least one value")
+    if int(np.prod(sizes)) > SWEEP_MAX_VARIANTS:
+        raise ValueError(f"grid has {int(np.prod(sizes))} variants; the limit is {SWEEP_MAX_VARIANTS}")
+    values = np.array(list(itertools.product(*grid.values())), dtype=np.float64)
+    return fields, values
+
+def variant_config(base: ModelConfig, fields: List[str], values: np.ndarray) -> ModelConfig:
+    # A ModelConfig whose swept fields are (V, 1) columns; the rest stay scalars.
+    cols = {}
+    for j, f in enumerate(fields):
+        col = values[:, j:j + 1]
+        cols[f] = col.astype(np.int64) if f in INT_FIELDS else col
+    return dataclasses.replace(base, version=f"{base.version}+sweep", **cols)
+
+def load_games(years: List[int], cache_dir: str, primary_book_kw: Optional[str], allowed_books: Optional[list],
+               history_path: Optional[str] = None, prior_ratings: bool = False) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    # Every graded game of the given seasons, packed once and shared by all variants.
+    rows, cols = [], []
+    for y in years:
+        r, c = season_inputs(y, cache_dir, primary_book_kw, allowed_books, history_path, prior_ratings)
+        rows.extend(r)
+        cols.append(c)
+    packed = engine.pack_games(rows)
+    merged = {k: np.concatenate([c[k] for c in cols]) for k in cols[0]} if cols else {}
+    return packed, merged
+
+def score(packed: np.ndarray, cols: Dict[str, np.ndarray], base: ModelConfig, fields: List[str],
+          values: np.ndarray) -> Dict[str, np.ndarray]:
+    # Per-variant totals for spreads and totals: "spread_bets", "total_won", ...
+    v = len(values)
+    stats = {f"{m}_{k}": np.zeros(v) for m in ("spread", "total") for k in STATS}
+    if len(packed) == 0:
+        return stats
+    step = max(1, SWEEP_CHUNK_CELLS // len(packed))
+    for lo in range(0, v, step):
+        hi = min(v, lo + step)
+        out = engine.run(packed, variant_config(base, fields, values[lo:hi]))
+        o = outcomes(out, packed, cols)
+        for m in ("spread", "total"):
+            units = np.broadcast_to(out[f"{m}_units"], (hi - lo, len(packed)))
+            result = np.broadcast_to(o[f"{m}_result"], units.shape)
+            bet = units > 0
+            stats[f"{m}_bets"][lo:hi] = bet.sum(axis=1)
+            stats[f"{m}_wins"][lo:hi] = (bet & (result > 0)).sum(axis=1)
+            stats[f"{m}_losses"][lo:hi] = (bet & (result < 0)).sum(axis=1)
+            stats[f"{m}_pushes"][lo:hi] = (bet & (result == 0)).sum(axis=1)
+            stats[f"{m}_risked"][lo:hi] = units.sum(axis=1)
+            stats[f"{m}_won"][lo:hi] = profit(units, result, o[f"{m}_price"]).sum(axis=1)
+    return stats
+
+def _rates(wins: float, losses: float, risked: float, won: float) -> Dict[str, Optional[float]]:
+    wins, losses, risked, won = float(wins), float(losses), float(risked), float(won)
+    return {
+        "hit_rate": round(wins / (wins + losses), 4) if wins + losses else None,
+        "roi": round(won / risked, 4) if risked else None,
+    }
+
+def rank(stats: Dict[str, np.ndarray], fields: List[str], values: np.ndarray, top: int = 25,
+         sort: str = "roi", min_bets: int = 0) -> List[Dict[str, Any]]:
+    # Best variants first by combined ROI (or units "won"), ignoring those with fewer than min_bets bets.
+    bets = stats["spread_bets"] + stats["total_bets"]
+    risked = stats["spread_risked"] + stats["total_risked"]
+    won = stats["spread_won"] + stats["total_won"]
+    if sort == "won":
+        key = won
+    else:
+        key = np.divide(won, risked, out=np.full_like(won, -np.inf), where=risked > 0)
+    key = np.where(bets >= max(min_bets, 1), key, -np.inf)
+    order = np.argsort(-key, kind="stable")[:top]
+    table = []
+    for i in order:
+        if not np.isfinite(key[i]):
+            break
+        row = {"params": {f: values[i, j].item() for j, f in enumerate(fields)}}
+        for m in ("spread", "total"):
+            row[m] = {k: int(stats[f"{m}_{k}"][i]) for k in ("bets", "wins", "losses", "pushes")}
+            row[m]["units_won"] = round(float(stats[f"{m}_won"][i]), 2)
+            row[m].update(_rates(stats[f"{m}_wins"][i], stats[f"{m}_losses"][i], stats[f"{m}_risked"][i], stats[f"{m}_won"][i]))
+        row["bets"] = int(bets[i])
+        row["units_won"] = round(float(won[i]), 2)
+        row.update(_rates(stats["spread_wins"][i] + stats["total_wins"][i], stats["spread_losses"][i] + stats["total_losses"][i],
+                          risked[i], won[i]))
+        table.append(row)
+    return table
+
+def run_sweep(years: List[int], cfg: Union[ModelConfig, Dict[str, Any]], grid: Dict[str, List[float]], primary_book_kw: Optional[str],
+              allowed_books: Optional[list], cache_dir: str = BACKTEST_CACHE_DIR, history_path: Optional[str] = HISTORY_DB,
+              prior_ratings: bool = False, top: int = 25, sort: str = "roi", min_bets: int = 0) -> Dict[str, Any]:
+    # Season data must already be on disk (backtest.fetch_seasons).
+    base = as_config(cfg)
+    fields, values = expand_grid(grid)
+    packed, cols = load_games(years, cache_dir, primary_book_kw, allowed_books, history_path, prior_ratings)
+    stats = score(packed, cols, base, fields, values)
+    return {
+        "years": years,
+        "games": len(packed),
+        "variants": len(values),
+        "base_config_version": base.version,
+        "ranked": rank(stats, fields, values, top, sort, min_bets),
+    }
+
+def _print_table(report: Dict[str, Any]) -> None:
+    print(f"{report['variants']} variants x {report['games']} games")
+    for n, row in enumerate(report["ranked"], 1):
+        params = " ".join(f"{k}={v:g}" for k, v in row["params"].items())
+        hit = f"{row['hit_rate']:.1%}" if row["hit_rate"] is not None else "-"
+        roi = f"{row['roi']:+.1%}" if row["roi"] is not None else "-"
+        print(f"{n:>3}. roi {roi:>7}  hit {hit:>6}  units {row['units_won']:+8.2f}  bets {row['bets']:>5}  {params}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Score a grid of config variants against past seasons.")
+    parser.add_argument("years", type=int, nargs="+")
+    parser.add_argument("--grid", action="append", default=[], metavar="SETTING=VALUES",
+                        help='e.g. home_field.base_hfa_pts=1,2,3 or big_edge_spread_pts=3:6:0.5 (repeatable)')
+    parser.add_argument("--grid-file", help="YAML/JSON mapping of setting -> list of values")
+    parser.add_argument("--config", default=os.path.join(APP_DIR, "config.yaml"))
+    parser.add_argument("--cache-dir", default=BACKTEST_CACHE_DIR)
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", choices=("roi", "won"), default="roi")
+    parser.add_argument("--min-bets", type=int, default=0)
+    parser.add_argument("--prior-ratings", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    grid: Dict[str, List[float]] = {}
+    if args.grid_file:
+        with open(args.grid_file, "r") as f:
+            grid.update({k: [float(x) for x in v] for k, v in yaml.safe_load(f).items()})
+    for item in args.grid:
+        name, _, spec = item.partition("=")
+        grid[name.strip()] = parse_values(spec)
+
+    needed = sorted(set(args.years) | ({y - 1 for y in args.years} if args.prior_ratings else set()))
+    asyncio.run(fetch_seasons(needed, args.cache_dir))
+    primary_book_kw = os.getenv("PRIMARY_BOOK_KEYWORD", "DraftKings")
+    allowed_books = [s.strip() for s in os.getenv("ALLOWED_BOOKS", "DraftKings,FanDuel,Caesars").split(",") if s.strip()]
+    report = run_sweep(args.years, load_config(args.config), grid, primary_book_kw, allowed_books,
+                       cache_dir=args.cache_dir, history_path=HISTORY_DB or None, prior_ratings=args.prior_ratings,
+                       top=args.top, sort=args.sort, min_bets=args.min_bets)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_table(report)
+
+if __name__ == "__main__":
+    main()
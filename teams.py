@@ -0,0 +1,254 @@
+import os
+import re
+import asyncio
+import logging
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Callable, Awaitable, Tuple
+
+from model import normalize_team_name
+
+log = logging.getLogger(__name__)
+
+# Team-name resolution. Any spelling ("Miami OH RedHawks", "UConn Huskies", "Miami (OH)")
+# resolves to one canonical team id: the CFBD school name, which is also what SP+ uses.
+#
+#   1. LRU of raw strings already resolved (hits and misses): one dict probe.
+#   2. Exact lookup of the folded string in the alias table (schools, abbreviations,
+#      alternate names and "school mascot" from CFBD /teams, plus ALIASES below).
+#   3. Trailing words dropped one at a time (mascots the table doesn't know).
+#   4. Character-trigram similarity against every alias, accepted only when the best
+#      candidate is close and clearly ahead of the runner-up.
+# Steps 3 and 4 need the full CFBD list: against the built-in aliases alone,
+# "Mississippi State Bulldogs" would strip down to "Mississippi" (Ole Miss).
+
+TEAM_LRU_SIZE = int(os.getenv("TEAM_LRU_SIZE", "8192"))
+TEAM_FUZZY_MIN = float(os.getenv("TEAM_FUZZY_MIN", "0.72"))
+TEAM_FUZZY_MARGIN = float(os.getenv("TEAM_FUZZY_MARGIN", "0.08"))
+
+# Spellings seen on odds boards that CFBD's alternate names don't cover. Canonical -> aliases.
+ALIASES: Dict[str, List[str]] = {
+    "Miami (OH)": ["Miami OH", "Miami Ohio", "Miami-Ohio", "Miami RedHawks", "Miami OH RedHawks"],
+    "Miami": ["Miami FL", "Miami Florida", "Miami (FL)", "Miami Hurricanes"],
+    "UConn": ["Connecticut", "UConn Huskies", "Connecticut Huskies"],
+    "Southern Miss": ["Southern Mississippi", "Southern Miss Golden Eagles"],
+    "UL Monroe": ["Louisiana Monroe", "Louisiana-Monroe", "ULM"],
+    "Louisiana": ["Louisiana Lafayette", "Louisiana-Lafayette", "UL Lafayette", "Louisiana Ragin Cajuns"],
+    "UTSA": ["UT San Antonio", "Texas San Antonio", "UTSA Roadrunners"],
+    "UTEP": ["Texas El Paso", "UTEP Miners"],
+    "UCF": ["Central Florida", "UCF Knights"],
+    "UMass": ["Massachusetts", "UMass Minutemen"],
+    "UAB": ["Alabama Birmingham", "UAB Blazers"],
+    "UNLV": ["Nevada Las Vegas", "UNLV Rebels"],
+    "SMU": ["Southern Methodist", "SMU Mustangs"],
+    "TCU": ["Texas Christian", "TCU Horned Frogs"],
+    "BYU": ["Brigham Young", "BYU Cougars"],
+    "LSU": ["Louisiana State", "LSU Tigers"],
+    "Ole Miss": ["Mississippi", "Ole Miss Rebels"],
+    "App State": ["Appalachian State", "Appalachian St"],
+    "Sam Houston": ["Sam Houston State", "Sam Houston St"],
+    "Hawai'i": ["Hawaii", "Hawaii Rainbow Warriors"],
+    "San José State": ["San Jose State", "San Jose St"],
+    "NC State": ["North Carolina State", "NC State Wolfpack"],
+    "Florida International": ["FIU", "Florida Intl"],
+    "Florida Atlantic": ["FAU"],
+    "Middle Tennessee": ["Middle Tennessee State", "MTSU"],
+    "Western Kentucky": ["WKU"],
+    "Kent State": ["Kent"],
+}
+
+_PUNCT = re.compile(r"[^a-z0-9 ]+")
+_SPACES = re.compile(r"\s+")
+
+def fold(name: str) -> str:
+    # The exact-lookup key: normalize_team_name, then accents, parentheses and punctuation dropped.
+    s = unicodedata.normalize("NFKD", normalize_team_name(name or ""))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = _PUNCT.sub(" ", s.replace("'", ""))
+    return _SPACES.sub(" ", s).strip()
+
+def trigrams(key: str) -> frozenset:
+    padded = f"  {key} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+_MISS = object()
+
+class TeamIndex:
+    def __init__(self, teams: Optional[List[Dict[str, Any]]] = None, lru_size: int = TEAM_LRU_SIZE):
+        self.lru_size = lru_size
+        self.version = 0
+        self.loaded = False
+        self.aliases: Dict[str, str] = {}
+        self._grams: Dict[str, List[int]] = {}
+        self._alias_keys: List[str] = []
+        self._alias_grams: List[frozenset] = []
+        self._common = 64
+        self._lru: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self.load(teams or [])
+
+    def __len__(self) -> int:
+        return len(set(self.aliases.values()))
+
+    def load(self, teams: List[Dict[str, Any]]) -> None:
+        # Rebuild from a CFBD /teams payload. Schools claim their own names first, so an
+        # alternate name can never take over another school's name.
+        aliases: Dict[str, str] = {}
+        schools = [t["school"] for t in teams if t.get("school")]
+        for school in schools:
+            aliases.setdefault(fold(school), school)
+        for t in teams:
+            school = t.get("school")
+            if not school:
+                continue
+            names = [school, t.get("abbreviation")]
+            names += t.get("alternateNames") or [t.get(f"alt_name{k}") or t.get(f"alt_name_{k}") for k in (1, 2, 3)]
+            mascot = t.get("mascot")
+            for name in names:
+                if not name:
+                    continue
+                aliases.setdefault(fold(name), school)
+                if mascot:
+                    aliases.setdefault(fold(f"{name} {mascot}"), school)
+        known = set(schools)
+        for canonical, names in ALIASES.items():
+            # Without CFBD data the built-ins still apply; with it, only for schools it knows.
+            if known and canonical not in known:
+                continue
+            aliases.setdefault(fold(canonical), canonical)
+            for name in names:
+                aliases.setdefault(fold(name), canonical)
+        self._build(aliases)
+        self.loaded = bool(schools)
+
+    def _build(self, aliases: Dict[str, str]) -> None:
+        keys = list(aliases)
+        grams = [trigrams(k) for k in keys]
+        index: Dict[str, List[int]] = {}
+        for i, g in enumerate(grams):
+            for gram in g:
+                index.setdefault(gram, []).append(i)
+        # Swap everything at once; resolve() on the event loop never sees a half-built table.
+        self.aliases, self._alias_keys, self._alias_grams, self._grams = aliases, keys, grams, index
+        self._common = max(64, len(keys) // 20)
+        self._lru = OrderedDict()
+        self.version += 1
+
+    def add_alias(self, alias: str, canonical: str) -> None:
+        key = fold(alias)
+        if not key:
+            return
+        if key not in self.aliases:
+            # New key: index its trigrams so near-misses of the alias resolve too.
+            i = len(self._alias_keys)
+            grams = trigrams(key)
+            self._alias_keys.append(key)
+            self._alias_grams.append(grams)
+            for gram in grams:
+                self._grams.setdefault(gram, []).append(i)
+            self._common = max(64, len(self._alias_keys) // 20)
+        self.aliases[key] = canonical
+        self._lru.clear()
+        # Boards and stream filters holding resolved keys re-resolve on a version change.
+        self.version += 1
+
+    def resolve(self, name: str) -> Optional[str]:
+        # Canonical team id for any spelling, or None when nothing is close enough.
+        hit = self._lru.get(name, _MISS)
+        if hit is not _MISS:
+            self._lru.move_to_end(name)
+            return hit
+        team = self._resolve(name)
+        self._lru[name] = team
+        if len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+        return team
+
+    def key(self, name: str) -> str:
+        # Matching key: the canonical id when known, else the normalized name as before.
+        team = self.resolve(name)
+        return team if team is not None else normalize_team_name(name or "")
+
+    def _resolve(self, name: str) -> Optional[str]:
+        key = fold(name)
+        if not key:
+            return None
+        team = self.aliases.get(key)
+        if team is not None or not self.loaded:
+            return team
+        words = key.split()
+        for cut in range(len(words) - 1, 0, -1):
+            team = self.aliases.get(" ".join(words[:cut]))
+            if team is not None:
+                return team
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str) -> Optional[str]:
+        # Candidates come from the query's less common trigrams ("sta", "ate" are in half the
+        # table), then each is scored by Dice similarity over all trigrams.
+        grams = trigrams(key)
+        candidates = set()
+        for gram in grams:
+            posting = self._grams.get(gram)
+            if posting and len(posting) <= self._common:
+                candidates.update(posting)
+        scored = sorted(
+            ((2.0 * len(grams & self._alias_grams[i]) / (len(grams) + len(self._alias_grams[i])), self.aliases[self._alias_keys[i]])
+             for i in candidates),
+            reverse=True,
+        )
+        if not scored or scored[0][0] < TEAM_FUZZY_MIN:
+            return None
+        best, team = scored[0]
+        runner_up = next((score for score, t in scored[1:] if t != team), 0.0)
+        return team if best - runner_up >= TEAM_FUZZY_MARGIN else None
+
+class TeamRows:
+    # Team name -> row of a per-team array (RatingsStore, TeamFeatures). The canonical id
+    # (CFBD school) is tried first, then the store's own normalized names, then mascots dropped.
+    def _index_rows(self, teams: List[str]) -> None:
+        self.schools: Dict[str, int] = {}
+        self.aliases: Dict[str, int] = {}
+        for i, team in enumerate(teams):
+            self.schools.setdefault(team, i)
+            self.aliases.setdefault(normalize_team_name(team), i)
+            self.aliases.setdefault(team.lower(), i)
+
+    def add_alias(self, alias: str, team_id: int) -> None:
+        self.aliases[normalize_team_name(alias)] = team_id
+
+    def team_id(self, name: str) -> Optional[int]:
+        tid = self.schools.get(TEAMS.resolve(name or ""))
+        if tid is not None:
+            return tid
+        key = normalize_team_name(name or "")
+        tid = self.aliases.get(key)
+        if tid is not None or not key:
+            return tid
+        # Odds API names carry mascots ("Georgia Bulldogs"); drop trailing words until a school matches.
+        words = key.split()
+        for cut in range(len(words) - 1, 0, -1):
+            tid = self.aliases.get(" ".join(words[:cut]))
+            if tid is not None:
+                # Remember the match so the next lookup of this string is a single dict hit.
+                self.aliases[key] = tid
+                return tid
+        return None
+
+# Process-wide index; starts with the built-in aliases and gains CFBD data via keep_loaded().
+TEAMS = TeamIndex()
+
+def team_key(name: str) -> str:
+    return TEAMS.key(name)
+
+async def keep_loaded(fetch: Callable[[], Awaitable[List[Dict[str, Any]]]], retry_s: float = 300.0) -> None:
+    # Background task: load CFBD teams once, retrying until it works.
+    while True:
+        try:
+            TEAMS.load(await fetch())
+            log.info("team index loaded: %d teams, %d aliases", len(TEAMS), len(TEAMS.aliases))
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.exception("loading CFBD teams failed; retrying in %.0fs", retry_s)
+            await asyncio.sleep(retry_s)
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The app's modules live at the repository root and import each other top-level.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Keep tests hermetic: no outbound weather calls, no shared cache, no history file.
+os.environ.setdefault("WEATHER_PROVIDER", "off")
+os.environ.setdefault("SHARED_CACHE_URL", "")
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+import pytest
+import yaml
+
+import engine
+from backtest import grade, outcomes
+from config import compile_config
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+with open(CONFIG_PATH) as f:
+    CFG = compile_config(yaml.safe_load(f))
+
+def graded(model_line, spread_line, total_line, home_points, away_points):
+    # One game whose model line is exactly `model_line` (no adjustments beyond home field).
+    packed = engine.pack_games([{"ratings_delta": model_line - CFG.base_hfa_pts, "spread_line": spread_line, "total_line": total_line}])
+    cols = {k: np.array([v]) for k, v in {
+        "home_points": home_points, "away_points": away_points,
+        "spread_price_home": -110.0, "spread_price_away": -105.0, "over_price": -110.0, "under_price": 100.0,
+    }.items()}
+    out = engine.run(packed, CFG)
+    return out, outcomes(out, packed, cols), grade(out, packed, cols)
+
+def test_model_agreeing_with_the_market_does_not_bet():
+    out, _, g = graded(7.0, -7.0, 52.0, 35, 21)
+    assert out["spread_edge"][0] == 0.0
+    assert out["spread_units"][0] == 0 and g["spread"] == {}
+
+def test_favorite_the_model_rates_lower_backs_the_dog():
+    # Home -21, model home by 10: 11 points on the away side, which covers in a 14-point home win.
+    out, o, g = graded(10.0, -21.0, 52.0, 38, 24)
+    assert out["spread_edge"][0] == -11.0
+    assert out["spread_units"][0] == CFG.big_units
+    assert o["spread_result"][0] == 1 and o["spread_price"][0] == -105.0
+    tier = g["spread"][CFG.big_units]
+    assert (tier["wins"], tier["losses"], tier["pushes"]) == (1, 0, 0)
+    assert tier["won"] == pytest.approx(CFG.big_units * 100 / 105)
+
+def test_small_home_edge_loses_when_home_fails_to_cover():
+    # Home -7, model home by 10: a 3-point home edge, staked small; home wins by 3.
+    out, o, g = graded(10.0, -7.0, 52.0, 24, 21)
+    assert out["spread_edge"][0] == 3.0
+    assert out["spread_units"][0] == CFG.small_units
+    assert o["spread_result"][0] == -1 and o["spread_price"][0] == -110.0
+    assert g["spread"][CFG.small_units]["won"] == -CFG.small_units
+
+def test_landing_on_the_number_is_a_push():
+    _, o, g = graded(14.0, -7.0, 52.0, 28, 21)
+    assert o["spread_result"][0] == 0
+    assert g["spread"][CFG.big_units]["pushes"] == 1 and g["spread"][CFG.big_units]["won"] == 0
+
+def test_total_under_loses_when_it_goes_over():
+    # Calm weather: the model total is the base 52, 10 under the book's 62, and 68 points go over.
+    out, o, _ = graded(3.0, -3.0, 62.0, 38, 30)
+    assert out["total_edge"][0] == -10.0
+    assert o["total_result"][0] == -1 and o["total_price"][0] == 100.0
@@ -0,0 +1,150 @@
+import asyncio
+import time
+
+import pytest
+
+import fetchers
+from fetchers import TTLCache
+
+def run(coro):
+    return asyncio.run(coro)
+
+def counting_fetch(value="v", delay=0.0):
+    calls = []
+    async def fetch():
+        calls.append(time.time())
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+    return fetch, calls
+
+def test_hit_within_ttl_skips_fetch():
+    cache = TTLCache()
+    fetch, calls = counting_fetch()
+    async def go():
+        first = await cache.get_or_fetch("k", 60, fetch)
+        second = await cache.get_or_fetch("k", 60, fetch)
+        return first, second
+    (v1, info1), (v2, info2) = run(go())
+    assert (v1, v2) == ("v", "v")
+    assert info1["hit"] is False and info2["hit"] is True
+    assert len(calls) == 1
+
+def test_expired_entry_is_refetched():
+    cache = TTLCache()
+    fetch, calls = counting_fetch()
+    cache.put("k", "old", stored_at=time.time() - 120)
+    value, info = run(cache.get_or_fetch("k", 60, fetch))
+    assert value == "v" and info["hit"] is False
+    assert len(calls) == 1
+
+def test_concurrent_misses_share_one_fetch():
+    cache = TTLCache()
+    fetch, calls = counting_fetch(delay=0.05)
+    async def go():
+        return await asyncio.gather(*(cache.get_or_fetch("k", 60, fetch, build=str.upper) for _ in range(10)))
+    results = run(go())
+    assert len(calls) == 1
+    assert all(value == "V" for value, _ in results)
+    assert sum(1 for _, info in results if info.get("coalesced")) == 9
+
+def test_failed_fetch_is_not_cached():
+    cache = TTLCache()
+    attempts = []
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+    async def go():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("k", 60, flaky)
+        return await cache.get_or_fetch("k", 60, flaky)
+    value, info = run(go())
+    assert value == "ok" and info["hit"] is False
+    assert len(attempts) == 2
+
+def test_caller_timeout_does_not_cancel_the_fetch():
+    cache = TTLCache()
+    fetch, calls = counting_fetch(delay=0.05)
+    async def go():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(cache.get_or_fetch("k", 60, fetch), 0.01)
+        await asyncio.sleep(0.1)
+        return cache.peek("k", 60)
+    hit = run(go())
+    assert hit is not None and hit[0] == "v"
+    assert len(calls) == 1
+
+def test_lru_eviction():
+    cache = TTLCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.peek("a", 60)
+    cache.put("c", 3)
+    assert cache.peek("b", 60) is None
+    assert cache.peek("a", 60)[0] == 1 and cache.peek("c", 60)[0] == 3
+
+class FakeBackend:
+    # In-memory stand-in for shared_cache's backends; `holder` simulates another worker's lease.
+    def __init__(self):
+        self.data = {}
+        self.leases = {}
+        self.released = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl):
+        self.data[key] = (time.time(), value)
+
+    async def acquire(self, key, lease_s):
+        if self.leases.get(key, 0.0) > time.time():
+            return False
+        self.leases[key] = time.time() + lease_s
+        return True
+
+    async def release(self, key):
+        self.released.append(key)
+        self.leases.pop(key, None)
+
+@pytest.fixture
+def shared(monkeypatch):
+    monkeypatch.setattr(fetchers, "SHARED_WAIT_S", 0.5)
+    monkeypatch.setattr(fetchers, "SHARED_RETRY_S", 0.05)
+    return FakeBackend()
+
+def test_follower_waits_for_leader(shared):
+    shared.leases["k"] = time.time() + 60
+    cache = TTLCache(backend=shared)
+    fetch, calls = counting_fetch()
+    async def go():
+        async def other_worker():
+            await asyncio.sleep(0.1)
+            await shared.set("k", "theirs", 60)
+        asyncio.ensure_future(other_worker())
+        return await cache.get_or_fetch("k", 60, fetch)
+    value, info = run(go())
+    assert value == "theirs" and info["shared"] is True
+    assert calls == [] and shared.released == []
+
+def test_follower_serves_stale_when_leader_stalls(shared):
+    shared.leases["k"] = time.time() + 60
+    cache = TTLCache(backend=shared)
+    cache.put("k", "old", stored_at=time.time() - 120)
+    fetch, calls = counting_fetch()
+    value, info = run(cache.get_or_fetch("k", 60, fetch))
+    assert value == "old" and info["stale"] is True
+    assert calls == []
+
+def test_follower_takes_over_expired_lease(shared, monkeypatch):
+    monkeypatch.setattr(fetchers, "SHARED_WAIT_S", 5.0)
+    # The refresher died holding the lease; it runs out mid-wait.
+    shared.leases["k"] = time.time() + 0.2
+    cache = TTLCache(backend=shared)
+    fetch, calls = counting_fetch()
+    start = time.time()
+    value, info = run(cache.get_or_fetch("k", 60, fetch))
+    assert value == "v" and info["hit"] is False
+    assert len(calls) == 1 and calls[0] - start < 1.0
+    assert shared.data["k"][1] == "v" and shared.released == ["k"]
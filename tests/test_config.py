@@ -0,0 +1,27 @@
+import os
+
+import pytest
+import yaml
+
+from config import ModelConfig, as_config, compile_config
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load_raw(path="config.yaml"):
+    with open(os.path.join(ROOT, path)) as f:
+        return yaml.safe_load(f)
+
+@pytest.mark.parametrize("path", ["config.yaml", os.path.join("app", "config.yaml")])
+def test_shipped_configs_compile(path):
+    assert isinstance(compile_config(load_raw(path)), ModelConfig)
+
+def test_copies_agree():
+    assert load_raw() == load_raw(os.path.join("app", "config.yaml"))
+
+def test_model_config_passes_through():
+    compiled = compile_config(load_raw())
+    assert as_config(compiled) is compiled
+
+def test_dict_is_compiled():
+    raw = load_raw()
+    assert as_config(raw) == compile_config(raw)
@@ -0,0 +1,118 @@
+import copy
+import os
+
+import yaml
+
+from board import OddsBoard, diff_boards
+from config import compile_config
+from edges import EdgeTable
+from ratings import RatingsStore
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+with open(CONFIG_PATH) as f:
+    RAW = yaml.safe_load(f)
+
+def event(eid, home, away, spread=-3.5, total=47.5, book="draftkings", title="DraftKings"):
+    return {
+        "id": eid, "home_team": home, "away_team": away, "commence_time": "2025-11-08T19:30:00Z",
+        "bookmakers": [{"key": book, "title": title, "markets": [
+            {"key": "spreads", "outcomes": [{"name": home, "price": -110, "point": spread},
+                                            {"name": away, "price": -110, "point": -spread}]},
+            {"key": "totals", "outcomes": [{"name": "Over", "price": -110, "point": total},
+                                           {"name": "Under", "price": -110, "point": total}]},
+        ]}],
+    }
+
+def slate(**moves):
+    events = [event("e1", "Georgia Bulldogs", "Alabama Crimson Tide"),
+              event("e2", "Ohio State Buckeyes", "Michigan Wolverines", spread=-7.0, total=44.5)]
+    for eid, (spread, total) in moves.items():
+        events = [event(e["id"], e["home_team"], e["away_team"], spread, total) if e["id"] == eid else e for e in events]
+    return events
+
+RATINGS = {2025: RatingsStore(2025, [
+    {"team": "Georgia", "rating": 25.0}, {"team": "Alabama", "rating": 20.0},
+    {"team": "Ohio State", "rating": 28.0}, {"team": "Michigan", "rating": 14.0},
+])}
+
+class Config:
+    def __init__(self):
+        self.current = compile_config(RAW)
+
+    def __call__(self):
+        return self.current
+
+def table(config=None):
+    async def no_ratings(season):
+        return None
+    return EdgeTable(config or Config(), None, None, load_ratings=no_ratings)
+
+def test_diff_same_board_is_empty():
+    diff = diff_boards(OddsBoard(slate()), OddsBoard(slate()))
+    assert not diff
+    assert diff.events == set()
+
+def test_diff_reports_moved_quotes_by_event():
+    diff = diff_boards(OddsBoard(slate()), OddsBoard(slate(e1=(-4.0, 47.5))))
+    assert diff.events == {"e1"}
+    assert {k[2] for k in diff.changed} == {"spreads"}
+    assert diff.changed[("e1", "draftkings", "spreads", "georgia bulldogs")] == (-4.0, -110)
+    assert diff.removed == [] and diff.added_events == [] and diff.removed_events == []
+
+def test_diff_added_and_removed_events():
+    prev = OddsBoard(slate())
+    cur = OddsBoard(slate()[:1] + [event("e3", "Texas Longhorns", "Oklahoma Sooners")])
+    diff = diff_boards(prev, cur)
+    assert diff.added_events == ["e3"]
+    assert diff.removed_events == ["e2"]
+    assert all(k[0] == "e2" for k in diff.removed)
+    # A pulled event is reported as removed, not as touched.
+    assert diff.events == {"e3"}
+
+def test_diff_from_nothing_adds_everything():
+    diff = diff_boards(None, OddsBoard(slate()))
+    assert diff.added_events == ["e1", "e2"]
+    assert diff.events == {"e1", "e2"}
+
+def test_update_reruns_only_moved_events():
+    edges = table()
+    assert sorted(edges.update(OddsBoard(slate()), RATINGS, 1)) == ["e1", "e2"]
+    before = edges.rows["e2"]
+    assert edges.update(OddsBoard(slate(e1=(-6.5, 47.5))), RATINGS, 2) == ["e1"]
+    assert edges.rows["e1"]["lines"]["spread_home"] == -6.5
+    assert edges.rows["e2"] is before
+    assert edges.version == 2
+
+def test_update_ignores_moves_at_other_books():
+    edges = table()
+    board = slate()
+    edges.update(OddsBoard(board), RATINGS, 1)
+    board[0]["bookmakers"].append(event("e1", "Georgia Bulldogs", "Alabama Crimson Tide", -9.0, 50.5, "fanduel", "FanDuel")["bookmakers"][0])
+    edges.primary_book_kw = "draftkings"
+    assert edges.update(OddsBoard(board), RATINGS, 2) == []
+
+def test_update_drops_removed_events_and_notifies():
+    edges = table()
+    seen = []
+    edges.listeners.append(seen.append)
+    edges.update(OddsBoard(slate()), RATINGS, 1)
+    assert edges.update(OddsBoard(slate()[:1]), RATINGS, 2) == ["e2"]
+    assert set(edges.rows) == {"e1"}
+    assert [(e["key"], e["type"]) for e in seen[-1]] == [("e2", "removed")]
+    assert seen[-1][0]["current"] is None
+
+def test_new_ratings_and_config_rerun_everything():
+    config = Config()
+    edges = table(config)
+    edges.update(OddsBoard(slate()), RATINGS, 1)
+    before = dict(edges.rows)
+    fresh = {2025: RatingsStore(2025, RATINGS[2025].items + [{"team": "Texas", "rating": 22.0}])}
+    edges.update(OddsBoard(slate()), fresh, 2)
+    # Same numbers, so nothing is reported, but both games were re-run against the new store.
+    assert edges.last_changed == []
+    assert all(edges.rows[k] is not before[k] for k in before)
+    raw = copy.deepcopy(RAW)
+    raw["home_field"]["base_hfa_pts"] += 1.0
+    config.current = compile_config(raw)
+    assert sorted(edges.sync_config()) == ["e1", "e2"]
+    assert edges.config_version == config.current.version
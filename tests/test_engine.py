@@ -0,0 +1,76 @@
+import copy
+import os
+import random
+
+import numpy as np
+import pytest
+import yaml
+
+import engine
+from analysis import run_model, run_model_batch
+from config import compile_config
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+
+def load_raw():
+    with open(CONFIG_PATH) as f:
+        return yaml.safe_load(f)
+
+def random_game(r: random.Random, i: int) -> dict:
+    # Every input shape the scalar path accepts, including missing lines and unknown trap values.
+    def injuries():
+        # Empty, missing and partial reports as well as full ones.
+        kind = r.random()
+        if kind < 0.15:
+            return r.choice([{}, None])
+        fields = engine.INJURY_FIELDS if kind < 0.6 else r.sample(engine.INJURY_FIELDS, r.randint(1, 4))
+        return {f: (r.random() < 0.3 if f.startswith("qb") else r.choice([0, 0, 1, 2, 3])) for f in fields}
+    spread = None if r.random() < 0.1 else r.choice([x / 2 for x in range(-60, 61)])
+    total = None if r.random() < 0.1 else r.choice([x / 2 for x in range(70, 140)])
+    return {
+        "game": {"home": f"Home {i}", "away": f"Away {i}", "date": "2025-11-08"},
+        "lines": {"book": "Test", "spread_home": spread, "spread_odds_home": r.choice([None, -110, -105]),
+                  "spread_odds_away": -110, "total": total, "total_over_odds": -110, "total_under_odds": r.choice([None, -110]),
+                  "moneyline_home_odds": r.choice([None, -250, -120, 140]), "moneyline_away_odds": r.choice([None, 200, 105, -160])},
+        "ratings_delta": r.uniform(-40, 40) if r.random() < 0.9 else round(r.uniform(-40, 40) * 4) / 4,
+        "ratings_matched": {"home": True, "away": r.random() < 0.9},
+        "base_total": 52.0,
+        "spread_line": spread,
+        "total_line": total,
+        "weather": {"wind_mph": r.choice([0, 10, 12, 15, 17, 20]), "precip_mm": r.choice([0, 0.5, 1.0, 2, 3, 5])},
+        "situational": {"home_bye": r.random() < .2, "away_bye": r.random() < .2,
+                        "home_trap": r.choice([None, "low", "high", "x"]), "away_trap": r.choice([None, "low", "high"]),
+                        "home_b2b_road": r.random() < .2, "away_b2b_road": r.random() < .2,
+                        "home_longhaul_altitude": r.random() < .2, "away_longhaul_altitude": r.random() < .2},
+        "matchup": {k: r.uniform(-3, 3) for k in engine.MATCHUP_FIELDS},
+        "explosiveness": {k: r.random() < .4 for k in engine.EXPLOSIVE_FLAGS},
+        "injuries_home": injuries(),
+        "injuries_away": injuries(),
+    }
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_batch_matches_scalar_model(seed):
+    r = random.Random(seed)
+    raw = load_raw()
+    if seed == 2:
+        # The switched-off branches too.
+        raw = copy.deepcopy(raw)
+        raw["explosiveness"]["use_big_plays"] = False
+        raw["weather"]["trigger_only"] = False
+    raw = copy.deepcopy(raw)
+    if seed == 4:
+        # Every report clusters; an empty one still must not.
+        raw["injuries"]["cluster_same_unit_threshold"] = 0
+    raw["home_field"]["base_hfa_pts"] = r.choice([2.0, 2.5, 3.1])
+    cfg = compile_config(raw)
+    games = [random_game(r, i) for i in range(1000)]
+    batch = run_model_batch(games, cfg)
+    mismatches = [i for i, (g, b) in enumerate(zip(games, batch)) if run_model(g, cfg) != b]
+    assert mismatches == []
+
+def test_pack_games_handles_missing_fields():
+    packed = engine.pack_games([{}, {"spread_line": -3.5, "weather": None, "situational": {"home_trap": "high"}}])
+    assert np.isnan(packed["spread_line"][0]) and packed["spread_line"][1] == -3.5
+    assert packed["base_total"][0] == 52.0
+    assert packed["home_trap"].tolist() == [0, 2]
+    assert len(engine.pack_games([])) == 0
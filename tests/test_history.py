@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import pytest
+
+from board import OddsBoard
+from history import OddsHistory, line_history
+
+KICKOFF = datetime(2025, 11, 8, 19, 30, tzinfo=timezone.utc).timestamp()
+HOME, AWAY = "Georgia Bulldogs", "Alabama Crimson Tide"
+
+def board(spread, total, book="draftkings"):
+    return OddsBoard([{
+        "id": "e1", "home_team": HOME, "away_team": AWAY, "commence_time": "2025-11-08T19:30:00Z",
+        "bookmakers": [{"key": book, "title": book.title(), "markets": [
+            {"key": "spreads", "outcomes": [{"name": HOME, "price": -110, "point": spread},
+                                            {"name": AWAY, "price": -110, "point": -spread}]},
+            {"key": "totals", "outcomes": [{"name": "Over", "price": -110, "point": total},
+                                           {"name": "Under", "price": -110, "point": total}]},
+        ]}],
+    }])
+
+@pytest.fixture
+def history(tmp_path):
+    h = OddsHistory(str(tmp_path / "history.sqlite3"))
+    # Open, a move, the last pre-kickoff quote, then an in-game line that must not count as the close.
+    h.record(board(-3.5, 47.5), ts=KICKOFF - 86400)
+    h.record(board(-3.5, 47.5), ts=KICKOFF - 7200)
+    h.record(board(-4.5, 48.5), ts=KICKOFF - 60)
+    h.record(board(-10.0, 55.5), ts=KICKOFF + 1800)
+    yield h
+    h.close()
+
+def test_unchanged_board_writes_nothing(history):
+    assert history.record(board(-10.0, 55.5), ts=KICKOFF + 3600) == 0
+
+def test_closing_quotes_are_last_before_kickoff(history):
+    closing = history.closing_quotes("e1")
+    assert len(closing) == 4
+    assert closing[("e1", "draftkings", "spreads", "georgia bulldogs")] == (-4.5, -110)
+    assert closing[("e1", "draftkings", "totals", "over")] == (48.5, -110)
+    assert history.closing_quotes("missing") == {}
+
+def test_line_history_clv(history):
+    b = board(-3.0, 47.5)
+    out = line_history(history, b, 0, 0, {"spread_home": -3.0, "total": 47.5})
+    assert out["open_spread_home"] == -3.5 and out["open_total"] == 47.5
+    assert out["closing_spread_home"] == -4.5 and out["closing_total"] == 48.5
+    # Home +1.5 points better than the close; the over 1 point lower than the close.
+    assert out["clv_spread_home_pts"] == 1.5
+    assert out["clv_total_over_pts"] == 1.0
+
+def test_line_history_without_lines_or_event(history):
+    b = board(-3.0, 47.5)
+    out = line_history(history, b, 0, 0, {"spread_home": None, "total": None})
+    assert out["clv_spread_home_pts"] is None and out["clv_total_over_pts"] is None
+    assert line_history(history, b, None, None, {}) == {}
+
+def test_warm_start_and_find_event(history):
+    reopened = OddsHistory(history.path)
+    try:
+        assert reopened.record(board(-10.0, 55.5), ts=KICKOFF + 3600) == 0
+        assert reopened.find_event(HOME, AWAY) == "e1"
+        assert reopened.find_event(AWAY, HOME) is None
+    finally:
+        reopened.close()
+
+def test_concurrent_reads_use_one_connection_per_thread(history):
+    expected = history.closing_quotes("e1")
+    seen = set()
+    def read(_):
+        seen.add(id(history.reader))
+        return history.closing_quotes("e1"), history.line_summary("e1", "draftkings", "totals", "over")["closing"]["point"]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(read, range(200)))
+    assert all(r == (expected, 48.5) for r in results)
+    assert len(seen) > 1 and id(history.reader) not in seen
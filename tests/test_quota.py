@@ -0,0 +1,88 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from fetchers import OddsClient, TTLCache
+from quota import OddsQuota, QuotaExceeded, request_cost
+
+def test_request_cost_is_markets_times_regions():
+    assert request_cost("h2h,spreads,totals", "us") == 3
+    assert request_cost("spreads", "us,eu") == 2
+    assert request_cost("", "us") == 1
+
+def test_hourly_budget_blocks_overspend():
+    quota = OddsQuota(hourly_budget=5)
+    quota.acquire(3)
+    assert quota.allow(2) and not quota.allow(3)
+    with pytest.raises(QuotaExceeded):
+        quota.acquire(3)
+    # A call that never reached the API is refunded.
+    entry = quota.acquire(2)
+    quota.settle(entry, None)
+    assert quota.spent_last_hour() == 3
+
+def test_headers_set_remaining_and_reserve_holds_back():
+    quota = OddsQuota(reserve=10)
+    entry = quota.acquire(3)
+    quota.settle(entry, {"x-requests-remaining": "12", "x-requests-used": "488", "x-requests-last": "2"})
+    assert (quota.remaining, quota.used, quota.spent_last_hour()) == (12.0, 488.0, 2.0)
+    assert quota.allow(2) and not quota.allow(3)
+
+def test_min_interval_spreads_remaining_credits():
+    quota = OddsQuota()
+    assert quota.min_interval(3) == 0.0
+    quota.remaining = 100.0
+    now = datetime(2025, 11, 30, 14, tzinfo=timezone.utc).timestamp()  # 10 hours before a reset on the 1st
+    assert quota.hours_to_reset(now) == 10.0
+    assert quota.min_interval(3, now) == pytest.approx(3600.0 * 3 / 10.0)
+    quota.remaining = 0.0
+    assert quota.min_interval(3, now) == float("inf")
+
+def client(hourly_budget=0.0):
+    return OddsClient(http=object(), api_key="test", cache=TTLCache(), quota=OddsQuota(hourly_budget=hourly_budget))
+
+def metered(odds, value="new"):
+    calls = []
+    async def fetch():
+        calls.append(1)
+        odds.quota.acquire(3)
+        return value
+    return fetch, calls
+
+def serve(odds, fetch, ttl=60.0):
+    return asyncio.run(odds._cached_or_stale("k", ttl, 3, fetch, lambda raw: raw))
+
+def test_fresh_entry_is_a_plain_hit():
+    odds = client(hourly_budget=6)
+    odds.cache.put("k", "old", time.time() - 10)
+    fetch, calls = metered(odds)
+    value, info = serve(odds, fetch)
+    assert value == "old" and info["hit"] is True and "stale" not in info and calls == []
+
+def test_entry_past_ttl_inside_budget_interval_is_stale():
+    # 6 credits an hour at 3 per call: one refresh per 30 minutes, against a 60 s TTL.
+    odds = client(hourly_budget=6)
+    odds.cache.put("k", "old", time.time() - 120)
+    fetch, calls = metered(odds)
+    value, info = serve(odds, fetch)
+    assert value == "old" and info["stale"] is True and info["age_s"] >= 120
+    assert calls == []
+
+def test_entry_past_budget_interval_is_refetched():
+    odds = client(hourly_budget=6)
+    odds.cache.put("k", "old", time.time() - 1900)
+    fetch, calls = metered(odds)
+    value, info = serve(odds, fetch)
+    assert value == "new" and info["hit"] is False and calls == [1]
+
+def test_spent_budget_serves_last_value_or_raises():
+    odds = client(hourly_budget=3)
+    odds.quota.acquire(3)
+    odds.cache.put("k", "old", time.time() - 7200)
+    fetch, _ = metered(odds)
+    value, info = serve(odds, fetch)
+    assert value == "old" and info["stale"] is True
+    with pytest.raises(QuotaExceeded):
+        asyncio.run(odds._cached_or_stale("other", 60.0, 3, fetch, lambda raw: raw))
@@ -0,0 +1,51 @@
+import time
+
+from fastapi import Request
+
+from responses import ResponseCache, etag_of, not_modified, response_key, send
+
+def request(if_none_match=None):
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match is not None else []
+    return Request({"type": "http", "method": "GET", "path": "/analyze", "headers": headers, "query_string": b""})
+
+def test_put_then_get_returns_same_bytes():
+    cache = ResponseCache(ttl=60)
+    key = response_key(["Georgia", "Alabama", "2025-11-08"], "odds-1", "cfg-1")
+    entry = cache.put(key, {"lines": {"spread_home": -3.5}})
+    assert cache.get(key) is entry
+    assert entry.body == b'{"lines":{"spread_home":-3.5}}'
+    assert entry.etag == etag_of(entry.body)
+
+def test_key_changes_with_odds_and_config():
+    params = ["Georgia", "Alabama", "2025-11-08"]
+    keys = {response_key(params, "odds-1", "cfg-1"), response_key(params, "odds-2", "cfg-1"),
+            response_key(params, "odds-1", "cfg-2")}
+    assert len(keys) == 3
+
+def test_expired_and_disabled_cache_miss():
+    cache = ResponseCache(ttl=60)
+    entry = cache.put("k", {"a": 1})
+    cache.cache.put("k", entry, time.time() - 120)
+    assert cache.get("k") is None
+    off = ResponseCache(ttl=0)
+    off.put("k", {"a": 1})
+    assert off.get("k") is None
+    assert cache.get(None) is None
+
+def test_send_full_body_then_304():
+    entry = ResponseCache(ttl=60).put("k", {"a": 1})
+    full = send(request(), entry)
+    assert full.status_code == 200 and full.body == entry.body
+    assert full.headers["etag"] == entry.etag and full.headers["cache-control"] == "no-cache"
+    again = send(request(entry.etag), entry)
+    assert again.status_code == 304 and again.body == b""
+    assert again.headers["etag"] == entry.etag
+
+def test_if_none_match_weak_lists_and_wildcard():
+    etag = etag_of(b"{}")
+    assert not_modified(request(f"W/{etag}"), etag)
+    assert not_modified(request(f'"other", W/{etag}'), etag)
+    assert not_modified(request("*"), etag)
+    assert not not_modified(request('"other"'), etag)
+    assert not not_modified(request(), etag)
+    assert send(request('"stale"'), ResponseCache(ttl=60).put("k", {})).status_code == 200
@@ -0,0 +1,37 @@
+import pytest
+
+import stream
+import teams
+from stream import EdgeFilter
+from teams import TeamIndex
+
+@pytest.fixture
+def index(monkeypatch):
+    fresh = TeamIndex([{"school": "Georgia", "mascot": "Bulldogs"}, {"school": "Alabama", "mascot": "Crimson Tide"}])
+    monkeypatch.setattr(teams, "TEAMS", fresh)
+    monkeypatch.setattr(stream, "TEAMS", fresh)
+    return fresh
+
+def event(home, away, spread_edge=3.0, book="DraftKings"):
+    row = {"game": {"home": home, "away": away}, "lines": {"book": book},
+           "model": {"edges": {"spread_edge_pts": spread_edge, "total_edge_pts": 0.0}}}
+    return {"key": "e1", "type": "changed", "current": row, "previous": None}
+
+def test_filters_by_team_book_and_edge(index):
+    flt = EdgeFilter(["Georgia Bulldogs"], ["draftkings"], min_edge=2.0)
+    assert flt.matches(event("Georgia", "Alabama"))
+    assert not flt.matches(event("Alabama", "Auburn"))
+    assert not flt.matches(event("Georgia", "Alabama", book="FanDuel"))
+    assert not flt.matches(event("Georgia", "Alabama", spread_edge=-1.5))
+
+def test_alias_added_after_subscribing_reaches_the_filter(index):
+    flt = EdgeFilter(["Dawgs"])
+    assert not flt.matches(event("Georgia", "Alabama"))
+    index.add_alias("Dawgs", "Georgia")
+    assert flt.matches(event("Georgia", "Alabama"))
+
+def test_team_list_loaded_after_subscribing_reaches_the_filter(index):
+    flt = EdgeFilter(["Roll Tide"])
+    assert not flt.matches(event("Georgia", "Alabama"))
+    index.load([{"school": "Alabama", "mascot": "Crimson Tide", "alternateNames": ["Roll Tide"]}])
+    assert flt.matches(event("Georgia", "Alabama"))
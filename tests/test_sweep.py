@@ -0,0 +1,52 @@
+import os
+import random
+
+import numpy as np
+import pytest
+import yaml
+
+import engine
+from config import compile_config
+from sweep import expand_grid, rank, score
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config.yaml")
+with open(CONFIG_PATH) as f:
+    CFG = compile_config(yaml.safe_load(f))
+
+def season(n=200, seed=5):
+    # Home teams win by exactly their ratings edge (no home field), and the book is off by
+    # 2-8 points either way. A variant without home field backs the right side every time.
+    r = random.Random(seed)
+    rows, margins = [], []
+    for _ in range(n):
+        delta = float(r.randint(-20, 20))
+        miss = r.choice([-1, 1]) * r.choice([2.5, 4.5, 6.5, 8.5])
+        rows.append({"ratings_delta": delta, "spread_line": -delta + miss, "total_line": None})
+        margins.append(delta)
+    margins = np.array(margins)
+    cols = {"home_points": 30.0 + margins, "away_points": np.full(n, 30.0),
+            "spread_price_home": np.full(n, -110.0), "spread_price_away": np.full(n, -110.0),
+            "over_price": np.full(n, -110.0), "under_price": np.full(n, -110.0)}
+    return engine.pack_games(rows), cols
+
+def test_home_field_variants_rank_by_results():
+    packed, cols = season()
+    fields, values = expand_grid({"home_field.base_hfa_pts": [10.0, 0.0, 5.0]})
+    table = rank(score(packed, cols, CFG, fields, values), fields, values)
+    assert [row["params"]["base_hfa_pts"] for row in table] == [0.0, 5.0, 10.0]
+    best, worst = table[0], table[-1]
+    assert best["spread"]["losses"] == 0 and best["hit_rate"] == 1.0
+    assert worst["roi"] < best["roi"]
+
+def test_threshold_variants_differ_in_bets():
+    packed, cols = season()
+    fields, values = expand_grid({"small_spread_edge_min": [2.0, 5.0], "big_edge_spread_pts": [7.0]})
+    table = rank(score(packed, cols, CFG, fields, values), fields, values, min_bets=1)
+    bets = {row["params"]["small_spread_edge_min"]: row["bets"] for row in table}
+    assert bets[2.0] > bets[5.0] > 0
+
+@pytest.mark.parametrize("name", ["injuries.qb1_out_pts", "matchups.max_nudge_pts", "weather.wind_threshold_mph",
+                                  "risk.moneyline_ev_min"])
+def test_settings_backtests_cannot_see_are_rejected(name):
+    with pytest.raises(ValueError, match="can't change backtest results"):
+        expand_grid({name: [1.0, 2.0]})
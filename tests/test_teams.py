@@ -0,0 +1,50 @@
+from board import OddsBoard, SPREADS, HOME, AWAY
+from history import OddsHistory
+from teams import TeamIndex
+
+TEAMS = [
+    {"school": "Georgia", "mascot": "Bulldogs", "abbreviation": "UGA"},
+    {"school": "Mississippi State", "mascot": "Bulldogs", "abbreviation": "MSST"},
+    {"school": "Ole Miss", "mascot": "Rebels", "abbreviation": "MISS"},
+]
+
+def test_alias_resolves_exactly_and_fuzzily():
+    index = TeamIndex(TEAMS)
+    assert index.resolve("Starkville Cowbells") is None
+    index.add_alias("Starkville Cowbells", "Mississippi State")
+    assert index.resolve("Starkville Cowbells") == "Mississippi State"
+    # A misspelling only the new alias is close to goes through the trigram index.
+    assert index.resolve("Starkvile Cowbels") == "Mississippi State"
+
+def test_alias_for_existing_key_is_repointed():
+    index = TeamIndex(TEAMS)
+    keys = len(index._alias_keys)
+    index.add_alias("UGA", "Ole Miss")
+    assert index.resolve("UGA") == "Ole Miss"
+    assert len(index._alias_keys) == keys
+
+def miami_event(outcome_home):
+    return {
+        "id": "m1", "home_team": "Miami Hurricanes", "away_team": "Miami (OH) RedHawks",
+        "commence_time": "2025-09-06T16:00:00Z",
+        "bookmakers": [{"key": "book", "title": "Book", "markets": [
+            {"key": "spreads", "outcomes": [{"name": outcome_home, "price": -110, "point": -20.5},
+                                            {"name": "Miami OH", "price": -110, "point": 20.5}]},
+        ]}],
+    }
+
+def test_board_sides_match_on_canonical_team():
+    board = OddsBoard([miami_event("Miami FL")])
+    assert board.grids["spread_home"][0, 0] == -20.5
+    assert board.grids["spread_away"][0, 0] == 20.5
+    assert board.outcome_name(0, 0, SPREADS, HOME) == "miami fl"
+    assert board.outcome_name(0, 0, SPREADS, AWAY) == "miami oh"
+
+def test_history_finds_event_by_any_spelling(tmp_path):
+    history = OddsHistory(str(tmp_path / "history.sqlite3"))
+    try:
+        history.record(OddsBoard([miami_event("Miami Hurricanes")]), ts=0.0)
+        assert history.find_event("Miami (FL)", "Miami RedHawks") == "m1"
+        assert history.find_event("Miami (OH)", "Miami") is None
+    finally:
+        history.close()
@@ -1,6 +1,39 @@
+import os
+import json
+import tempfile
 import yaml
 from typing import Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+try:
+    # Optional: several times faster on big odds payloads.
+    import orjson
+except ImportError:
+    orjson = None
+
+def json_loads(data: Any) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def json_dumps(data: Any) -> bytes:
+    # Compact UTF-8 JSON, the same bytes either way for the plain dicts/lists/numbers the API returns.
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def read_json(path: str) -> Any:
+    with open(path, "rb") as f:
+        return json_loads(f.read())
+
+def write_json(path: str, data: Any) -> None:
+    # Atomic: readers see the old file or the new one, never a partial write.
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".json")
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+# Odds API kickoffs are UTC; a Saturday night game is Sunday in UTC, so slates use a local calendar day.
+SLATE_TZ = ZoneInfo(os.getenv("SLATE_TZ", "America/New_York"))
 
 def load_config(path: str) -> Dict[str, Any]:
     with open(path, "r") as f:
@@ -9,11 +42,33 @@ def load_config(path: str) -> Dict[str, Any]:
 def parse_iso_date(s: str) -> datetime:
     return datetime.fromisoformat(s)
 
+def parse_kickoff(commence_time: str) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat(commence_time.replace("Z", "+00:00"))
+    except (ValueError, AttributeError):
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def slate_date(commence_time: str) -> Optional[str]:
+    dt = parse_kickoff(commence_time)
+    return dt.astimezone(SLATE_TZ).date().isoformat() if dt else None
+
+def season_of(dt: datetime) -> int:
+    # January/February bowls and playoffs belong to the season that started the previous fall.
+    return dt.year - 1 if dt.month < 3 else dt.year
+
 def approx_detect_bye(prev_game_date: Optional[datetime], current_date: datetime) -> bool:
     if not prev_game_date:
         return False
     return (current_date - prev_game_date).days >= 13
 
+def field(d: Dict[str, Any], *names: str) -> Any:
+    # CFBD payloads are camelCase today; older dumps used snake_case.
+    for n in names:
+        if d.get(n) is not None:
+            return d[n]
+    return None
+
 def to_float(x, default=0.0) -> float:
     try:
         return float(x)
@@ -0,0 +1,69 @@
+import math
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List
+
+from utils import field
+
+# CFBD /venues, indexed by id: coordinates, elevation and dome flag for travel and weather.
+
+EARTH_RADIUS_MI = 3958.8
+
+@dataclass(frozen=True)
+class Venue:
+    id: int
+    name: str
+    lat: Optional[float]
+    lon: Optional[float]
+    elevation_m: Optional[float]
+    dome: bool
+    timezone: Optional[str]
+
+def _coord(x: Any) -> Optional[float]:
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return None
+
+def miles_between(a: Venue, b: Venue) -> Optional[float]:
+    # Great-circle distance; None when either venue has no coordinates.
+    if a.lat is None or a.lon is None or b.lat is None or b.lon is None:
+        return None
+    p1, p2 = math.radians(a.lat), math.radians(b.lat)
+    dp, dl = p2 - p1, math.radians(b.lon - a.lon)
+    h = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_MI * math.asin(math.sqrt(h))
+
+class VenueIndex:
+    def __init__(self, venues: List[Dict[str, Any]]):
+        self.by_id: Dict[int, Venue] = {}
+        self.by_name: Dict[str, Venue] = {}
+        for v in venues:
+            if v.get("id") is None:
+                continue
+            # v1 nests coordinates as location {x: lat, y: lon}; v2 has latitude/longitude.
+            loc = v.get("location") or {}
+            venue = Venue(
+                id=int(v["id"]),
+                name=v.get("name") or "",
+                lat=_coord(field(v, "latitude") or loc.get("x")),
+                lon=_coord(field(v, "longitude") or loc.get("y")),
+                elevation_m=_coord(v.get("elevation")),
+                dome=bool(v.get("dome")),
+                timezone=v.get("timezone"),
+            )
+            self.by_id[venue.id] = venue
+            if venue.name:
+                self.by_name.setdefault(venue.name.lower(), venue)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def get(self, venue_id: Any = None, name: Optional[str] = None) -> Optional[Venue]:
+        if venue_id is not None:
+            try:
+                venue = self.by_id.get(int(venue_id))
+            except (TypeError, ValueError):
+                venue = None
+            if venue is not None:
+                return venue
+        return self.by_name.get(name.lower()) if name else None
@@ -0,0 +1,189 @@
+import os
+import time
+import asyncio
+import logging
+import importlib
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+
+from board import OddsBoard
+from fetchers import TTLCache, Upstream, fetch_all
+from schedule import ScheduleIndex
+from venues import Venue
+from utils import json_loads
+
+log = logging.getLogger(__name__)
+
+# Kickoff-hour wind and precipitation for outdoor games, feeding apply_weather_total_adj.
+# Forecasts are cached per (venue, hour). warm() fetches every missing outdoor game of a
+# slate in batched provider calls; lookups only read the cache, so a warm slate costs no
+# upstream time. Domes never reach the provider.
+#
+# WEATHER_PROVIDER picks the source:
+#   off          (default) no weather; every game gets calm conditions as before
+#   open-meteo   api.open-meteo.com, no key, many locations per call; opt-in, as it calls out
+#   static       fixed conditions from WEATHER_STATIC ("wind_mph,precip_mm"), for tests and benchmarks
+#   module:attr  any object (or zero-argument factory) with the provider interface:
+#                  async hourly(points: [(lat, lon)], start: date, end: date) -> [{hour_ts: {"wind_mph", "precip_mm"}}]
+#                  async aclose()
+
+WEATHER_PROVIDER = os.getenv("WEATHER_PROVIDER", "off")
+WEATHER_STATIC = os.getenv("WEATHER_STATIC", "0,0")
+WEATHER_BASE = os.getenv("WEATHER_BASE", "https://api.open-meteo.com")
+WEATHER_TTL = float(os.getenv("WEATHER_CACHE_TTL", "3600"))
+WEATHER_CACHE_MAX = int(os.getenv("WEATHER_CACHE_MAX", "4096"))
+WEATHER_BATCH = int(os.getenv("WEATHER_BATCH", "50"))
+WEATHER_FETCH_TIMEOUT = float(os.getenv("WEATHER_FETCH_TIMEOUT", "4"))
+# Forecasts reach about 16 days out; games further away or long over are left calm.
+WEATHER_HORIZON_DAYS = float(os.getenv("WEATHER_HORIZON_DAYS", "16"))
+
+CALM = {"wind_mph": 0.0, "precip_mm": 0.0}
+
+# A game to forecast: its venue and kickoff hour (unix seconds, on the hour).
+Slot = Tuple[Venue, int]
+
+class OpenMeteoProvider:
+    def __init__(self, http: Optional[Upstream] = None):
+        self.http = http or Upstream(WEATHER_BASE, max_concurrency=4, name="weather")
+
+    async def hourly(self, points: List[Tuple[float, float]], start, end) -> List[Dict[int, Dict[str, float]]]:
+        r = await self.http.get("/v1/forecast", params={
+            "latitude": ",".join(f"{lat:.4f}" for lat, _ in points),
+            "longitude": ",".join(f"{lon:.4f}" for _, lon in points),
+            "hourly": "wind_speed_10m,precipitation",
+            "wind_speed_unit": "mph",
+            "precipitation_unit": "mm",
+            "timezone": "GMT",
+            "timeformat": "unixtime",
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+        })
+        body = json_loads(r.content)
+        # One location comes back as an object, several as a list in request order.
+        out = []
+        for loc in body if isinstance(body, list) else [body]:
+            h = loc.get("hourly") or {}
+            out.append({
+                int(ts): {"wind_mph": float(w or 0.0), "precip_mm": float(p or 0.0)}
+                for ts, w, p in zip(h.get("time") or [], h.get("wind_speed_10m") or [], h.get("precipitation") or [])
+            })
+        return out
+
+    async def aclose(self) -> None:
+        await self.http.aclose()
+
+class StaticProvider:
+    # Local stand-in: the same conditions everywhere, every hour.
+    def __init__(self, wind_mph: float = 0.0, precip_mm: float = 0.0):
+        self.conditions = {"wind_mph": float(wind_mph), "precip_mm": float(precip_mm)}
+        self.calls = 0
+
+    async def hourly(self, points: List[Tuple[float, float]], start, end) -> List[Dict[int, Dict[str, float]]]:
+        self.calls += 1
+        first = int(datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp())
+        hours = range(first, first + ((end - start).days + 1) * 86400, 3600)
+        return [{h: dict(self.conditions) for h in hours} for _ in points]
+
+    async def aclose(self) -> None:
+        return None
+
+def make_provider(name: str = WEATHER_PROVIDER) -> Optional[Any]:
+    if name in ("", "off"):
+        return None
+    if name == "open-meteo":
+        return OpenMeteoProvider()
+    if name == "static":
+        wind, precip = (float(x) for x in WEATHER_STATIC.split(","))
+        return StaticProvider(wind, precip)
+    module, _, attr = name.partition(":")
+    obj = getattr(importlib.import_module(module), attr)
+    return obj() if callable(obj) else obj
+
+def _hour(ts: float) -> int:
+    return int(ts // 3600 * 3600)
+
+class WeatherService:
+    def __init__(self, provider: Any, ttl: float = WEATHER_TTL, cache: Optional[TTLCache] = None):
+        self.provider = provider
+        self.ttl = ttl
+        # (venue id, hour) -> conditions, or None when the provider had no forecast for that hour.
+        self.cache = cache or TTLCache(max_entries=WEATHER_CACHE_MAX)
+        self._inflight: Dict[Tuple[int, int], asyncio.Task] = {}
+
+    def slot(self, schedule: Optional[ScheduleIndex], board: Optional[OddsBoard], home: str, away: str, date: str) -> Optional[Slot]:
+        # Venue from the schedule; kickoff from the odds board when the game is on it.
+        game = schedule.game(home, away, date) if schedule else None
+        if game is None:
+            return None
+        venue = schedule.venues.get(game["venue_id"])
+        if venue is None:
+            return None
+        idx = board.find(home, away) if board is not None else None
+        kickoff = board.kickoffs[idx] if idx is not None and board.kickoffs[idx] else game["kickoff"]
+        return venue, _hour(kickoff)
+
+    def lookup(self, slot: Optional[Slot]) -> Dict[str, float]:
+        # Cache only: what the model sees for this game right now.
+        if slot is None or slot[0].dome:
+            return dict(CALM)
+        hit = self.cache.peek((slot[0].id, slot[1]), self.ttl)
+        return dict(hit[0]) if hit is not None and hit[0] is not None else dict(CALM)
+
+    def _wanted(self, slot: Slot, now: float) -> bool:
+        venue, hour = slot
+        return (not venue.dome and venue.lat is not None and venue.lon is not None
+                and now - 86400 <= hour <= now + WEATHER_HORIZON_DAYS * 86400)
+
+    async def warm(self, slots: List[Optional[Slot]]) -> None:
+        # Fetch every outdoor slot missing from the cache, WEATHER_BATCH locations per call.
+        # Fetches run detached, so a caller that times out leaves the cache to fill anyway.
+        now = time.time()
+        pending, missing = [], {}
+        for slot in slots:
+            if slot is None or not self._wanted(slot, now):
+                continue
+            key = (slot[0].id, slot[1])
+            if key in self._inflight:
+                pending.append(self._inflight[key])
+            elif key not in missing and self.cache.peek(key, self.ttl) is None:
+                missing[key] = slot
+        items = list(missing.items())
+        for i in range(0, len(items), WEATHER_BATCH):
+            batch = items[i:i + WEATHER_BATCH]
+            task = asyncio.ensure_future(self._fetch([slot for _, slot in batch]))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            for key, _ in batch:
+                self._inflight[key] = task
+            pending.append(task)
+        if pending:
+            done = await asyncio.shield(asyncio.gather(*pending, return_exceptions=True))
+            errors = [e for e in done if isinstance(e, Exception)]
+            if errors:
+                raise errors[0]
+
+    async def _fetch(self, slots: List[Slot]) -> None:
+        keys = [(venue.id, hour) for venue, hour in slots]
+        try:
+            # One entry per venue; the date range covers every kickoff in the batch.
+            venues: Dict[int, Venue] = {}
+            for venue, _ in slots:
+                venues.setdefault(venue.id, venue)
+            days = [datetime.fromtimestamp(hour, tz=timezone.utc).date() for _, hour in slots]
+            forecasts = await self.provider.hourly([(v.lat, v.lon) for v in venues.values()], min(days), max(days))
+            by_venue = dict(zip(venues, forecasts))
+            for venue_id, hour in keys:
+                self.cache.put((venue_id, hour), (by_venue.get(venue_id) or {}).get(hour))
+        finally:
+            for key in keys:
+                self._inflight.pop(key, None)
+
+    async def aclose(self) -> None:
+        await self.provider.aclose()
+
+async def slate_weather(service: Optional["WeatherService"], slots: List[Optional[Slot]]) -> Tuple[List[Dict[str, float]], bool]:
+    # Conditions per slot, warming the cache first; (weather, ok). A failed or slow provider
+    # leaves the games it didn't cover calm.
+    if service is None:
+        return [dict(CALM) for _ in slots], True
+    data, status = await fetch_all({"weather": service.warm(slots)}, timeouts={"weather": WEATHER_FETCH_TIMEOUT})
+    return [service.lookup(slot) for slot in slots], status["weather"] == "ok"